@@ -1,12 +1,20 @@
 from __future__ import absolute_import
 
 from django.utils.translation import ugettext_lazy as _
+from django.contrib.auth.models import User, Group
+from django.core.signals import request_started
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
 
 from navigation.api import register_links, register_multi_item_links
 from project_setup.api import register_setup
+from permissions.models import Role, RoleMember
 
 from .classes import (AccessHolder, AccessObjectClass, ClassAccessHolder,
     AccessObject)
+from .models import AccessEntry
+from .runtime import access_resolver
+from .signals import access_entries_changed
 from .permissions import (ACLS_EDIT_ACL, ACLS_VIEW_ACL,
     ACLS_CLASS_EDIT_ACL, ACLS_CLASS_VIEW_ACL)
 
@@ -37,3 +45,21 @@ register_links(ClassAccessHolder, [acl_class_acl_detail])
 
 register_links(AccessObjectClass, [acl_class_acl_list, acl_class_new_holder_for])
 register_multi_item_links(['acl_class_acl_detail'], [acl_class_grant, acl_class_revoke])
+
+
+@receiver(request_started, dispatch_uid='access_resolver_clear')
+def access_resolver_clear(sender, **kwargs):
+    # Each request resolves the access with the current entries
+    access_resolver.clear()
+
+
+@receiver(post_save, dispatch_uid='access_entry_resolver_invalidate', sender=AccessEntry)
+@receiver(post_delete, dispatch_uid='access_entry_resolver_remove', sender=AccessEntry)
+@receiver(access_entries_changed, dispatch_uid='access_entries_resolver_invalidate', sender=AccessEntry)
+@receiver(post_save, dispatch_uid='role_member_resolver_invalidate', sender=RoleMember)
+@receiver(post_delete, dispatch_uid='role_member_resolver_remove', sender=RoleMember)
+@receiver(post_delete, dispatch_uid='role_resolver_remove', sender=Role)
+@receiver(post_delete, dispatch_uid='group_resolver_remove', sender=Group)
+@receiver(m2m_changed, dispatch_uid='user_groups_resolver_invalidate', sender=User.groups.through)
+def access_resolver_invalidate(sender, **kwargs):
+    access_resolver.invalidate()
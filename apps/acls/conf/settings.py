@@ -0,0 +1,13 @@
+"""Configuration options for the acls app"""
+
+from django.utils.translation import ugettext_lazy as _
+
+from smart_settings.api import register_settings
+
+register_settings(
+    namespace=u'acls',
+    module=u'acls.conf.settings',
+    settings=[
+        {'name': u'RESOLVER_CACHE_TIMEOUT', 'global_name': u'ACLS_RESOLVER_CACHE_TIMEOUT', 'default': 0, 'description': _(u'Amount of seconds the access entries of an actor are kept in the Django cache to be reused by the following requests, use 0 to read them again for every request.  Changes made by other processes only discard the kept entries when all the processes share the same CACHE_BACKEND.')},
+    ]
+)
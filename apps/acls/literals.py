@@ -11,3 +11,11 @@ CONTENT_TYPE_ICON_MAP = {
     'common.anonymoususersingleton': 'user',
     'acls.creatorsingleton': 'user',
 }
+
+# Seconds the access entries of an actor are kept in memory when not
+# resolving the permissions of a request, like in the job workers
+RESOLVER_LOCAL_TIMEOUT = 10
+
+# Amount of access entries read, inserted or deleted per query by the
+# bulk operations
+BULK_BATCH_SIZE = 500
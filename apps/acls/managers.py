@@ -1,8 +1,9 @@
 from __future__ import absolute_import
 
 import logging
+import operator
 
-from django.db import models
+from django.db import connection, models, transaction
 from django.utils.translation import ugettext
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import User
@@ -10,19 +11,132 @@ from django.core.exceptions import PermissionDenied
 from django.core.urlresolvers import reverse
 from django.db.models import Q
 
-from common.models import AnonymousUserSingleton
-from permissions.models import Permission, RoleMember
+from common.utils import insert_rows
+from permissions.models import Permission
 
 from .classes import AccessHolder, ClassAccessHolder, get_source_object
+from .literals import BULK_BATCH_SIZE
+from .runtime import access_resolver
+from .signals import access_entries_changed
 
 logger = logging.getLogger(__name__)
 
+# Types of the fields that can be compared in the database with the
+# object_id of the access entries
+INTEGER_FIELD_TYPES = ['AutoField', 'BigIntegerField', 'ForeignKey', 'IntegerField', 'PositiveIntegerField', 'PositiveSmallIntegerField', 'SmallIntegerField']
 
-class AccessEntryManager(models.Manager):
+
+class BulkEntryManagerMixin(object):
+    """
+    Grant and revoke many entries with a few set based queries instead
+    of a get_or_create or a delete per entry.  Entries are identified by
+    a key tuple with the values of key_fields, the last field varies
+    the most between the entries of a bulk operation
+    """
+    key_fields = ()
+
+    def get_stored_permission(self, permission):
+        if isinstance(permission, Permission):
+            return permission.get_stored_permission()
+        else:
+            return permission
+
+    def get_existing_entries(self, keys):
+        """
+        Return a dictionary of the primary keys of the stored entries
+        with the given keys
+        """
+        groups = {}
+        for key in keys:
+            groups.setdefault(key[:-1], set()).add(key[-1])
+
+        existing = {}
+        for group, values in groups.items():
+            values = list(values)
+            filters = dict(zip(self.key_fields[:-1], group))
+            for index in range(0, len(values), BULK_BATCH_SIZE):
+                filters['%s__in' % self.key_fields[-1]] = values[index:index + BULK_BATCH_SIZE]
+                for row in self.model.objects.filter(**filters).values_list('pk', *self.key_fields):
+                    existing[tuple(row[1:])] = row[0]
+
+        return existing
+
+    def insert_entries(self, keys):
+        insert_rows(self.model, self.key_fields, keys, batch_size=BULK_BATCH_SIZE)
+
+    def delete_entries(self, entry_ids):
+        qn = connection.ops.quote_name
+        cursor = connection.cursor()
+        for index in range(0, len(entry_ids), BULK_BATCH_SIZE):
+            batch = entry_ids[index:index + BULK_BATCH_SIZE]
+            cursor.execute(
+                'DELETE FROM %s WHERE %s IN (%s)' % (qn(self.model._meta.db_table), qn(self.model._meta.pk.column), u', '.join([u'%s'] * len(batch))),
+                batch
+            )
+        transaction.commit_unless_managed()
+
+    def bulk_grant(self, entries):
+        """
+        Grant each (permission, actor, object) entry, returns a list
+        telling, in the order of the entries, whether each one was
+        granted or was already held
+        """
+        keys = [self.get_entry_key(*entry) for entry in entries]
+        existing = self.get_existing_entries(keys)
+
+        created = []
+        new_keys = []
+        for key in keys:
+            if key in existing:
+                created.append(False)
+            else:
+                created.append(True)
+                # Repeated entries are only inserted once
+                existing[key] = None
+                new_keys.append(key)
+
+        if new_keys:
+            self.insert_entries(new_keys)
+            access_entries_changed.send(sender=self.model)
+
+        return created
+
+    def bulk_revoke(self, entries):
+        """
+        Revoke each (permission, actor, object) entry, returns a list
+        telling, in the order of the entries, whether each one was
+        revoked or wasn't held
+        """
+        keys = [self.get_entry_key(*entry) for entry in entries]
+        existing = self.get_existing_entries(keys)
+
+        revoked = []
+        entry_ids = []
+        for key in keys:
+            entry_id = existing.pop(key, None)
+            revoked.append(entry_id is not None)
+            if entry_id is not None:
+                entry_ids.append(entry_id)
+
+        if entry_ids:
+            self.delete_entries(entry_ids)
+            access_entries_changed.send(sender=self.model)
+
+        return revoked
+
+
+class AccessEntryManager(BulkEntryManagerMixin, models.Manager):
     """
     Implement a 3 tier permission system, involving a permissions, an actor
     and an object
     """
+    key_fields = ('permission', 'holder_type', 'holder_id', 'content_type', 'object_id')
+
+    def get_entry_key(self, permission, actor, obj):
+        obj = get_source_object(obj)
+        actor = get_source_object(actor)
+        return (self.get_stored_permission(permission).pk, ContentType.objects.get_for_model(actor).pk, actor.pk, ContentType.objects.get_for_model(obj).pk, obj.pk)
+
     def grant(self, permission, actor, obj):
         """
         Grant a permission (what), (to) an actor, (on) a specific object
@@ -73,39 +187,15 @@ class AccessEntryManager(models.Manager):
             if actor.is_superuser or actor.is_staff:
                 return True
 
-        actor = AnonymousUserSingleton.objects.passthru_check(actor)
         try:
-            content_type=ContentType.objects.get_for_model(obj)
+            content_type = ContentType.objects.get_for_model(obj)
         except AttributeError:
             # Object doesn't have a content type, therefore allow access
             return True
 
-        try:
-            self.model.objects.get(
-                permission=permission.get_stored_permission(),
-                holder_type=ContentType.objects.get_for_model(actor),
-                holder_id=actor.pk,
-                content_type=content_type,
-                object_id=obj.pk
-            )
-        except self.model.DoesNotExist:
-            # If not check if the actor's memberships is one of
-            # the access's holder?
-            roles = RoleMember.objects.get_roles_for_member(actor)
-
-            if isinstance(actor, User):
-                groups = actor.groups.all()
-            else:
-                groups = []
-
-            for membership in list(set(roles) | set(groups)):
-                if self.has_access(permission, membership, obj, db_only):
-                    return True
-
-            logger.debug('Fallthru')
-            return False
-        else:
-            return True
+        # The access entries of the actor and of its memberships are read
+        # once and answered from memory afterwards
+        return obj.pk in access_resolver.get_object_ids(permission.get_stored_permission(), actor, content_type)
 
     def check_access(self, permission, actor, obj):
         # TODO: Merge with has_access
@@ -129,54 +219,47 @@ class AccessEntryManager(models.Manager):
 
         raise PermissionDenied(ugettext(u'Insufficient access.'))
 
-    def get_allowed_class_objects(self, permission, actor, cls, related=None):
-        logger.debug('related: %s' % related)
-
-        actor = AnonymousUserSingleton.objects.passthru_check(actor)
-        actor_type = ContentType.objects.get_for_model(actor)
-        content_type = ContentType.objects.get_for_model(cls)
-
-        # Calculate actor role membership ACL query
-        total_queries = Q()
-        for role in RoleMember.objects.get_roles_for_member(actor):
-            role_type = ContentType.objects.get_for_model(role)
-            if related:
-                query = Q(holder_type=role_type, holder_id=role.pk, permission=permission.get_stored_permission)
-            else:
-                query = Q(holder_type=role_type, holder_id=role.pk, content_type=content_type, permission=permission.get_stored_permission)
-            if not total_queries:
-                total_queries = query
-            else:
-                total_queries = total_queries | query
+    def get_holder_entries(self, permission, actor):
+        """
+        Return a QuerySet of the access entries granting a permission to
+        the actor or to any of its memberships
+        """
+        holder_query = reduce(operator.or_, [Q(holder_type=holder_type_id, holder_id=holder_id) for holder_type_id, holder_id in access_resolver.get_holders(actor)])
+        return self.model.objects.filter(holder_query, permission=permission.get_stored_permission())
 
-        # Calculate actor group membership ACL query
-        if isinstance(actor, User):
-            groups = actor.groups.all()
-        else:
-            groups = []
+    def get_access_query(self, permission, actor, cls, related=None):
+        """
+        Return a Q object that selects the objects of cls for which the
+        actor holds a permission, or for which it holds the permission on
+        the object referenced by the related field, as subqueries of the
+        access entries
+        """
+        entries = self.get_holder_entries(permission, actor)
+
+        if not related:
+            return Q(pk__in=entries.filter(content_type=ContentType.objects.get_for_model(cls)).values('object_id'))
+
+        for field in cls._meta.virtual_fields:
+            if field.name == related:
+                # Generic foreign key, the related objects can be of any
+                # content type
+                fk_field = cls._meta.get_field(field.fk_field)
+                total_queries = Q(pk__in=[])
+                for content_type_id in entries.values_list('content_type', flat=True).order_by().distinct():
+                    object_ids = entries.filter(content_type=content_type_id).values('object_id')
+                    if fk_field.get_internal_type() not in INTEGER_FIELD_TYPES:
+                        # Like the object_pk text field of the comments,
+                        # can't be compared with object_id in the database
+                        object_ids = [unicode(object_id) for object_id in object_ids.values_list('object_id', flat=True)]
+                    total_queries = total_queries | Q(**{field.ct_field: content_type_id, '%s__in' % field.fk_field: object_ids})
+                return total_queries
+
+        related_model = cls._meta.get_field(related).rel.to
+        return Q(**{'%s__in' % related: entries.filter(content_type=ContentType.objects.get_for_model(related_model)).values('object_id')})
 
-        for group in groups:
-            group_type = ContentType.objects.get_for_model(group)
-            if related:
-                query = Q(holder_type=group_type, holder_id=group.pk, permission=permission.get_stored_permission)
-            else:
-                query = Q(holder_type=group_type, holder_id=group.pk, content_type=content_type, permission=permission.get_stored_permission)
-            if not total_queries:
-                total_queries = query
-            else:
-                total_queries = total_queries | query
-
-        if related:
-            actor_query = Q(holder_type=actor_type, holder_id=actor.pk, permission=permission.get_stored_permission)
-            master_list = [obj.content_object for obj in self.model.objects.select_related().filter(actor_query | total_queries)]
-            logger.debug('master_list: %s' % master_list)
-            # TODO: update to use Q objects and check performance diff
-            # kwargs = {'%s__in' % related: master_list}
-            # Q(**kwargs)
-            return (obj for obj in cls.objects.all() if getattr(obj, related) in master_list)
-        else:
-            actor_query = Q(holder_type=actor_type, holder_id=actor.pk, content_type=content_type, permission=permission.get_stored_permission)
-            return (obj.content_object for obj in self.model.objects.filter(actor_query | total_queries))
+    def get_allowed_class_objects(self, permission, actor, cls, related=None):
+        logger.debug('related: %s' % related)
+        return cls.objects.filter(self.get_access_query(permission, actor, cls, related))
 
     def get_acl_url(self, obj):
         content_type = ContentType.objects.get_for_model(obj)
@@ -221,46 +304,50 @@ class AccessEntryManager(models.Manager):
         whether the actor holds the specified permission
         """
         logger.debug('exception_on_empty: %s' % exception_on_empty)
-        logger.debug('object_list: %s' % object_list)
 
         if isinstance(actor, User):
             if actor.is_superuser or actor.is_staff:
                 return object_list
 
         try:
-            if object_list.count() == 0:
-                return object_list
-        except TypeError:
-            # object_list is not a queryset
+            model = object_list.model
+        except AttributeError:
+            # Fallback to a filtered list
             if len(object_list) == 0:
                 return object_list
 
-        try:
-            # Try to process as a QuerySet
-            qs = object_list.filter(pk__in=[obj.pk for obj in self.get_allowed_class_objects(permission, actor, object_list[0].__class__, related)])
-            logger.debug('qs: %s' % qs)
-
-            if qs.count() == 0 and exception_on_empty == True:
-                raise PermissionDenied
-
-            return qs
-        except AttributeError:
-            # Fallback to a filtered list
-            object_list = list(set(object_list) & set(self.get_allowed_class_objects(permission, actor, object_list[0].__class__, related)))
+            allowed_pks = set(self.get_allowed_class_objects(permission, actor, object_list[0].__class__, related).filter(pk__in=[obj.pk for obj in object_list]).values_list('pk', flat=True))
+            object_list = [obj for obj in object_list if obj.pk in allowed_pks]
             logger.debug('object_list: %s' % object_list)
             if len(object_list) == 0 and exception_on_empty == True:
                 raise PermissionDenied
 
             return object_list
+        else:
+            # Filter the QuerySet in the database with a subquery of the
+            # access entries
+            qs = object_list.filter(self.get_access_query(permission, actor, model, related))
+
+            if exception_on_empty == True and not qs.exists() and object_list.exists():
+                raise PermissionDenied
+
+            return qs
 
 
-class DefaultAccessEntryManager(models.Manager):
+class DefaultAccessEntryManager(BulkEntryManagerMixin, models.Manager):
     """
     Implement a 3 tier permission system, involving a permission, an actor
     and a class or content type.  This model keeps track of the access
     control lists that will be added when an instance of the recorded
     content type is created.
     """
+    key_fields = ('permission', 'holder_type', 'holder_id', 'content_type')
+
+    def get_entry_key(self, permission, actor, cls):
+        cls = get_source_object(cls)
+        actor = get_source_object(actor)
+        return (self.get_stored_permission(permission).pk, ContentType.objects.get_for_model(actor).pk, actor.pk, ContentType.objects.get_for_model(cls).pk)
+
     def get_holders_for(self, cls):
         cls = get_source_object(cls)
         content_type = ContentType.objects.get_for_model(cls)
@@ -0,0 +1,68 @@
+from __future__ import absolute_import
+
+import logging
+import operator
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.loading import get_model
+
+from common.generation import GenerationCache
+from permissions.runtime import permission_evaluator
+
+from .literals import RESOLVER_LOCAL_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class AccessResolver(GenerationCache):
+    """
+    Resolve the access of an actor from memory.  The primary keys of the
+    objects that the actor and the holders it inherits access from (its
+    groups and roles and the roles of its groups, as computed by the
+    permission evaluator) can access are read with a single query per
+    permission and content type.  The results are kept until the end of
+    the request, or for timeout seconds in the Django cache when a
+    timeout is given.  Changes to the access entries or the memberships
+    increase the generation, making the results of all the processes
+    stale.
+    """
+    def __init__(self, timeout=0):
+        super(AccessResolver, self).__init__(u'acls_resolver_generation', RESOLVER_LOCAL_TIMEOUT)
+        self.timeout = timeout
+
+    def initialize_local(self, local):
+        local.object_ids = {}
+
+    def get_holders(self, actor):
+        """
+        Return the (content type id, primary key) pairs of the actor and
+        of all its memberships
+        """
+        return permission_evaluator.get_holders(actor)
+
+    def get_object_ids(self, stored_permission, actor, content_type):
+        """
+        Return the set of the primary keys of the objects of a content
+        type for which the actor, directly or through its memberships,
+        holds a permission
+        """
+        holders = self.get_holders(actor)
+        local = self.get_local()
+        key = (holders[0], stored_permission.pk, content_type.pk)
+
+        try:
+            return local.object_ids[key]
+        except KeyError:
+            pass
+
+        cache_key = u'acls_resolver_%s_%d_%d_%d_%d' % ((local.generation,) + holders[0] + (stored_permission.pk, content_type.pk))
+        object_ids = cache.get(cache_key) if self.timeout else None
+        if object_ids is None:
+            holder_query = reduce(operator.or_, [Q(holder_type=holder_type_id, holder_id=holder_id) for holder_type_id, holder_id in holders])
+            object_ids = frozenset(get_model('acls', 'AccessEntry').objects.filter(holder_query, permission=stored_permission, content_type=content_type).values_list('object_id', flat=True))
+            if self.timeout:
+                cache.set(cache_key, object_ids, self.timeout)
+
+        local.object_ids[key] = object_ids
+        return object_ids
@@ -0,0 +1,6 @@
+from __future__ import absolute_import
+
+from .conf.settings import RESOLVER_CACHE_TIMEOUT
+from .resolver import AccessResolver
+
+access_resolver = AccessResolver(timeout=RESOLVER_CACHE_TIMEOUT)
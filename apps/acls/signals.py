@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by the bulk operations of the access entry managers, which don't
+# send the post_save and post_delete signals of each entry
+access_entries_changed = Signal()
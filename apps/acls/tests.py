@@ -0,0 +1,103 @@
+from __future__ import absolute_import
+
+from django.contrib.auth.models import User, Group
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from permissions.models import Permission, PermissionNamespace, Role, RoleMember
+
+from .models import AccessEntry
+from .runtime import access_resolver
+
+
+def recursive_has_access(permission, actor, obj):
+    """
+    The access check as it was done before the resolver, following the
+    memberships of the actor one query at a time
+    """
+    if AccessEntry.objects.filter(
+        permission=permission.get_stored_permission(),
+        holder_type=ContentType.objects.get_for_model(actor),
+        holder_id=actor.pk,
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk
+    ).exists():
+        return True
+
+    memberships = list(RoleMember.objects.get_roles_for_member(actor))
+    if isinstance(actor, User):
+        memberships.extend(actor.groups.all())
+
+    for membership in set(memberships):
+        if recursive_has_access(permission, membership, obj):
+            return True
+
+    return False
+
+
+class AccessResolverTestCase(TestCase):
+    def setUp(self):
+        namespace = PermissionNamespace('test_resolver', u'test resolver')
+        self.permissions = [
+            Permission.objects.register(namespace, 'edit', u'edit'),
+            Permission.objects.register(namespace, 'read', u'read'),
+        ]
+        edit, read = self.permissions
+
+        self.editors = Group.objects.create(name='editors')
+        self.managers = Role.objects.create(name='managers', label=u'managers')
+
+        self.alice = User.objects.create(username='alice')
+        self.bob = User.objects.create(username='bob')
+        self.carol = User.objects.create(username='carol')
+        self.users = [self.alice, self.bob, self.carol]
+
+        # The protected objects, any model will do
+        self.objects = [Group.objects.create(name='object %d' % index) for index in range(3)]
+        first, second, third = self.objects
+
+        # alice through the editors group and its managers role, bob
+        # directly and through the managers role, carol has no access
+        self.alice.groups.add(self.editors)
+        self.managers.add_member(self.editors)
+        self.managers.add_member(self.bob)
+
+        AccessEntry.objects.bulk_grant([
+            (edit, self.managers, first),
+            (read, self.editors, second),
+            (read, self.bob, third),
+            (edit, self.bob, third),
+        ])
+
+        access_resolver.clear()
+
+    def check_against_recursive(self):
+        for user in self.users:
+            for permission in self.permissions:
+                for obj in self.objects:
+                    self.failUnlessEqual(
+                        AccessEntry.objects.has_access(permission, user, obj, db_only=True),
+                        recursive_has_access(permission, user, obj),
+                        u'%s, %s, %s' % (user, permission.name, obj)
+                    )
+
+                self.failUnlessEqual(
+                    set(AccessEntry.objects.filter_objects_by_access(permission, user, Group.objects.filter(pk__in=[obj.pk for obj in self.objects]))),
+                    set([obj for obj in self.objects if recursive_has_access(permission, user, obj)]),
+                    u'%s, %s' % (user, permission.name)
+                )
+
+    def test_recursive_results(self):
+        self.check_against_recursive()
+
+    def test_changes(self):
+        self.check_against_recursive()
+
+        self.managers.remove_member(self.editors)
+        self.carol.groups.add(self.editors)
+        AccessEntry.objects.bulk_revoke([(self.permissions[1], self.bob, self.objects[2])])
+        AccessEntry.objects.bulk_grant([(self.permissions[1], self.carol, self.objects[0])])
+
+        self.check_against_recursive()
+        self.failUnlessEqual(AccessEntry.objects.has_access(self.permissions[0], self.alice, self.objects[0], db_only=True), False)
+        self.failUnlessEqual(AccessEntry.objects.has_access(self.permissions[1], self.carol, self.objects[1], db_only=True), True)
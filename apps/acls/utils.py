@@ -13,22 +13,30 @@ logger = logging.getLogger(__name__)
 
 
 def apply_default_acls(obj, actor=None):
+    """
+    Grant the default access entries of the class of an object, or of a
+    list of objects of the same class, with a single bulk operation
+    """
     logger.debug('actor, init: %s' % actor)
-    obj = get_source_object(obj)
+    if isinstance(obj, (list, tuple)):
+        objects = [get_source_object(item) for item in obj]
+    else:
+        objects = [get_source_object(obj)]
+
+    if not objects:
+        return
 
     if actor:
         actor = AnonymousUserSingleton.objects.passthru_check(actor)
 
-    content_type = ContentType.objects.get_for_model(obj)
+    content_type = ContentType.objects.get_for_model(objects[0])
 
+    entries = []
     for default_acl in DefaultAccessEntry.objects.filter(content_type=content_type):
         holder = CreatorSingleton.objects.passthru_check(default_acl.holder_object, actor)
 
         if holder:
             # When the creator is admin
-            access_entry = AccessEntry(
-                permission=default_acl.permission,
-                holder_object=holder,
-                content_object=obj,
-            )
-            access_entry.save()
+            entries.extend([(default_acl.permission, holder, item) for item in objects])
+
+    AccessEntry.objects.bulk_grant(entries)
@@ -191,21 +191,25 @@ def acl_grant(request):
         title_prefix = _(u'Are you sure you wish to grant the permissions %(title_suffix)s?')
 
     if request.method == 'POST':
+        entries = []
         for requester, object_permissions in items.items():
             for obj, permissions in object_permissions.items():
-                for permission in permissions:
-                    if AccessEntry.objects.grant(permission, requester.source_object, obj.source_object):
-                        messages.success(request, _(u'Permission "%(permission)s" granted to %(actor)s for %(object)s.') % {
-                            'permission': permission,
-                            'actor': requester,
-                            'object': obj
-                        })
-                    else:
-                        messages.warning(request, _(u'%(actor)s, already had the permission "%(permission)s" granted for %(object)s.') % {
-                            'actor': requester,
-                            'permission': permission,
-                            'object': obj,
-                        })
+                entries.extend([(requester, obj, permission) for permission in permissions])
+
+        results = AccessEntry.objects.bulk_grant([(permission, requester.source_object, obj.source_object) for requester, obj, permission in entries])
+        for (requester, obj, permission), granted in zip(entries, results):
+            if granted:
+                messages.success(request, _(u'Permission "%(permission)s" granted to %(actor)s for %(object)s.') % {
+                    'permission': permission,
+                    'actor': requester,
+                    'object': obj
+                })
+            else:
+                messages.warning(request, _(u'%(actor)s, already had the permission "%(permission)s" granted for %(object)s.') % {
+                    'actor': requester,
+                    'permission': permission,
+                    'object': obj,
+                })
 
         return HttpResponseRedirect(next)
 
@@ -284,21 +288,25 @@ def acl_revoke(request):
         title_prefix = _(u'Are you sure you wish to revoke the permissions %(title_suffix)s?')
 
     if request.method == 'POST':
+        entries = []
         for requester, object_permissions in items.items():
             for obj, permissions in object_permissions.items():
-                for permission in permissions:
-                    if AccessEntry.objects.revoke(permission, requester.source_object, obj.source_object):
-                        messages.success(request, _(u'Permission "%(permission)s" revoked of %(actor)s for %(object)s.') % {
-                            'permission': permission,
-                            'actor': requester,
-                            'object': obj
-                        })
-                    else:
-                        messages.warning(request, _(u'%(actor)s, didn\'t had the permission "%(permission)s" for %(object)s.') % {
-                            'actor': requester,
-                            'permission': permission,
-                            'object': obj,
-                        })
+                entries.extend([(requester, obj, permission) for permission in permissions])
+
+        results = AccessEntry.objects.bulk_revoke([(permission, requester.source_object, obj.source_object) for requester, obj, permission in entries])
+        for (requester, obj, permission), revoked in zip(entries, results):
+            if revoked:
+                messages.success(request, _(u'Permission "%(permission)s" revoked of %(actor)s for %(object)s.') % {
+                    'permission': permission,
+                    'actor': requester,
+                    'object': obj
+                })
+            else:
+                messages.warning(request, _(u'%(actor)s, didn\'t had the permission "%(permission)s" for %(object)s.') % {
+                    'actor': requester,
+                    'permission': permission,
+                    'object': obj,
+                })
 
         return HttpResponseRedirect(next)
 
@@ -532,21 +540,25 @@ def acl_class_multiple_grant(request):
         title_prefix = _(u'Are you sure you wish to grant the permissions %(title_suffix)s?')
 
     if request.method == 'POST':
+        entries = []
         for requester, object_permissions in items.items():
             for obj, permissions in object_permissions.items():
-                for permission in permissions:
-                    if DefaultAccessEntry.objects.grant(permission, requester.source_object, obj.source_object):
-                        messages.success(request, _(u'Permission "%(permission)s" granted to %(actor)s for %(object)s.') % {
-                            'permission': permission,
-                            'actor': requester,
-                            'object': obj
-                        })
-                    else:
-                        messages.warning(request, _(u'%(actor)s, already had the permission "%(permission)s" granted for %(object)s.') % {
-                            'actor': requester,
-                            'permission': permission,
-                            'object': obj,
-                        })
+                entries.extend([(requester, obj, permission) for permission in permissions])
+
+        results = DefaultAccessEntry.objects.bulk_grant([(permission, requester.source_object, obj.source_object) for requester, obj, permission in entries])
+        for (requester, obj, permission), granted in zip(entries, results):
+            if granted:
+                messages.success(request, _(u'Permission "%(permission)s" granted to %(actor)s for %(object)s.') % {
+                    'permission': permission,
+                    'actor': requester,
+                    'object': obj
+                })
+            else:
+                messages.warning(request, _(u'%(actor)s, already had the permission "%(permission)s" granted for %(object)s.') % {
+                    'actor': requester,
+                    'permission': permission,
+                    'object': obj,
+                })
 
         return HttpResponseRedirect(next)
 
@@ -611,21 +623,25 @@ def acl_class_multiple_revoke(request):
         title_prefix = _(u'Are you sure you wish to revoke the permissions %(title_suffix)s?')
 
     if request.method == 'POST':
+        entries = []
         for requester, object_permissions in items.items():
             for obj, permissions in object_permissions.items():
-                for permission in permissions:
-                    if DefaultAccessEntry.objects.revoke(permission, requester.source_object, obj.source_object):
-                        messages.success(request, _(u'Permission "%(permission)s" revoked of %(actor)s for %(object)s.') % {
-                            'permission': permission,
-                            'actor': requester,
-                            'object': obj
-                        })
-                    else:
-                        messages.warning(request, _(u'%(actor)s, didn\'t had the permission "%(permission)s" for %(object)s.') % {
-                            'actor': requester,
-                            'permission': permission,
-                            'object': obj,
-                        })
+                entries.extend([(requester, obj, permission) for permission in permissions])
+
+        results = DefaultAccessEntry.objects.bulk_revoke([(permission, requester.source_object, obj.source_object) for requester, obj, permission in entries])
+        for (requester, obj, permission), revoked in zip(entries, results):
+            if revoked:
+                messages.success(request, _(u'Permission "%(permission)s" revoked of %(actor)s for %(object)s.') % {
+                    'permission': permission,
+                    'actor': requester,
+                    'object': obj
+                })
+            else:
+                messages.warning(request, _(u'%(actor)s, didn\'t had the permission "%(permission)s" for %(object)s.') % {
+                    'actor': requester,
+                    'permission': permission,
+                    'object': obj,
+                })
 
         return HttpResponseRedirect(next)
 
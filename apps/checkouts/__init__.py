@@ -4,7 +4,7 @@ from django.utils.translation import ugettext_lazy as _
 
 from navigation.api import (register_links, register_top_menu,
     register_multi_item_links, register_sidebar_template)
-from scheduler.api import register_interval_job
+from job_processor.api import register_periodic_job
 
 from documents.models import Document
 from documents.permissions import PERMISSION_DOCUMENT_VIEW
@@ -40,7 +40,7 @@ class_permissions(Document, [
 ])
 
 CHECK_EXPIRED_CHECK_OUTS_INTERVAL=60  # Lowest check out expiration allowed
-register_interval_job('task_check_expired_check_outs', _(u'Check expired check out documents and checks them in.'), task_check_expired_check_outs, seconds=CHECK_EXPIRED_CHECK_OUTS_INTERVAL)
+register_periodic_job('task_check_expired_check_outs', _(u'Check expired check out documents and checks them in.'), task_check_expired_check_outs, seconds=CHECK_EXPIRED_CHECK_OUTS_INTERVAL)
 initialize_document_checkout_extra_methods()
 register_history_type(HISTORY_DOCUMENT_CHECKED_OUT)
 register_history_type(HISTORY_DOCUMENT_CHECKED_IN)
@@ -1,3 +1,5 @@
+import datetime
+import struct
 import zipfile
 
 try:
@@ -13,6 +15,36 @@ except ImportError:
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+# File formats that are already compressed and gain nothing from deflate
+COMPRESSED_MIMETYPES = [
+    'application/zip',
+    'application/x-gzip',
+    'application/x-bzip2',
+    'application/x-rar',
+    'application/x-7z-compressed',
+    'image/jpeg',
+    'image/png',
+    'image/gif',
+    'video/mpeg',
+    'video/mp4',
+    'audio/mpeg',
+]
+
+ZIP_CHUNK_SIZE = 64 * 1024
+ZIP_MAXIMUM_32 = 0xFFFFFFFF
+ZIP_MAXIMUM_16 = 0xFFFF
+# Bit 3: sizes and CRC follow the data, bit 11: UTF-8 filenames
+ZIP_FLAGS = 0x08 | 0x800
+ZIP_VERSION = 20
+ZIP64_VERSION = 45
+
+ZIP_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+ZIP_DATA_DESCRIPTOR = struct.Struct('<4s3L')
+ZIP_CENTRAL_DIRECTORY = struct.Struct('<4s4B4HL2L5H2L')
+ZIP_END_CENTRAL_DIRECTORY = struct.Struct('<4s4H2LH')
+ZIP64_END_CENTRAL_DIRECTORY = struct.Struct('<4sQ2H2L4Q')
+ZIP64_END_CENTRAL_DIRECTORY_LOCATOR = struct.Struct('<4sLQL')
+
 
 class NotACompressedFile(Exception):
     pass
@@ -82,3 +114,124 @@ class CompressedFile(object):
 
     def close(self):
         self.zf.close()
+
+
+class ZipStream(object):
+    """
+    Zip archive writer that generates the archive chunk by chunk while
+    reading the member files so that it can be sent as a streaming
+    response without holding the archive in memory or on disk
+    """
+    def __init__(self, chunk_size=ZIP_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.entries = []
+
+    def add_file(self, opener, arcname, compress=True, date_time=None):
+        """
+        Queue a member file, opener is a callable returning a file like
+        object and is only called when the member is being written
+        """
+        self.entries.append((opener, arcname, compress, date_time or datetime.datetime.now()))
+
+    def __iter__(self):
+        offset = 0
+        central_directory = []
+
+        for opener, arcname, compress, date_time in self.entries:
+            if isinstance(arcname, unicode):
+                filename = arcname.encode('utf-8')
+            else:
+                filename = arcname
+
+            if compress and COMPRESSION == zipfile.ZIP_DEFLATED:
+                compress_type = zipfile.ZIP_DEFLATED
+                compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            else:
+                compress_type = zipfile.ZIP_STORED
+                compressor = None
+
+            dos_time = date_time.hour << 11 | date_time.minute << 5 | date_time.second // 2
+            dos_date = (date_time.year - 1980) << 9 | date_time.month << 5 | date_time.day
+
+            header = ZIP_LOCAL_HEADER.pack(
+                zipfile.stringFileHeader, ZIP_VERSION, 0, ZIP_FLAGS,
+                compress_type, dos_time, dos_date, 0, 0, 0, len(filename), 0
+            ) + filename
+            header_offset = offset
+            offset += len(header)
+            yield header
+
+            crc = 0
+            file_size = 0
+            compress_size = 0
+            descriptor = opener()
+            try:
+                while True:
+                    data = descriptor.read(self.chunk_size)
+                    if not data:
+                        break
+                    crc = zlib.crc32(data, crc)
+                    file_size += len(data)
+                    if compressor:
+                        data = compressor.compress(data)
+                    if data:
+                        compress_size += len(data)
+                        yield data
+
+                if compressor:
+                    data = compressor.flush()
+                    compress_size += len(data)
+                    yield data
+            finally:
+                descriptor.close()
+
+            if file_size > ZIP_MAXIMUM_32 or compress_size > ZIP_MAXIMUM_32:
+                raise zipfile.LargeZipFile('Member file too large for a streamed zip archive: %s' % arcname)
+
+            crc = crc & ZIP_MAXIMUM_32
+            data_descriptor = ZIP_DATA_DESCRIPTOR.pack('PK\x07\x08', crc, compress_size, file_size)
+            offset += compress_size + len(data_descriptor)
+            yield data_descriptor
+
+            central_directory.append((filename, compress_type, dos_time, dos_date, crc, compress_size, file_size, header_offset))
+
+        central_directory_offset = offset
+        for filename, compress_type, dos_time, dos_date, crc, compress_size, file_size, header_offset in central_directory:
+            if header_offset > ZIP_MAXIMUM_32:
+                extra = struct.pack('<2HQ', 1, 8, header_offset)
+                header_offset = ZIP_MAXIMUM_32
+                version = ZIP64_VERSION
+            else:
+                extra = ''
+                version = ZIP_VERSION
+
+            # Create system 0 (MS-DOS) for Windows compatibility
+            record = ZIP_CENTRAL_DIRECTORY.pack(
+                zipfile.stringCentralDir, version, 0, version, 0, ZIP_FLAGS,
+                compress_type, dos_time, dos_date, crc, compress_size,
+                file_size, len(filename), len(extra), 0, 0, 0, 0,
+                header_offset
+            ) + filename + extra
+            offset += len(record)
+            yield record
+
+        central_directory_size = offset - central_directory_offset
+        entries = len(central_directory)
+
+        if central_directory_offset > ZIP_MAXIMUM_32 or central_directory_size > ZIP_MAXIMUM_32 or entries > ZIP_MAXIMUM_16:
+            yield ZIP64_END_CENTRAL_DIRECTORY.pack(
+                zipfile.stringEndArchive64, ZIP64_END_CENTRAL_DIRECTORY.size - 12,
+                ZIP64_VERSION, ZIP64_VERSION, 0, 0, entries, entries,
+                central_directory_size, central_directory_offset
+            )
+            yield ZIP64_END_CENTRAL_DIRECTORY_LOCATOR.pack(
+                zipfile.stringEndArchive64Locator, 0, offset, 1
+            )
+            entries = min(entries, ZIP_MAXIMUM_16)
+            central_directory_size = min(central_directory_size, ZIP_MAXIMUM_32)
+            central_directory_offset = min(central_directory_offset, ZIP_MAXIMUM_32)
+
+        yield ZIP_END_CENTRAL_DIRECTORY.pack(
+            zipfile.stringEndArchive, 0, 0, entries, entries,
+            central_directory_size, central_directory_offset, 0
+        )
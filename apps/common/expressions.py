@@ -0,0 +1,79 @@
+from __future__ import absolute_import
+
+import logging
+import threading
+
+from django.utils.translation import ugettext
+
+from .literals import EXPRESSION_CACHE_MAXIMUM_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+
+class ExpressionError(Exception):
+    """
+    An expression that couldn't be compiled or evaluated, keeps the
+    source of the expression and the reason of the failure
+    """
+    def __init__(self, expression, reason):
+        self.expression = expression
+        self.reason = reason
+        super(ExpressionError, self).__init__(expression, reason)
+
+    def __unicode__(self):
+        return ugettext(u'expression: %(expression)s; %(reason)s') % {
+            'expression': self.expression, 'reason': self.reason}
+
+    def __str__(self):
+        return self.__unicode__().encode('utf-8')
+
+
+class ExpressionCache(object):
+    """
+    Keep the code objects of the expressions entered by the users, such
+    as the index template nodes and the smart link conditions, so that
+    each one is parsed once per process instead of for every document.
+    Expressions are keyed by their source, editing an expression makes
+    it be compiled again
+    """
+    def __init__(self, maximum_entries=EXPRESSION_CACHE_MAXIMUM_ENTRIES):
+        self.maximum_entries = maximum_entries
+        self._code_objects = {}
+        self._lock = threading.Lock()
+
+    def compile(self, expression):
+        try:
+            return self._code_objects[expression]
+        except KeyError:
+            pass
+
+        try:
+            # Like eval, ignore the surrounding spaces and tabs
+            code_object = compile(expression.strip(u' \t'), u'<expression>', u'eval')
+        except SyntaxError, exc:
+            if exc.offset:
+                reason = ugettext(u'%(error)s at column %(column)d') % {'error': exc.msg, 'column': exc.offset}
+            else:
+                reason = exc.msg
+            raise ExpressionError(expression, reason)
+
+        self._lock.acquire()
+        try:
+            if len(self._code_objects) >= self.maximum_entries:
+                logger.debug('discarding %d compiled expressions' % len(self._code_objects))
+                self._code_objects.clear()
+            self._code_objects[expression] = code_object
+        finally:
+            self._lock.release()
+
+        return code_object
+
+    def evaluate(self, expression, globals_dict, locals_dict=None):
+        code_object = self.compile(expression)
+        try:
+            return eval(code_object, globals_dict, locals_dict)
+        except Exception, exc:
+            raise ExpressionError(expression, u'%s: %s' % (exc.__class__.__name__, exc))
+
+    def clear(self):
+        self._code_objects.clear()
@@ -0,0 +1,221 @@
+from __future__ import absolute_import
+
+import os
+import logging
+import threading
+
+from .models import CacheCounter
+from .utils import id_generator
+
+logger = logging.getLogger(__name__)
+
+TEMPORARY_SUFFIX = u'.tmp'
+COUNTER_NAMES = (u'hits', u'misses', u'writes', u'evictions')
+
+
+class FileCache(object):
+    """
+    Size bounded, sharded file store with least recently used eviction.
+    Entries are addressed by a hexadecimal key (usually a hash) and are
+    stored as <path>/<key[0:2]>/<key[2:4]>/<key>.  Reading an entry
+    updates its modification time which is then used as the recency
+    value when evicting entries.  Evicting requires walking the whole
+    tree, prune is called periodically by a job instead of when writing.
+    """
+    def __init__(self, name, path, maximum_size=None, maximum_entries=None, shard_levels=2, shard_width=2, counter_flush_frequency=100):
+        self.name = name
+        self.path = path
+        self.maximum_size = maximum_size
+        self.maximum_entries = maximum_entries
+        self.shard_levels = shard_levels
+        self.shard_width = shard_width
+        self.counter_flush_frequency = counter_flush_frequency
+        self._pending_counters = {}
+        self._pending_total = 0
+        self._counters_lock = threading.Lock()
+
+    def _get_path(self):
+        if callable(self.path):
+            return self.path()
+        else:
+            return self.path
+
+    def _increment(self, counter_name, delta=1):
+        """
+        Count in memory and add the counts to the counters stored in the
+        database, which are shared by all the processes, every
+        counter_flush_frequency increments
+        """
+        with self._counters_lock:
+            self._pending_counters[counter_name] = self._pending_counters.get(counter_name, 0) + delta
+            self._pending_total += delta
+            if self._pending_total < self.counter_flush_frequency:
+                return
+
+        self.flush_counters()
+
+    def flush_counters(self):
+        with self._counters_lock:
+            pending_counters = self._pending_counters
+            self._pending_counters = {}
+            self._pending_total = 0
+
+        for counter_name, delta in pending_counters.items():
+            CacheCounter.objects.increment(self.name, counter_name, delta)
+
+    def get_counters(self):
+        self.flush_counters()
+        counters = CacheCounter.objects.get_counters(self.name)
+        return dict([(counter_name, counters.get(counter_name, 0)) for counter_name in COUNTER_NAMES])
+
+    def reset_counters(self):
+        with self._counters_lock:
+            self._pending_counters = {}
+            self._pending_total = 0
+
+        CacheCounter.objects.filter(cache_name=self.name).delete()
+
+    def get_entry_path(self, key):
+        shards = [key[level * self.shard_width:(level + 1) * self.shard_width] for level in range(self.shard_levels)]
+        return os.path.join(self._get_path(), *(shards + [key]))
+
+    def get(self, key):
+        """
+        Return the path of the cached entry or None if the key is not
+        in the cache
+        """
+        entry_path = self.get_entry_path(key)
+        try:
+            # Mark the entry as recently used
+            os.utime(entry_path, None)
+        except OSError:
+            self._increment(u'misses')
+            return None
+        else:
+            self._increment(u'hits')
+            return entry_path
+
+    def contains(self, key):
+        """
+        Check if an entry is in the cache without counting it as an access
+        """
+        return os.path.exists(self.get_entry_path(key))
+
+    def get_or_create(self, key, creator):
+        """
+        Return the path of the cached entry, on a miss call creator with
+        a temporary filepath, which the creator must write, and then
+        atomically move the result into the cache
+        """
+        entry_path = self.get(key)
+        if entry_path:
+            return entry_path
+
+        temporary_path = self.get_temporary_path(key)
+        try:
+            creator(temporary_path)
+        except:
+            self._remove(temporary_path)
+            raise
+
+        return self.commit(key, temporary_path)
+
+    def get_temporary_path(self, key):
+        """
+        Return a unique filepath in the same shard directory as the final
+        entry so that it can be renamed into place atomically
+        """
+        entry_path = self.get_entry_path(key)
+        directory = os.path.dirname(entry_path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                # Created concurrently by another process
+                pass
+
+        return u''.join([entry_path, u'.', unicode(os.getpid()), u'.', id_generator(), TEMPORARY_SUFFIX])
+
+    def commit(self, key, temporary_path):
+        entry_path = self.get_entry_path(key)
+        os.rename(temporary_path, entry_path)
+        self._increment(u'writes')
+        return entry_path
+
+    def delete(self, key):
+        self._remove(self.get_entry_path(key))
+
+    def _remove(self, filepath):
+        try:
+            os.unlink(filepath)
+        except OSError:
+            pass
+
+    def entries(self):
+        """
+        Generate a (filepath, size, last access) tuple for every entry
+        in the cache
+        """
+        for dirpath, dirnames, filenames in os.walk(self._get_path()):
+            for filename in filenames:
+                if filename.endswith(TEMPORARY_SUFFIX):
+                    continue
+
+                filepath = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(filepath)
+                except OSError:
+                    # Deleted while walking the directory
+                    continue
+                else:
+                    yield filepath, stat.st_size, stat.st_mtime
+
+    def prune(self):
+        """
+        Evict the least recently used entries until the cache is within
+        its size and entry count budget
+        """
+        if not self.maximum_size and not self.maximum_entries:
+            return 0
+
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total_size = sum([entry[1] for entry in entries])
+        total_entries = len(entries)
+        evicted = 0
+
+        for filepath, size, last_access in entries:
+            over_size = self.maximum_size and total_size > self.maximum_size
+            over_count = self.maximum_entries and total_entries > self.maximum_entries
+            if not over_size and not over_count:
+                break
+
+            self._remove(filepath)
+            total_size -= size
+            total_entries -= 1
+            evicted += 1
+
+        if evicted:
+            logger.debug('%s: evicted %d entries' % (self.name, evicted))
+            self._increment(u'evictions', evicted)
+
+        return evicted
+
+    def clear(self):
+        for filepath, size, last_access in self.entries():
+            self._remove(filepath)
+
+    def get_statistics(self):
+        total_size = 0
+        total_entries = 0
+        for filepath, size, last_access in self.entries():
+            total_size += size
+            total_entries += 1
+
+        statistics = self.get_counters()
+        statistics.update({
+            'entries': total_entries,
+            'size': total_size,
+            'maximum_entries': self.maximum_entries,
+            'maximum_size': self.maximum_size,
+        })
+        return statistics
@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+
+import threading
+import time
+
+from django.core.cache import cache
+
+
+class Generation(object):
+    """
+    A number kept in the Django cache, shared with the other processes,
+    that identifies the current version of some cached results.
+    Increasing it makes all the results of previous generations stale
+    """
+    def __init__(self, key):
+        self.key = key
+
+    def get(self):
+        # Start from the current time instead of 0, if the value is lost
+        # the results of older generations must not become valid again
+        cache.add(self.key, int(time.time()))
+        return cache.get(self.key)
+
+    def increase(self):
+        try:
+            cache.incr(self.key)
+        except ValueError:
+            cache.set(self.key, int(time.time()))
+
+
+class GenerationCache(object):
+    """
+    Base class of the caches that keep results per thread, discarded when
+    the generation increases.  A thread reads the generation again after
+    local_timeout seconds, subclasses set up the attributes holding their
+    results in initialize_local
+    """
+    def __init__(self, generation_key, local_timeout):
+        self.generation = Generation(generation_key)
+        self.local_timeout = local_timeout
+        self._local = threading.local()
+
+    def get_generation(self):
+        return self.generation.get()
+
+    def invalidate(self):
+        """
+        Discard the results of every process
+        """
+        self.generation.increase()
+        self.clear()
+
+    def clear(self):
+        """
+        Discard the results of this thread, called when a request starts
+        """
+        self._local.__dict__.clear()
+
+    def get_local(self):
+        if getattr(self._local, 'expiration', None) and self._local.expiration < time.time():
+            self.clear()
+
+        if not hasattr(self._local, 'generation'):
+            self._local.generation = self.get_generation()
+            self._local.expiration = time.time() + self.local_timeout
+            self.initialize_local(self._local)
+
+        return self._local
+
+    def initialize_local(self, local):
+        pass
@@ -38,3 +38,12 @@ PAGE_ORIENTATION_CHOICES = (
     (PAGE_ORIENTATION_PORTRAIT, _(u'Portrait')),
     (PAGE_ORIENTATION_LANDSCAPE, _(u'Landscape')),
 )
+
+# Amount of compiled expressions kept in memory by each process
+EXPRESSION_CACHE_MAXIMUM_ENTRIES = 1000
+
+# Default amount of rows inserted with a single statement by insert_rows
+BULK_BATCH_SIZE = 500
+
+# Default SQLite limit of the amount of parameters of a statement
+SQLITE_MAXIMUM_PARAMETERS = 999
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F
 from django.utils.translation import ugettext_lazy as _
 from django.utils.translation import ugettext
 from django.contrib.auth.models import AnonymousUser
@@ -56,3 +57,48 @@ class AutoAdminSingleton(Singleton):
 
     class Meta:
         verbose_name = verbose_name_plural = _(u'auto admin properties')
+
+
+class CacheCounterManager(models.Manager):
+    def increment(self, cache_name, counter_name, delta):
+        """
+        Add to a counter in the database, other processes update the same
+        row.  The unique index rejects a counter created at the same time
+        by another process, it is then updated instead
+        """
+        counters = self.model.objects.filter(cache_name=cache_name, counter_name=counter_name)
+        if counters.update(value=F('value') + delta):
+            return
+
+        sid = transaction.savepoint()
+        try:
+            self.model.objects.create(cache_name=cache_name, counter_name=counter_name, value=delta)
+        except IntegrityError:
+            # Don't leave the transaction aborted on PostgreSQL
+            transaction.savepoint_rollback(sid)
+            transaction.rollback_unless_managed()
+            counters.update(value=F('value') + delta)
+        else:
+            transaction.savepoint_commit(sid)
+
+    def get_counters(self, cache_name):
+        return dict(self.model.objects.filter(cache_name=cache_name).values_list('counter_name', 'value'))
+
+
+class CacheCounter(models.Model):
+    """
+    Usage counter of a cache shared by all the processes
+    """
+    cache_name = models.CharField(max_length=64, verbose_name=_(u'cache name'))
+    counter_name = models.CharField(max_length=32, verbose_name=_(u'counter name'))
+    value = models.PositiveIntegerField(default=0, verbose_name=_(u'value'))
+
+    objects = CacheCounterManager()
+
+    def __unicode__(self):
+        return u'%s: %s' % (self.cache_name, self.counter_name)
+
+    class Meta:
+        unique_together = ('cache_name', 'counter_name')
+        verbose_name = _(u'cache counter')
+        verbose_name_plural = _(u'cache counters')
@@ -12,10 +12,13 @@ from django.utils.http import urlquote  as django_urlquote
 from django.utils.http import urlencode as django_urlencode
 from django.utils.datastructures import MultiValueDict
 from django.conf import settings
+from django.db import connection, transaction
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import User
 
+from .literals import BULK_BATCH_SIZE, SQLITE_MAXIMUM_PARAMETERS
+
 
 def urlquote(link=None, get=None):
     u"""
@@ -427,3 +430,26 @@ def copyfile(source, destination, buffer_size=1024 * 1024):
 
     source_descriptor.close()
     destination_descriptor.close()
+
+
+def insert_rows(model, field_names, rows, batch_size=BULK_BATCH_SIZE):
+    """
+    Insert the rows of values of the given fields with a single multi row
+    INSERT statement per batch_size rows, no instances are created and no
+    signals sent
+    """
+    if connection.vendor == 'sqlite':
+        # SQLite limits the amount of parameters of a statement
+        batch_size = max(min(batch_size, SQLITE_MAXIMUM_PARAMETERS // len(field_names)), 1)
+
+    qn = connection.ops.quote_name
+    columns = [model._meta.get_field(field_name).column for field_name in field_names]
+    placeholders = u'(%s)' % u', '.join([u'%s'] * len(columns))
+    cursor = connection.cursor()
+    for index in range(0, len(rows), batch_size):
+        batch = rows[index:index + batch_size]
+        cursor.execute(
+            'INSERT INTO %s (%s) VALUES %s' % (qn(model._meta.db_table), u', '.join([qn(column) for column in columns]), u', '.join([placeholders] * len(batch))),
+            [value for row in batch for value in row]
+        )
+    transaction.commit_unless_managed()
@@ -2,12 +2,19 @@ from __future__ import absolute_import
 
 from django.utils.translation import ugettext_lazy as _
 from django.core.exceptions import ImproperlyConfigured
+from django.dispatch import receiver
 
 from navigation.api import register_sidebar_template
 from project_tools.api import register_tool
+from job_processor.api import register_periodic_job
+from job_processor.literals import JOB_PRIORITY_LOW
+from job_processor.signals import worker_started
 
 from .utils import load_backend
 from .conf.settings import GRAPHICS_BACKEND
+from .runtime import office_converter
+from .office_converter import conversion_cache
+from .literals import CONVERSION_CACHE_PRUNE_INTERVAL
 
 def is_superuser(context):
     return context['request'].user.is_staff or context['request'].user.is_superuser
@@ -22,3 +29,13 @@ except ImproperlyConfigured:
     raise ImproperlyConfigured(u'Missing or incorrect converter backend: %s' % GRAPHICS_BACKEND)
 
 register_tool(formats_list)
+
+register_periodic_job('task_prune_conversion_cache', _(u'Remove the least recently used PDF conversions of office documents when their cache is full.'), conversion_cache.prune, seconds=CONVERSION_CACHE_PRUNE_INTERVAL, priority=JOB_PRIORITY_LOW)
+
+
+@receiver(worker_started, dispatch_uid='office_converter_use_pool')
+def office_converter_use_pool(sender, **kwargs):
+    # The job workers convert most office documents, the web processes
+    # don't keep libreoffice instances running
+    if office_converter:
+        office_converter.use_pool()
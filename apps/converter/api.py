@@ -39,7 +39,7 @@ def create_image_cache_filename(input_filepath, *args, **kwargs):
         return None
 
 
-def convert(input_filepath, output_filepath=None, cleanup_files=False, mimetype=None, *args, **kwargs):
+def convert(input_filepath, output_filepath=None, cleanup_files=False, mimetype=None, checksum=None, *args, **kwargs):
     size = kwargs.get('size')
     file_format = kwargs.get('file_format', DEFAULT_FILE_FORMAT)
     zoom = kwargs.get('zoom', DEFAULT_ZOOM_LEVEL)
@@ -56,18 +56,7 @@ def convert(input_filepath, output_filepath=None, cleanup_files=False, mimetype=
     if os.path.exists(output_filepath):
         return output_filepath
 
-    if office_converter:
-        try:
-            office_converter.convert(input_filepath, mimetype=mimetype)
-            if office_converter.exists:
-                input_filepath = office_converter.output_filepath
-                mimetype = 'application/pdf'
-            else:
-                # Recycle the already detected mimetype
-                mimetype = office_converter.mimetype
-
-        except OfficeConversionError:
-            raise UnknownFileFormat('office converter exception')
+    input_filepath, mimetype = convert_office_document(input_filepath, mimetype=mimetype, checksum=checksum)
 
     if size:
         transformations.append(
@@ -102,19 +91,41 @@ def convert(input_filepath, output_filepath=None, cleanup_files=False, mimetype=
     return output_filepath
 
 
-def get_page_count(input_filepath):
+def convert_document(input_filepath, output_directory, first_page=DEFAULT_PAGE_NUMBER, last_page=None, file_format=DEFAULT_FILE_FORMAT, mimetype=None, checksum=None):
+    """
+    Rasterize a range of pages of a document in a single pass, returns
+    the list of image filepaths created in output_directory in page order
+    """
+    input_filepath, mimetype = convert_office_document(input_filepath, mimetype=mimetype, checksum=checksum)
+
+    if last_page is None:
+        last_page = backend.get_page_count(input_filepath)
+
+    return backend.convert_document(input_filepath=input_filepath, output_directory=output_directory, first_page=first_page, last_page=last_page, file_format=file_format, mimetype=mimetype)
+
+
+def get_page_count(input_filepath, checksum=None, mimetype=None):
     logger.debug('office_converter: %s' % office_converter)
+    input_filepath, mimetype = convert_office_document(input_filepath, mimetype=mimetype, checksum=checksum)
+
+    return backend.get_page_count(input_filepath)
+
+
+def convert_office_document(input_filepath, mimetype=None, checksum=None):
+    """
+    Return the filepath and mimetype of the PDF conversion of an office
+    document or the unchanged filepath for other kinds of documents
+    """
     if office_converter:
         try:
-            office_converter.convert(input_filepath)
-            logger.debug('office_converter.exists: %s' % office_converter.exists)
-            if office_converter.exists:
-                input_filepath = office_converter.output_filepath
-
+            output_filepath = office_converter.convert(input_filepath, mimetype=mimetype, checksum=checksum)
         except OfficeConversionError:
             raise UnknownFileFormat('office converter exception')
 
-    return backend.get_page_count(input_filepath)
+        if output_filepath:
+            return output_filepath, 'application/pdf'
+
+    return input_filepath, mimetype
 
 '''
 def get_document_dimensions(document, *args, **kwargs):
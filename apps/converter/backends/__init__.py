@@ -1,3 +1,6 @@
+import os
+
+
 class ConverterBase(object):
     """
     Base class that all backend classes must inherit
@@ -5,8 +8,21 @@ class ConverterBase(object):
     def convert_file(self, input_filepath, *args, **kwargs):
         raise NotImplementedError("Your %s class has not defined a convert_file() method, which is required." % self.__class__.__name__)
 
-    def convert_document(self, document, *args, **kwargs):
-        raise NotImplementedError("Your %s class has not defined a convert_document() method, which is required." % self.__class__.__name__)
+    def convert_document(self, input_filepath, output_directory, first_page, last_page, *args, **kwargs):
+        """
+        Rasterize a range of pages into output_directory, one file per
+        page named after the page number, and return the list of the
+        filepaths created.  Backends that can render several pages in a
+        single pass should override this default which converts the
+        pages one by one
+        """
+        result = []
+        for page_number in range(first_page, last_page + 1):
+            output_filepath = os.path.join(output_directory, unicode(page_number))
+            self.convert_file(input_filepath, output_filepath, page=page_number, *args, **kwargs)
+            result.append(output_filepath)
+
+        return result
 
     def get_format_list(self):
         raise NotImplementedError("Your %s class has not defined a get_format_list() method, which is required." % self.__class__.__name__)
@@ -1,3 +1,4 @@
+import os
 import subprocess
 import re
 
@@ -68,6 +69,39 @@ class ConverterClass(ConverterBase):
         if arguments:
             command.extend(arguments)
         command.append(unicode(output_filepath))
+        self._execute_convert(command)
+
+    def convert_document(self, input_filepath, output_directory, first_page, last_page, file_format=DEFAULT_FILE_FORMAT, **kwargs):
+        arguments = []
+        if file_format.lower() == u'jpeg' or file_format.lower() == u'jpg':
+            arguments.append(u'-quality')
+            arguments.append(u'85')
+
+        # Imagemagick page number is 0 base
+        input_arg = u'%s[%d-%d]' % (input_filepath, first_page - 1, last_page - 1)
+
+        # Write every page to its own file, numbered after the page number
+        output_filepath = u'%s:%s' % (file_format, os.path.join(output_directory, u'%d'))
+
+        command = []
+        command.append(unicode(IM_CONVERT_PATH))
+        command.append(unicode(input_arg))
+        command.append(u'+adjoin')
+        command.append(u'-scene')
+        command.append(unicode(first_page))
+        command.extend(arguments)
+        command.append(unicode(output_filepath))
+        self._execute_convert(command)
+
+        result = []
+        for page_number in range(first_page, last_page + 1):
+            page_filepath = os.path.join(output_directory, unicode(page_number))
+            if os.path.exists(page_filepath):
+                result.append(page_filepath)
+
+        return result
+
+    def _execute_convert(self, command):
         proc = subprocess.Popen(command, close_fds=True, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
         return_code = proc.wait()
         if return_code != 0:
@@ -1,5 +1,7 @@
 import tempfile
 import os
+import shutil
+import threading
 
 import slate
 from PIL import Image
@@ -20,6 +22,19 @@ from converter.literals import DEFAULT_PAGE_NUMBER, \
     DEFAULT_FILE_FORMAT
 from converter.utils import cleanup
 
+# Ghostscript's API only allows one instance per process
+ghostscript_lock = threading.Lock()
+
+# Ghostscript devices that write the final file formats directly
+GHOSTSCRIPT_DEVICES = {
+    'JPEG': 'jpeg',
+    'JPG': 'jpeg',
+    'PNG': 'png16m',
+    'TIFF': 'tiff24nc',
+}
+# Lossless device for the images that are processed again with PIL
+GHOSTSCRIPT_LOSSLESS_DEVICE = 'png16m'
+
 
 class ConverterClass(ConverterBase):
     def get_page_count(self, input_filepath):
@@ -60,32 +75,12 @@ class ConverterClass(ConverterBase):
 
         if mimetype == 'application/pdf' and USE_GHOSTSCRIPT:
             # If file is a PDF open it with ghostscript and convert it to
-            # TIFF
-            first_page_tmpl = '-dFirstPage=%d' % page
-            last_page_tmpl = '-dLastPage=%d' % page
+            # a lossless image, it is encoded only once when saved below
             fd, tmpfile = tempfile.mkstemp()
             os.close(fd)
-            output_file_tmpl = '-sOutputFile=%s' % tmpfile
-            input_file_tmpl = '-f%s' % input_filepath
-            args = [
-                'gs', '-q', '-dQUIET', '-dSAFER', '-dBATCH',
-                '-dNOPAUSE', '-dNOPROMPT', 
-                first_page_tmpl, last_page_tmpl,
-                '-sDEVICE=jpeg', '-dJPEGQ=95',
-                '-r150', output_file_tmpl,
-                input_file_tmpl,
-                '-c "60000000 setvmthreshold"',  # use 30MB
-                '-dNOGC',  # No garbage collection
-                '-dMaxBitmap=500000000',
-                '-dAlignToPixels=0',
-                '-dGridFitTT=0',
-                '-dTextAlphaBits=4',
-                '-dGraphicsAlphaBits=4',                
-            ] 
-
-            ghostscript.Ghostscript(*args)
+            self.render_pdf(input_filepath, tmpfile, first_page=page, last_page=page)
             page = 1  # Don't execute the following while loop
-            input_filepath = tmpfile    
+            input_filepath = tmpfile
 
         try:
             im = Image.open(input_filepath)
@@ -130,6 +125,88 @@ class ConverterClass(ConverterBase):
             
         im.save(output_filepath, format=file_format)
 
+    def convert_document(self, input_filepath, output_directory, first_page, last_page, file_format=DEFAULT_FILE_FORMAT, **kwargs):
+        mimetype = kwargs.get('mimetype', None)
+        if not mimetype:
+            mimetype, encoding = get_mimetype(open(input_filepath, 'rb'), input_filepath, mimetype_only=True)
+
+        result = []
+        if mimetype == 'application/pdf' and USE_GHOSTSCRIPT:
+            # Render the whole range with a single ghostscript pass,
+            # ghostscript numbers the output files starting from 1
+            device = GHOSTSCRIPT_DEVICES.get(file_format.upper())
+            render_directory = tempfile.mkdtemp()
+            try:
+                self.render_pdf(input_filepath, os.path.join(render_directory, '%d'), first_page=first_page, last_page=last_page, device=device or GHOSTSCRIPT_LOSSLESS_DEVICE)
+                for index, page_number in enumerate(range(first_page, last_page + 1)):
+                    rendered_filepath = os.path.join(render_directory, unicode(index + 1))
+                    if not os.path.exists(rendered_filepath):
+                        # Range goes past the end of the document
+                        break
+                    output_filepath = os.path.join(output_directory, unicode(page_number))
+                    if device:
+                        # Already in the requested format, don't encode
+                        # the image again
+                        shutil.move(rendered_filepath, output_filepath)
+                    else:
+                        self._save_image(Image.open(rendered_filepath), output_filepath, file_format)
+                    result.append(output_filepath)
+            finally:
+                shutil.rmtree(render_directory, ignore_errors=True)
+        else:
+            try:
+                im = Image.open(input_filepath)
+            except Exception:
+                # Python Imaging Library doesn't recognize it as an image
+                raise UnknownFileFormat
+
+            try:
+                for page_number in range(first_page, last_page + 1):
+                    im.seek(page_number - 1)
+                    output_filepath = os.path.join(output_directory, unicode(page_number))
+                    self._save_image(im, output_filepath, file_format)
+                    result.append(output_filepath)
+            except EOFError:
+                # end of sequence
+                pass
+
+        return result
+
+    def render_pdf(self, input_filepath, output_filepath, first_page, last_page, device=GHOSTSCRIPT_LOSSLESS_DEVICE):
+        """
+        Rasterize a range of PDF pages with ghostscript, output_filepath
+        must contain a %d placeholder when rendering more than one page
+        """
+        args = [
+            'gs', '-q', '-dQUIET', '-dSAFER', '-dBATCH',
+            '-dNOPAUSE', '-dNOPROMPT',
+            '-dFirstPage=%d' % first_page, '-dLastPage=%d' % last_page,
+            '-sDEVICE=%s' % device,
+        ]
+        if device == 'jpeg':
+            args.append('-dJPEGQ=95')
+
+        args.extend([
+            '-r150', '-sOutputFile=%s' % output_filepath,
+            '-f%s' % input_filepath,
+            '-c "60000000 setvmthreshold"',  # use 30MB
+            '-dNOGC',  # No garbage collection
+            '-dMaxBitmap=500000000',
+            '-dAlignToPixels=0',
+            '-dGridFitTT=0',
+            '-dTextAlphaBits=4',
+            '-dGraphicsAlphaBits=4',
+        ])
+
+        with ghostscript_lock:
+            ghostscript.Ghostscript(*args)
+
+    def _save_image(self, im, output_filepath, file_format):
+        if im.mode not in ('L', 'RGB'):
+            im = im.convert('RGB')
+
+        im.save(output_filepath, format=file_format)
+
     def get_format_list(self):
         """
         Introspect PIL's internal registry to obtain a list of the
@@ -14,6 +14,11 @@ register_settings(
         {'name': u'GM_SETTINGS', 'global_name': u'CONVERTER_GM_SETTINGS', 'default': u'-limit files 5 -limit memory 512MB -limit map 1GB -density 200'},
         {'name': u'GRAPHICS_BACKEND', 'global_name': u'CONVERTER_GRAPHICS_BACKEND', 'default': u'converter.backends.python', 'description': _(u'Graphics conversion backend to use.  Options are: converter.backends.imagemagick, converter.backends.graphicsmagick and converter.backends.python.')},
         {'name': u'LIBREOFFICE_PATH', 'global_name': u'CONVERTER_LIBREOFFICE_PATH', 'default': u'/usr/bin/libreoffice', 'exists': True, 'description': _(u'Path to the libreoffice program.')},
+        {'name': u'LIBREOFFICE_POOL_SIZE', 'global_name': u'CONVERTER_LIBREOFFICE_POOL_SIZE', 'default': 2, 'description': _(u'Amount of headless libreoffice instances kept running by each job worker process to convert office documents, other processes start a new libreoffice process for every conversion.  Requires the python UNO bindings, use 0 to disable the pool.')},
+        {'name': u'LIBREOFFICE_JOB_TIMEOUT', 'global_name': u'CONVERTER_LIBREOFFICE_JOB_TIMEOUT', 'default': 120, 'description': _(u'Maximum amount of seconds an office document conversion can take before the libreoffice instance is terminated.')},
+        {'name': u'LIBREOFFICE_CACHE_PATH', 'global_name': u'CONVERTER_LIBREOFFICE_CACHE_PATH', 'default': None, 'description': _(u'Directory where the PDF conversions of office documents are stored, defaults to a subdirectory of the temporary directory.')},
+        {'name': u'LIBREOFFICE_CACHE_MAXIMUM_SIZE', 'global_name': u'CONVERTER_LIBREOFFICE_CACHE_MAXIMUM_SIZE', 'default': 512 * 1024 * 1024, 'description': _(u'Maximum size in bytes of the stored PDF conversions of office documents, the least recently used are removed periodically when exceeded.  Use None for no limit.')},
+        {'name': u'LIBREOFFICE_MAXIMUM_JOBS', 'global_name': u'CONVERTER_LIBREOFFICE_MAXIMUM_JOBS', 'default': 200, 'description': _(u'Amount of conversions after which a pooled libreoffice instance is restarted.')},
         
         #{'name': u'OCR_OPTIONS', 'global_name': u'CONVERTER_OCR_OPTIONS', 'default': u'-colorspace Gray -depth 8 -resample 200x200'},
         #{'name': u'HIGH_QUALITY_OPTIONS', 'global_name': u'CONVERTER_HIGH_QUALITY_OPTIONS', 'default': u'-density 400'},
@@ -303,3 +303,6 @@ FILE_FORMATS = {
     'Y': _(u'Raw yellow samples'),
     'YUV': _(u'CCIR 601 4:1:1 or 4:2:2 (8-bit only)'),
 }
+
+# Seconds between the evictions of the least recently used PDF conversions
+CONVERSION_CACHE_PRUNE_INTERVAL = 10 * 60
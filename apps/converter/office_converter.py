@@ -1,18 +1,46 @@
 from __future__ import absolute_import
 
+import atexit
+import hashlib
 import os
+import shutil
 import subprocess
 import logging
+import tempfile
+import threading
+import time
+import Queue
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    from com.sun.star.connection import NoConnectException
+    USE_UNO = True
+except ImportError:
+    USE_UNO = False
 
 from mimetype.api import get_mimetype
+from common.conf import settings as common_settings
 from common.conf.settings import TEMPORARY_DIRECTORY
+from common.file_cache import FileCache
 from common.utils import id_generator
 
-from .conf.settings import LIBREOFFICE_PATH
+from .conf.settings import (LIBREOFFICE_PATH, LIBREOFFICE_POOL_SIZE,
+    LIBREOFFICE_JOB_TIMEOUT, LIBREOFFICE_MAXIMUM_JOBS,
+    LIBREOFFICE_CACHE_PATH, LIBREOFFICE_CACHE_MAXIMUM_SIZE)
 from .exceptions import (OfficeConversionError,
     OfficeBackendError, UnknownFileFormat)
 
-CACHED_FILE_SUFFIX = u'_office_converter'
+HASH_FUNCTION = lambda x: hashlib.sha256(x).hexdigest()
+INSTANCE_START_TIMEOUT = 30
+
+# Document service, PDF export filter
+PDF_EXPORT_FILTERS = (
+    (u'com.sun.star.text.TextDocument', u'writer_pdf_Export'),
+    (u'com.sun.star.sheet.SpreadsheetDocument', u'calc_pdf_Export'),
+    (u'com.sun.star.presentation.PresentationDocument', u'impress_pdf_Export'),
+    (u'com.sun.star.drawing.DrawingDocument', u'draw_pdf_Export'),
+)
 
 CONVERTER_OFFICE_FILE_MIMETYPES = [
     u'application/msword',
@@ -35,22 +63,81 @@ CONVERTER_OFFICE_FILE_MIMETYPES = [
 
 logger = logging.getLogger(__name__)
 
+# PDF conversions stored by the checksum of the office document
+conversion_cache = FileCache(
+    name=u'office_conversions',
+    path=lambda: LIBREOFFICE_CACHE_PATH or os.path.join(common_settings.TEMPORARY_DIRECTORY, u'office_conversions'),
+    maximum_size=LIBREOFFICE_CACHE_MAXIMUM_SIZE
+)
+
+
+def get_file_checksum(filepath, buffer_size=1024 * 1024):
+    checksum = hashlib.sha256()
+    with open(filepath, 'rb') as descriptor:
+        while True:
+            data = descriptor.read(buffer_size)
+            if not data:
+                break
+            checksum.update(data)
+
+    return checksum.hexdigest()
+
+
+def invalidate_conversion(checksum):
+    """
+    Remove the stored PDF conversion of the office document with the
+    given checksum
+    """
+    conversion_cache.delete(HASH_FUNCTION(checksum))
+
+
+_backend_lock = threading.Lock()
+_backends = {}
+
+
+def get_backend(backend_class):
+    """
+    Return the process wide instance of an office converter backend
+    """
+    with _backend_lock:
+        if backend_class not in _backends:
+            _backends[backend_class] = backend_class()
+
+        return _backends[backend_class]
+
 
 class OfficeConverter(object):
     def __init__(self):
-        self.backend_class = OfficeConverterBackendDirect
-        self.backend = self.backend_class()
+        # Every process can convert, only the job workers keep a pool
+        # of running instances, see use_pool
+        self.backend = get_backend(OfficeConverterBackendDirect)
         self.exists = False
         self.mimetype = None
         self.encoding = None
 
+    def use_pool(self):
+        """
+        Convert with a pool of long lived libreoffice instances when the
+        UNO bindings are available, for the processes that convert many
+        documents
+        """
+        if USE_UNO and LIBREOFFICE_POOL_SIZE:
+            self.backend = get_backend(OfficeConverterBackendPool)
+
     def mimetypes(self):
         return CONVERTER_OFFICE_FILE_MIMETYPES
 
-    def convert(self, input_filepath, mimetype=None):
+    def convert(self, input_filepath, mimetype=None, checksum=None):
+        """
+        Convert an office document to PDF, conversions are stored by
+        the document checksum and reused.  If no checksum is provided
+        one is calculated from the file's content.  Returns the filepath
+        of the PDF or None if the file is not an office document
+        """
         self.exists = False
         self.mimetype = None
         self.encoding = None
+        self.output_filepath = None
 
         self.input_filepath = input_filepath
 
@@ -61,16 +148,22 @@ class OfficeConverter(object):
             self.mimetype, self.encoding = get_mimetype(open(self.input_filepath), self.input_filepath, mimetype_only=True)
 
         if self.mimetype in CONVERTER_OFFICE_FILE_MIMETYPES:
-            # Cache results of conversion
-            self.output_filepath = os.path.join(TEMPORARY_DIRECTORY, u''.join([self.input_filepath, CACHED_FILE_SUFFIX]))
-            self.exists = os.path.exists(self.output_filepath)
-            if not self.exists:
-                try:
-                    self.backend.convert(self.input_filepath, self.output_filepath)
-                    self.exists = True
-                except OfficeBackendError, msg:
-                    # convert exception so that at least the mime type icon is displayed
-                    raise UnknownFileFormat(msg)
+            if not checksum:
+                checksum = get_file_checksum(input_filepath)
+
+            def convert_to_pdf(output_filepath):
+                self.backend.convert(input_filepath, output_filepath)
+                if not os.path.exists(output_filepath):
+                    raise OfficeBackendError('LibreOffice didn\'t produce an output file')
+
+            try:
+                self.output_filepath = conversion_cache.get_or_create(HASH_FUNCTION(checksum), convert_to_pdf)
+                self.exists = True
+            except OfficeBackendError, msg:
+                # convert exception so that at least the mime type icon is displayed
+                raise UnknownFileFormat(msg)
+
+        return self.output_filepath
 
     def __unicode__(self):
         return getattr(self, 'output_filepath', None)
@@ -90,41 +183,257 @@ class OfficeConverterBackendDirect(object):
         """
         Executes libreoffice using subprocess's Popen
         """
-        self.input_filepath = input_filepath
-        self.output_filepath = output_filepath
+        # Each call gets its own profile and output directory so that
+        # concurrent conversions don't collide
+        working_directory = tempfile.mkdtemp(dir=TEMPORARY_DIRECTORY)
+        profile_directory = os.path.join(working_directory, u'profile')
 
         command = []
         command.append(self.libreoffice_path)
 
         command.append(u'--headless')
+        command.append(u'-env:UserInstallation=file://%s' % profile_directory)
         command.append(u'--convert-to')
         command.append(u'pdf')
-        command.append(self.input_filepath)
+        command.append(input_filepath)
         command.append(u'--outdir')
-        command.append(TEMPORARY_DIRECTORY)
+        command.append(working_directory)
 
         logger.debug('command: %s' % command)
 
         try:
-            os.environ['HOME'] = TEMPORARY_DIRECTORY
-            proc = subprocess.Popen(command, close_fds=True, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-            return_code = proc.wait()
+            environment = os.environ.copy()
+            environment['HOME'] = working_directory
+            # The output is not read while waiting, a pipe could fill up
+            # and block libreoffice
+            null_device = open(os.devnull, 'w')
+            try:
+                proc = subprocess.Popen(command, close_fds=True, stderr=null_device, stdout=null_device, env=environment)
+            finally:
+                null_device.close()
+            return_code = wait_process(proc, LIBREOFFICE_JOB_TIMEOUT)
             logger.debug('return_code: %s' % return_code)
 
-            readline = proc.stderr.readline()
-            logger.debug('stderr: %s' % readline)
+            if return_code is None:
+                proc.kill()
+                proc.wait()
+                raise OfficeBackendError('LibreOffice conversion timed out')
+
             if return_code != 0:
-                raise OfficeBackendError(readline)
-            filename, extension = os.path.splitext(os.path.basename(self.input_filepath))
+                raise OfficeBackendError('LibreOffice exited with return code: %d' % return_code)
+            filename, extension = os.path.splitext(os.path.basename(input_filepath))
             logger.debug('filename: %s' % filename)
             logger.debug('extension: %s' % extension)
 
-            converted_output = os.path.join(TEMPORARY_DIRECTORY, os.path.extsep.join([filename, 'pdf']))
+            converted_output = os.path.join(working_directory, os.path.extsep.join([filename, 'pdf']))
             logger.debug('converted_output: %s' % converted_output)
-         
-            os.rename(converted_output, self.output_filepath)      
+
+            shutil.move(converted_output, output_filepath)
         except OSError, msg:
             raise OfficeBackendError(msg)
+        except OfficeBackendError:
+            raise
         except Exception, msg:
             logger.error('Unhandled exception', exc_info=msg)
+        finally:
+            shutil.rmtree(working_directory, ignore_errors=True)
+
+
+class OfficeConverterBackendPool(object):
+    """
+    Keeps a pool of long lived headless libreoffice instances, each with
+    its own profile, and dispatches conversions to the first idle one.
+    Only used by the job workers, see OfficeConverter.use_pool
+    """
+    def __init__(self):
+        self.libreoffice_path = LIBREOFFICE_PATH if LIBREOFFICE_PATH else u'/usr/bin/libreoffice'
+        if not os.path.exists(self.libreoffice_path):
+            raise OfficeBackendError('cannot find LibreOffice executable')
+
+        self.instances = []
+        self.idle_instances = Queue.Queue()
+        for index in range(LIBREOFFICE_POOL_SIZE):
+            # Instances are started on first use
+            instance = OfficeInstance(self.libreoffice_path, index)
+            self.instances.append(instance)
+            self.idle_instances.put(instance)
+
+        atexit.register(self.shutdown)
+
+    def convert(self, input_filepath, output_filepath):
+        instance = self.idle_instances.get()
+        try:
+            errors = []
+
+            def job():
+                try:
+                    instance.convert(input_filepath, output_filepath)
+                except Exception, msg:
+                    errors.append(msg)
+
+            thread = threading.Thread(target=job)
+            thread.daemon = True
+            thread.start()
+            thread.join(LIBREOFFICE_JOB_TIMEOUT)
+
+            if thread.is_alive():
+                # Killing the process makes the pending UNO call fail,
+                # stop waits for it to return before cleaning up
+                instance.kill()
+                instance.stop()
+                raise OfficeBackendError('LibreOffice conversion timed out')
+
+            if errors:
+                # The instance may have crashed, start a new one next time
+                instance.stop()
+                raise OfficeBackendError(errors[0])
+
+            if instance.job_count >= LIBREOFFICE_MAXIMUM_JOBS:
+                logger.debug('recycling office instance: %s' % instance)
+                instance.stop()
+        finally:
+            self.idle_instances.put(instance)
+
+    def shutdown(self):
+        for instance in self.instances:
+            instance.stop()
+            instance.remove_profile()
+
+
+class OfficeInstance(object):
+    def __init__(self, libreoffice_path, index):
+        self.libreoffice_path = libreoffice_path
+        self.index = index
+        self.process = None
+        self.desktop = None
+        self.job_count = 0
+        self.profile_directory = None
+        # Held during the UNO calls, stop must not use the bridge while
+        # a conversion is using it
+        self.lock = threading.RLock()
+
+    def __unicode__(self):
+        return self.get_pipe_name()
+
+    def get_pipe_name(self):
+        return u'office_converter_%d_%d' % (os.getpid(), self.index)
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        if not self.profile_directory:
+            self.profile_directory = tempfile.mkdtemp(dir=TEMPORARY_DIRECTORY)
+
+        connection_string = u'pipe,name=%s;urp;StarOffice.ComponentContext' % self.get_pipe_name()
+
+        command = [
+            self.libreoffice_path, u'--headless', u'--invisible',
+            u'--nologo', u'--nodefault', u'--norestore',
+            u'--nofirststartwizard',
+            u'-env:UserInstallation=%s' % uno.systemPathToFileUrl(self.profile_directory),
+            u'--accept=%s' % connection_string,
+        ]
+        logger.debug('command: %s' % command)
+
+        null_device = open(os.devnull, 'w')
+        self.process = subprocess.Popen(command, close_fds=True, stdout=null_device, stderr=null_device)
+        null_device.close()
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(u'com.sun.star.bridge.UnoUrlResolver', local_context)
+
+        start_time = time.time()
+        while True:
+            try:
+                context = resolver.resolve(u'uno:%s' % connection_string)
+                break
+            except NoConnectException:
+                if not self.is_alive() or time.time() - start_time > INSTANCE_START_TIMEOUT:
+                    self.stop()
+                    raise OfficeBackendError('unable to start LibreOffice instance')
+                time.sleep(0.5)
+
+        self.desktop = context.ServiceManager.createInstanceWithContext(u'com.sun.star.frame.Desktop', context)
+        self.job_count = 0
+
+    def stop(self):
+        with self.lock:
+            if self.desktop:
+                try:
+                    self.desktop.terminate()
+                except Exception:
+                    # Instance already dead or unresponsive
+                    pass
+
+            if self.is_alive():
+                if wait_process(self.process, 5) is None:
+                    self.process.kill()
+                    self.process.wait()
+
+            self.process = None
+            self.desktop = None
+            self.job_count = 0
+
+    def kill(self):
+        """
+        Kill the libreoffice process without going through the UNO bridge,
+        safe to call while a conversion is in progress
+        """
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def remove_profile(self):
+        if self.profile_directory:
+            shutil.rmtree(self.profile_directory, ignore_errors=True)
+            self.profile_directory = None
+
+    def convert(self, input_filepath, output_filepath):
+        with self.lock:
+            if not self.is_alive():
+                self.start()
+
+            document = self.desktop.loadComponentFromURL(uno.systemPathToFileUrl(os.path.abspath(input_filepath)), u'_blank', 0, make_properties(Hidden=True))
+            if document is None:
+                raise OfficeBackendError('LibreOffice unable to load document')
+
+            try:
+                document.storeToURL(uno.systemPathToFileUrl(os.path.abspath(output_filepath)), make_properties(FilterName=get_pdf_export_filter(document)))
+            finally:
+                document.close(True)
+
+            self.job_count += 1
+
+
+def get_pdf_export_filter(document):
+    for service, filter_name in PDF_EXPORT_FILTERS:
+        if document.supportsService(service):
+            return filter_name
+
+    return u'writer_pdf_Export'
+
+
+def make_properties(**kwargs):
+    properties = []
+    for name, value in kwargs.items():
+        property_value = PropertyValue()
+        property_value.Name = name
+        property_value.Value = value
+        properties.append(property_value)
+
+    return tuple(properties)
+
+
+def wait_process(process, timeout):
+    """
+    Wait for a process to finish, returns its return code or None if
+    it didn't finish before the timeout
+    """
+    start_time = time.time()
+    while process.poll() is None:
+        if time.time() - start_time > timeout:
+            return None
+        time.sleep(0.1)
 
+    return process.returncode
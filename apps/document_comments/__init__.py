@@ -4,11 +4,15 @@ from django.utils.translation import ugettext_lazy as _
 from django.conf import settings
 from django.contrib.comments.models import Comment
 from django.contrib.contenttypes import generic
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 from navigation.api import register_links, register_model_list_columns
 from common.utils import encapsulate
 from acls.api import class_permissions
 from documents.models import Document
+from dynamic_search.classes import SearchModel
 
 if 'django.contrib.comments' not in settings.INSTALLED_APPS:
     raise Exception('This app depends on the django.contrib.comments app.')
@@ -54,3 +58,10 @@ class_permissions(Document, [
     PERMISSION_COMMENT_DELETE,
     PERMISSION_COMMENT_VIEW
 ])
+
+
+@receiver(post_save, dispatch_uid='comment_search_index', sender=Comment)
+@receiver(post_delete, dispatch_uid='comment_search_remove', sender=Comment)
+def comment_search_index(sender, instance, **kwargs):
+    if instance.content_type_id == ContentType.objects.get_for_model(Document).pk:
+        SearchModel.get('documents.Document').index_object(int(instance.object_pk), ['comments.Comment.comment'])
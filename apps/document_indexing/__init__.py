@@ -9,8 +9,11 @@ from main.api import register_maintenance_links
 from documents.permissions import PERMISSION_DOCUMENT_VIEW
 from documents.models import Document
 from project_setup.api import register_setup
+from job_processor.api import register_job
+from job_processor.literals import JOB_PRIORITY_LOW
 
 from .models import (Index, IndexTemplateNode, IndexInstanceNode)
+from .tools import do_rebuild_all_indexes
 from .permissions import (PERMISSION_DOCUMENT_INDEXING_VIEW,
     PERMISSION_DOCUMENT_INDEXING_REBUILD_INDEXES,
     PERMISSION_DOCUMENT_INDEXING_SETUP,
@@ -50,6 +53,7 @@ register_top_menu('indexes', link={'text': _('indexes'), 'famfam': 'tab', 'view'
 rebuild_index_instances = {'text': _('rebuild indexes'), 'view': 'rebuild_index_instances', 'famfam': 'folder_page', 'permissions': [PERMISSION_DOCUMENT_INDEXING_REBUILD_INDEXES], 'description': _(u'Deletes and creates from scratch all the document indexes.')}
 
 register_maintenance_links([rebuild_index_instances], namespace='document_indexing', title=_(u'Indexes'))
+register_job('do_rebuild_all_indexes', do_rebuild_all_indexes, title=_(u'Rebuild all the document indexes.'), priority=JOB_PRIORITY_LOW, retries=0, unique=True)
 
 register_sidebar_template(['index_instance_list'], 'indexing_help.html')
 
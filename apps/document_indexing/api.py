@@ -2,18 +2,17 @@ from __future__ import absolute_import
 
 from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
-from django.utils.translation import ugettext
 from django.template.defaultfilters import slugify
 
+from common.expressions import ExpressionError
+from common.runtime import expression_cache
 from metadata.classes import MetadataClass
 
 from .models import Index, IndexInstanceNode, DocumentRenameCount
-from .conf.settings import (AVAILABLE_INDEXING_FUNCTIONS,
-    MAX_SUFFIX_COUNT, SLUGIFY_PATHS)
+from .conf.settings import AVAILABLE_INDEXING_FUNCTIONS, SLUGIFY_PATHS
 from .filesystem import (fs_create_index_directory,
-    fs_create_document_link, fs_delete_document_link,
-    fs_delete_index_directory, assemble_suffixed_filename)
-from .exceptions import MaxSuffixCountReached
+    fs_create_document_link, fs_update_document_link,
+    fs_delete_document_link, fs_delete_index_directory)
 
 if SLUGIFY_PATHS == False:
     # Do not slugify path or filenames and extensions
@@ -25,7 +24,9 @@ else:
 # External functions
 def update_indexes(document):
     """
-    Update or create all the index instances related to a document
+    Update all the index instances related to a document, the placements
+    of the document are evaluated again and only the ones that changed
+    are removed or created
     """
     warnings = []
 
@@ -34,12 +35,36 @@ def update_indexes(document):
     eval_dict['document'] = document
     eval_dict['metadata'] = MetadataClass(document_metadata_dict)
 
+    # (template node, value) paths where the document should be linked
+    placements = {}
     # Only update indexes where the document type is found or that do not have any document type specified
     for index in Index.objects.filter(Q(enabled=True) & (Q(document_types=None) | Q(document_types=document.document_type))):
-        root_instance, created = IndexInstanceNode.objects.get_or_create(index_template_node=index.template_root, parent=None)
-        for template_node in index.template_root.get_children():
-            index_warnings = cascade_eval(eval_dict, document, template_node, root_instance)
+        template_root = index.template_root
+        for template_node in template_root.get_children():
+            paths, index_warnings = cascade_eval(eval_dict, template_node)
             warnings.extend(index_warnings)
+            for path in paths:
+                placements[get_path_key(path)] = (template_root, path)
+
+    current = {}
+    for document_rename_count in DocumentRenameCount.objects.filter(document=document).select_related('index_instance_node'):
+        index_instance = document_rename_count.index_instance_node
+        key = get_instance_key(index_instance)
+        # Documents renamed since they were linked are linked again
+        if key in placements and key not in current and document_rename_count.filename == document.file_filename:
+            current[key] = document_rename_count
+            try:
+                # The document may have a new file
+                fs_update_document_link(index_instance, document, document_rename_count.suffix)
+            except Exception, exc:
+                warnings.append(_(u'Error updating document index, expression: %(expression)s; %(exception)s') % {
+                    'expression': index_instance.index_template_node.expression, 'exception': exc})
+        else:
+            warnings.extend(cascade_document_remove(document, index_instance))
+
+    for key, (template_root, path) in placements.items():
+        if key not in current:
+            warnings.extend(create_document_link(document, template_root, path))
 
     return warnings
 
@@ -58,68 +83,71 @@ def delete_indexes(document):
 
 
 # Internal functions
-def find_lowest_available_suffix(index_instance, document):
-    index_instance_documents = DocumentRenameCount.objects.filter(index_instance_node=index_instance)
-    files_list = []
-    for index_instance_document in index_instance_documents:
-        files_list.append(assemble_suffixed_filename(index_instance_document.document.file_filename, index_instance_document.suffix))
+def get_path_key(path):
+    return tuple([(template_node.pk, value) for template_node, value in path])
 
-    for suffix in xrange(MAX_SUFFIX_COUNT):
-        if assemble_suffixed_filename(document.file_filename, suffix) not in files_list:
-            return suffix
 
-    raise MaxSuffixCountReached(ugettext(u'Maximum suffix (%s) count reached.') % MAX_SUFFIX_COUNT)
+def get_instance_key(index_instance):
+    """
+    Return the key of the path of an index instance, excluding the root
+    """
+    return tuple([(ancestor.index_template_node_id, ancestor.value) for ancestor in index_instance.get_ancestors(include_self=True) if ancestor.parent_id])
 
 
-def cascade_eval(eval_dict, document, template_node, parent_index_instance=None):
+def cascade_eval(eval_dict, template_node, path=()):
     """
-    Evaluate an enabled index expression and update or create all the
-    related index instances also recursively calling itself to evaluate
-    all the index's children
+    Evaluate an enabled index expression and recursively all the
+    index's children, returns the (template node, value) paths of the
+    index instances where the document is to be linked
     """
+    paths = []
     warnings = []
     if template_node.enabled:
         try:
-            result = eval(template_node.expression, eval_dict, AVAILABLE_INDEXING_FUNCTIONS)
-        except Exception, exc:
+            # Compiled once per process, not for every document
+            result = expression_cache.evaluate(template_node.expression, eval_dict, AVAILABLE_INDEXING_FUNCTIONS)
+        except ExpressionError, exc:
             warnings.append(_(u'Error in document indexing update expression: %(expression)s; %(exception)s') % {
-                'expression': template_node.expression, 'exception': exc})
+                'expression': exc.expression, 'exception': exc.reason})
         else:
             if result:
-                index_instance, created = IndexInstanceNode.objects.get_or_create(index_template_node=template_node, value=result, parent=parent_index_instance)
-                #if created:
-                try:
-                    fs_create_index_directory(index_instance)
-                except Exception, exc:
-                    warnings.append(_(u'Error updating document index, expression: %(expression)s; %(exception)s') % {
-                        'expression': template_node.expression, 'exception': exc})
-
+                node_path = path + ((template_node, unicode(result)),)
                 if template_node.link_documents:
-                    suffix = find_lowest_available_suffix(index_instance, document)
-                    document_count = DocumentRenameCount(
-                        index_instance_node=index_instance,
-                        document=document,
-                        suffix=suffix
-                    )
-                    document_count.save()
-
-                    try:
-                        fs_create_document_link(index_instance, document, suffix)
-                    except Exception, exc:
-                        warnings.append(_(u'Error updating document index, expression: %(expression)s; %(exception)s') % {
-                            'expression': template_node.expression, 'exception': exc})
-
-                    index_instance.documents.add(document)
+                    paths.append(node_path)
 
                 for child in template_node.get_children():
-                    children_warnings = cascade_eval(
-                        eval_dict=eval_dict,
-                        document=document,
-                        template_node=child,
-                        parent_index_instance=index_instance
-                    )
+                    children_paths, children_warnings = cascade_eval(eval_dict, child, node_path)
+                    paths.extend(children_paths)
                     warnings.extend(children_warnings)
 
+    return paths, warnings
+
+
+def create_document_link(document, template_root, path):
+    """
+    Link a document in the index instance of a path, creating the
+    missing index instances of the path
+    """
+    warnings = []
+    index_instance, created = IndexInstanceNode.objects.get_or_create(index_template_node=template_root, parent=None)
+    for template_node, value in path:
+        index_instance, created = IndexInstanceNode.objects.get_or_create(index_template_node=template_node, value=value, parent=index_instance)
+        if created:
+            try:
+                fs_create_index_directory(index_instance)
+            except Exception, exc:
+                warnings.append(_(u'Error updating document index, expression: %(expression)s; %(exception)s') % {
+                    'expression': template_node.expression, 'exception': exc})
+
+    document_count = DocumentRenameCount.objects.allocate(index_instance, document)
+
+    try:
+        fs_create_document_link(index_instance, document, document_count.suffix)
+    except Exception, exc:
+        warnings.append(_(u'Error updating document index, expression: %(expression)s; %(exception)s') % {
+            'expression': index_instance.index_template_node.expression, 'exception': exc})
+
+    index_instance.documents.add(document)
     return warnings
 
 
@@ -132,7 +160,7 @@ def cascade_document_remove(document, index_instance):
     warnings = []
     try:
         document_rename_count = DocumentRenameCount.objects.get(index_instance_node=index_instance, document=document)
-        fs_delete_document_link(index_instance, document, document_rename_count.suffix)
+        fs_delete_document_link(index_instance, document, document_rename_count.suffix, document_rename_count.filename)
         document_rename_count.delete()
         index_instance.documents.remove(document)
         if index_instance.documents.count() == 0 and index_instance.get_children().count() == 0:
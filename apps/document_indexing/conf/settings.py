@@ -16,6 +16,7 @@ register_settings(
         # Definition
         {'name': u'AVAILABLE_INDEXING_FUNCTIONS', 'global_name': u'DOCUMENT_INDEXING_AVAILABLE_INDEXING_FUNCTIONS', 'default': available_indexing_functions},
         {'name': u'SUFFIX_SEPARATOR', 'global_name': u'DOCUMENT_INDEXING_SUFFIX_SEPARATOR', 'default': u'_'},
+        {'name': u'REBUILD_BATCH_SIZE', 'global_name': u'DOCUMENT_INDEXING_REBUILD_BATCH_SIZE', 'default': 100, 'description': _(u'Amount of documents indexed per transaction when rebuilding all the indexes.')},
         # Filesystem serving
         {'name': u'SLUGIFY_PATHS', 'global_name': u'DOCUMENT_INDEXING_FILESYSTEM_SLUGIFY_PATHS', 'default': False},
         {'name': u'MAX_SUFFIX_COUNT', 'global_name': u'DOCUMENT_INDEXING_FILESYSTEM_MAX_SUFFIX_COUNT', 'default': 1000},
@@ -71,11 +71,28 @@ def fs_create_document_link(index_instance, document, suffix=0):
                 raise Exception(_(u'Unable to create symbolic link: %(filepath)s; %(exc)s') % {'filepath': filepath, 'exc': exc})
 
 
-def fs_delete_document_link(index_instance, document, suffix=0):
+def fs_update_document_link(index_instance, document, suffix=0):
+    """
+    Create the symbolic link of a document again only when it is missing
+    or doesn't point to the current file of the document
+    """
     if index_instance.index_template_node.index.name in FILESYSTEM_SERVING:
         filename = assemble_suffixed_filename(document.file_filename, suffix)
         filepath = assemble_path_from_list([FILESYSTEM_SERVING[index_instance.index_template_node.index.name], get_instance_path(index_instance), filename])
 
+        if not os.path.islink(filepath) or os.readlink(filepath) != document.file.path:
+            fs_create_document_link(index_instance, document, suffix)
+
+
+def fs_delete_document_link(index_instance, document, suffix=0, filename=None):
+    """
+    Delete the symbolic link of a document, filename is the filename of
+    the document when it was linked
+    """
+    if index_instance.index_template_node.index.name in FILESYSTEM_SERVING:
+        filename = assemble_suffixed_filename(filename or document.file_filename, suffix)
+        filepath = assemble_path_from_list([FILESYSTEM_SERVING[index_instance.index_template_node.index.name], get_instance_path(index_instance), filename])
+
         try:
             os.unlink(filepath)
         except OSError, exc:
@@ -3,6 +3,9 @@ from __future__ import absolute_import
 from django import forms
 from django.utils.translation import ugettext_lazy as _
 
+from common.expressions import ExpressionError
+from common.runtime import expression_cache
+
 from .models import Index, IndexTemplateNode
 
 
@@ -24,5 +27,14 @@ class IndexTemplateNodeForm(forms.ModelForm):
         self.fields['index'].widget = forms.widgets.HiddenInput()
         self.fields['parent'].widget = forms.widgets.HiddenInput()
 
+    def clean_expression(self):
+        expression = self.cleaned_data['expression']
+        try:
+            expression_cache.compile(expression)
+        except ExpressionError, exc:
+            raise forms.ValidationError(exc.reason)
+
+        return expression
+
     class Meta:
         model = IndexTemplateNode
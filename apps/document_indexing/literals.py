@@ -0,0 +1,2 @@
+# Times a suffix is allocated again when another process took it first
+SUFFIX_ALLOCATION_RETRIES = 10
@@ -0,0 +1,15 @@
+from __future__ import absolute_import
+
+from django.core.management.base import NoArgsCommand
+
+from ...tools import do_rebuild_all_indexes
+
+
+class Command(NoArgsCommand):
+    help = 'Delete and create from scratch all the document indexes.'
+
+    def handle_noargs(self, **options):
+        do_rebuild_all_indexes(callback=self.report_progress)
+
+    def report_progress(self, indexed, total):
+        self.stdout.write('Indexed %d of %d documents.\n' % (indexed, total))
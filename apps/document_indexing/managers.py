@@ -1,8 +1,72 @@
 from __future__ import absolute_import
 
-from django.db import models
+import hashlib
+
+from django.db import models, transaction, IntegrityError
+from django.db.models import Max
+from django.utils.translation import ugettext
+
+from .conf.settings import MAX_SUFFIX_COUNT
+from .exceptions import MaxSuffixCountReached
+from .literals import SUFFIX_ALLOCATION_RETRIES
 
 
 class IndexManager(models.Manager):
     def get_by_natural_key(self, name):
         return self.get(name=name)
+
+
+class DocumentRenameCountManager(models.Manager):
+    def get_filename_hash(self, filename):
+        return hashlib.sha1(filename.encode('utf-8')).hexdigest()
+
+    def get_next_suffix(self, index_instance_node, filename_hash):
+        """
+        Return the suffix following the highest one in use for a
+        filename in an index instance, read from the index of the table.
+        Suffixes released below the highest are only used again once
+        MAX_SUFFIX_COUNT is reached
+        """
+        suffixes = self.model.objects.filter(index_instance_node=index_instance_node, filename_hash=filename_hash)
+        maximum = suffixes.aggregate(Max('suffix'))['suffix__max']
+        if maximum is None:
+            return 0
+
+        if maximum + 1 < MAX_SUFFIX_COUNT:
+            return maximum + 1
+
+        used = set(suffixes.values_list('suffix', flat=True))
+        for suffix in xrange(MAX_SUFFIX_COUNT):
+            if suffix not in used:
+                return suffix
+
+        raise MaxSuffixCountReached(ugettext(u'Maximum suffix (%s) count reached.') % MAX_SUFFIX_COUNT)
+
+    def allocate(self, index_instance_node, document):
+        """
+        Link a document in an index instance under a suffix not used by
+        the other documents with the same filename.  The unique index on
+        the node, filename and suffix rejects a suffix taken at the same
+        time by another process, a new one is allocated in that case
+        """
+        filename = document.file_filename
+        filename_hash = self.get_filename_hash(filename)
+
+        for attempt in xrange(SUFFIX_ALLOCATION_RETRIES):
+            suffix = self.get_next_suffix(index_instance_node, filename_hash)
+            sid = transaction.savepoint()
+            try:
+                document_rename_count = self.model.objects.create(
+                    index_instance_node=index_instance_node,
+                    document=document,
+                    filename=filename,
+                    filename_hash=filename_hash,
+                    suffix=suffix
+                )
+            except IntegrityError:
+                transaction.savepoint_rollback(sid)
+            else:
+                transaction.savepoint_commit(sid)
+                return document_rename_count
+
+        raise MaxSuffixCountReached(ugettext(u'Unable to allocate a suffix for: %s.') % filename)
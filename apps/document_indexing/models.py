@@ -9,7 +9,7 @@ from mptt.fields import TreeForeignKey
 from documents.models import Document, DocumentType
 
 from .conf.settings import AVAILABLE_INDEXING_FUNCTIONS
-from .managers import IndexManager
+from .managers import IndexManager, DocumentRenameCountManager
 
 available_indexing_functions_string = (_(u'Available functions: %s') % u','.join([u'%s()' % name for name, function in AVAILABLE_INDEXING_FUNCTIONS.items()])) if AVAILABLE_INDEXING_FUNCTIONS else u''
 
@@ -106,10 +106,17 @@ class DocumentRenameCount(models.Model):
     index_instance_node = models.ForeignKey(IndexInstanceNode, verbose_name=_(u'index instance'))
     document = models.ForeignKey(Document, verbose_name=_(u'document'))
     suffix = models.PositiveIntegerField(blank=True, verbose_name=(u'suffix'))
+    # Filename of the document when it was linked, the name of its link
+    filename = models.CharField(max_length=255, blank=True, editable=False, verbose_name=_(u'filename'))
+    # Indexable replacement of the filename for the unique index
+    filename_hash = models.CharField(max_length=40, blank=True, editable=False)
+
+    objects = DocumentRenameCountManager()
 
     def __unicode__(self):
         return u'%s - %s - %s' % (self.index_instance_node, self.document, self.suffix or u'0')
 
     class Meta:
+        unique_together = ('index_instance_node', 'filename_hash', 'suffix')
         verbose_name = _(u'document rename count')
         verbose_name_plural = _(u'documents rename count')
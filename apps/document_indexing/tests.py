@@ -0,0 +1,95 @@
+from __future__ import absolute_import
+
+import os
+
+from django.conf import settings
+from django.core.files.base import File
+from django.test import TestCase
+from django.utils.importlib import import_module
+
+from documents.models import Document, DocumentType, DocumentVersion
+
+from .exceptions import MaxSuffixCountReached
+from .models import Index, IndexInstanceNode, DocumentRenameCount
+
+
+class DocumentRenameCountTestCase(TestCase):
+    def setUp(self):
+        self.document_type = DocumentType.objects.create(name='test suffixes')
+
+        # Two documents with the same filename
+        self.documents = []
+        for index in range(2):
+            document = Document(document_type=self.document_type)
+            document.save()
+            file_object = open(os.path.join(settings.PROJECT_ROOT, 'contrib', 'mayan_11_1.pdf'))
+            document.new_version(file=File(file_object, name='mayan_11_1.pdf'))
+            file_object.close()
+            self.documents.append(document)
+
+        index = Index.objects.create(name='test_suffixes', title=u'test suffixes')
+        self.index_instance_node = IndexInstanceNode.objects.create(index_template_node=index.template_root, value=u'')
+
+    def allocate_with_suffixes(self, suffixes, document):
+        """
+        Allocate a suffix with get_next_suffix returning the given
+        suffixes first, like when other processes take them at the same
+        time
+        """
+        get_next_suffix = DocumentRenameCount.objects.get_next_suffix
+        suffixes = list(suffixes)
+
+        def next_suffix(index_instance_node, filename_hash):
+            if suffixes:
+                return suffixes.pop(0)
+            return get_next_suffix(index_instance_node, filename_hash)
+
+        DocumentRenameCount.objects.get_next_suffix = next_suffix
+        try:
+            return DocumentRenameCount.objects.allocate(self.index_instance_node, document)
+        finally:
+            del DocumentRenameCount.objects.get_next_suffix
+
+    def test_allocate(self):
+        first, second = self.documents
+        self.failUnlessEqual(DocumentRenameCount.objects.allocate(self.index_instance_node, first).suffix, 0)
+        self.failUnlessEqual(DocumentRenameCount.objects.allocate(self.index_instance_node, second).suffix, 1)
+
+    def test_allocate_taken_suffix(self):
+        first, second = self.documents
+        DocumentRenameCount.objects.allocate(self.index_instance_node, first)
+
+        # The suffix read was taken by another process before the insert
+        document_rename_count = self.allocate_with_suffixes([0], second)
+        self.failUnlessEqual(document_rename_count.suffix, 1)
+        self.failUnlessEqual(DocumentRenameCount.objects.filter(index_instance_node=self.index_instance_node).count(), 2)
+
+    def test_allocate_retries_exhausted(self):
+        first, second = self.documents
+        DocumentRenameCount.objects.allocate(self.index_instance_node, first)
+
+        self.failUnlessRaises(MaxSuffixCountReached, self.allocate_with_suffixes, [0] * 100, second)
+        self.failUnlessEqual(DocumentRenameCount.objects.filter(index_instance_node=self.index_instance_node).count(), 1)
+
+    def test_filename_migration_collisions(self):
+        # Both documents were linked under different filenames and then
+        # renamed to the same filename without being indexed again
+        first, second = self.documents
+        for document, filename in zip(self.documents, [u'old first.pdf', u'old second.pdf']):
+            DocumentRenameCount.objects.create(
+                index_instance_node=self.index_instance_node,
+                document=document,
+                filename=filename,
+                filename_hash=DocumentRenameCount.objects.get_filename_hash(filename),
+                suffix=0
+            )
+
+        migration = import_module('document_indexing.migrations.0008_document_rename_count_filename')
+        migration.Migration().forwards({
+            'document_indexing.DocumentRenameCount': DocumentRenameCount,
+            'documents.DocumentVersion': DocumentVersion,
+        })
+
+        document_rename_counts = DocumentRenameCount.objects.filter(index_instance_node=self.index_instance_node).order_by('pk')
+        self.failUnlessEqual([document_rename_count.filename for document_rename_count in document_rename_counts], [u'mayan_11_1.pdf', u'mayan_11_1.pdf'])
+        self.failUnlessEqual([document_rename_count.suffix for document_rename_count in document_rename_counts], [0, 1])
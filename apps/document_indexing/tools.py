@@ -1,19 +1,49 @@
 from __future__ import absolute_import
 
+import logging
+
+from django.db import transaction
+
 from documents.models import Document
 
+from .conf.settings import REBUILD_BATCH_SIZE
 from .models import Index, IndexInstanceNode, DocumentRenameCount
 from .filesystem import fs_delete_directory_recusive
 from .api import update_indexes
 
+logger = logging.getLogger(__name__)
+
+
+@transaction.commit_on_success
+def update_indexes_batch(document_ids):
+    warnings = []
+    for document in Document.objects.filter(pk__in=document_ids).select_related('document_type'):
+        warnings.extend(update_indexes(document))
 
-def do_rebuild_all_indexes():
+    return warnings
+
+
+def do_rebuild_all_indexes(batch_size=REBUILD_BATCH_SIZE, callback=None):
+    """
+    Delete all the index instances and index the documents again in
+    batches, each one in its own transaction.  callback is called with
+    the amount of documents indexed so far and the total after each
+    batch
+    """
     for index in Index.objects.all():
         fs_delete_directory_recusive(index)
 
     IndexInstanceNode.objects.all().delete()
     DocumentRenameCount.objects.all().delete()
-    for document in Document.objects.all():
-        update_indexes(document)
+
+    document_ids = list(Document.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(document_ids), batch_size):
+        for warning in update_indexes_batch(document_ids[start:start + batch_size]):
+            logger.warning(warning)
+
+        indexed = min(start + batch_size, len(document_ids))
+        logger.info('indexed %d of %d documents' % (indexed, len(document_ids)))
+        if callback:
+            callback(indexed, len(document_ids))
 
     return []  # Warnings - None
@@ -19,6 +19,7 @@ from common.views import assign_remove
 from common.widgets import two_state_template
 from acls.utils import apply_default_acls
 from acls.models import AccessEntry
+from job_processor.api import process_job
 
 from .forms import IndexForm, IndexTemplateNodeForm
 from .models import (Index, IndexTemplateNode, IndexInstanceNode)
@@ -397,11 +398,9 @@ def rebuild_index_instances(request):
         }, context_instance=RequestContext(request))
     else:
         try:
-            warnings = do_rebuild_all_indexes()
-            messages.success(request, _(u'Index rebuild completed successfully.'))
-            for warning in warnings:
-                messages.warning(request, warning)
-
+            # Executed by the job workers, can take a long time
+            process_job(do_rebuild_all_indexes)
+            messages.success(request, _(u'Index rebuild queued successfully.'))
         except Exception, e:
             if settings.DEBUG:
                 raise
@@ -3,6 +3,8 @@ from __future__ import absolute_import
 import tempfile
 
 from django.utils.translation import ugettext_lazy as _
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
 
 from common.utils import validate_path, encapsulate
 from navigation.api import (register_links, register_top_menu,
@@ -13,7 +15,10 @@ from history.api import register_history_type
 from history.permissions import PERMISSION_HISTORY_VIEW
 from project_setup.api import register_setup
 from acls.api import class_permissions
+from job_processor.api import register_job, register_periodic_job
+from job_processor.literals import JOB_PRIORITY_LOW
 from dynamic_search.classes import SearchModel
+from converter.office_converter import invalidate_conversion
 
 from .models import (Document, DocumentPage,
     DocumentPageTransformation, DocumentType, DocumentTypeFilename,
@@ -32,6 +37,9 @@ from .conf.settings import ZOOM_MAX_LEVEL
 from .conf.settings import ZOOM_MIN_LEVEL
 from .conf import settings as document_settings
 from .widgets import document_thumbnail
+from .prerender import prerender_document_version
+from .literals import IMAGE_CACHE_PRUNE_INTERVAL
+from .runtime import image_cache
 
 # Document page links expressions
 
@@ -84,6 +92,7 @@ document_multiple_clear_transformations = {'text': _(u'clear transformations'),
 document_print = {'text': _(u'print'), 'view': 'document_print', 'args': 'object.id', 'famfam': 'printer', 'permissions': [PERMISSION_DOCUMENT_VIEW]}
 document_history_view = {'text': _(u'history'), 'view': 'history_for_object', 'args': ['"documents"', '"document"', 'object.id'], 'famfam': 'book_go', 'permissions': [PERMISSION_HISTORY_VIEW]}
 document_missing_list = {'text': _(u'Find missing document files'), 'view': 'document_missing_list', 'famfam': 'folder_page', 'permissions': [PERMISSION_DOCUMENT_VIEW]}
+document_image_cache_statistics = {'text': _(u'Document image cache statistics'), 'view': 'document_image_cache_statistics', 'famfam': 'camera', 'permissions': [PERMISSION_DOCUMENT_TOOLS]}
 
 # Tools
 document_clear_image_cache = {'text': _(u'Clear the document image cache'), 'view': 'document_clear_image_cache', 'famfam': 'camera_delete', 'permissions': [PERMISSION_DOCUMENT_TOOLS], 'description': _(u'Clear the graphics representations used to speed up the documents\' display and interactive transformations results.')}
@@ -178,9 +187,13 @@ register_links('document_page_transformation_create', [document_page_transformat
 register_links(['document_page_transformation_edit', 'document_page_transformation_delete'], [document_page_transformation_create], menu_name='sidebar')
 
 register_diagnostic('documents', _(u'Documents'), document_missing_list)
+register_diagnostic('documents', _(u'Documents'), document_image_cache_statistics)
 
 register_maintenance_links([document_find_all_duplicates, document_update_page_count, document_clear_image_cache], namespace='documents', title=_(u'documents'))
 
+register_job('prerender_document_version', prerender_document_version, title=_(u'Render the page images of a new document version.'), priority=JOB_PRIORITY_LOW, retries=0, unique=True)
+register_periodic_job('task_prune_image_cache', _(u'Remove the least recently used images when the document image cache is full.'), image_cache.prune, seconds=IMAGE_CACHE_PRUNE_INTERVAL, priority=JOB_PRIORITY_LOW)
+
 register_model_list_columns(Document, [
         {'name':_(u'thumbnail'), 'attribute':
             encapsulate(lambda x: document_thumbnail(x))
@@ -233,3 +246,38 @@ document_search.add_model_field('documentversion__documentpage__content', label=
 document_search.add_model_field('description', label=_(u'Description'))
 document_search.add_model_field('tags__name', label=_(u'Tags'))
 document_search.add_related_field('comments', 'Comment', 'comment', 'object_pk', label=_(u'Comments'))
+
+
+@receiver(post_save, dispatch_uid='document_search_index', sender=Document)
+def document_search_index(sender, instance, **kwargs):
+    document_search.index_object(instance.pk, ['document_type__name', 'description'])
+
+
+@receiver(post_delete, dispatch_uid='document_search_remove', sender=Document)
+def document_search_remove(sender, instance, **kwargs):
+    document_search.remove_object(instance.pk)
+
+
+@receiver(post_save, dispatch_uid='document_version_search_index', sender=DocumentVersion)
+@receiver(post_delete, dispatch_uid='document_version_search_remove', sender=DocumentVersion)
+def document_version_search_index(sender, instance, **kwargs):
+    document_search.index_object(instance.document_id, ['documentversion__mimetype', 'documentversion__filename'])
+
+
+@receiver(post_delete, dispatch_uid='document_version_conversion_invalidate', sender=DocumentVersion)
+def document_version_conversion_invalidate(sender, instance, **kwargs):
+    # Also called for the versions deleted in bulk along with their document
+    if instance.checksum and not DocumentVersion.objects.filter(checksum=instance.checksum).exists():
+        # No other document version shares this file's PDF conversion
+        invalidate_conversion(instance.checksum)
+
+
+@receiver(post_save, dispatch_uid='document_page_search_index', sender=DocumentPage)
+def document_page_search_index(sender, instance, **kwargs):
+    # Only the content of the page that changed is indexed again
+    document_search.update_index('documentversion__documentpage__content', instance.document_version.document_id, instance.pk, instance.content)
+
+
+@receiver(pre_delete, dispatch_uid='document_page_search_remove', sender=DocumentPage)
+def document_page_search_remove(sender, instance, **kwargs):
+    document_search.remove_source('documentversion__documentpage__content', instance.document_version.document_id, instance.pk)
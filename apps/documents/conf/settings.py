@@ -11,9 +11,9 @@ from storage.backends.filebasedstorage import FileBasedStorage
 from smart_settings.api import register_settings
 
 
-def default_checksum(x):
-    """hashlib.sha256(x).hexdigest()"""
-    return hashlib.sha256(x).hexdigest()
+def default_checksum():
+    """hashlib.sha256()"""
+    return hashlib.sha256()
 
 
 def default_uuid():
@@ -42,5 +42,8 @@ register_settings(
         {'name': u'ROTATION_STEP', 'global_name': u'DOCUMENTS_ROTATION_STEP', 'default': 90, 'description': _(u'Amount in degrees to rotate a document page per user interaction.')},
         #
         {'name': u'CACHE_PATH', 'global_name': u'DOCUMENTS_CACHE_PATH', 'default': os.path.join(settings.PROJECT_ROOT, 'image_cache'), 'exists': True},
+        {'name': u'CACHE_MAXIMUM_SIZE', 'global_name': u'DOCUMENTS_CACHE_MAXIMUM_SIZE', 'default': 1024 * 1024 * 1024, 'description': _(u'Maximum size in bytes of the document image cache, the least recently used images are removed periodically when exceeded.  Use None for no limit.')},
+        {'name': u'CACHE_MAXIMUM_ENTRIES', 'global_name': u'DOCUMENTS_CACHE_MAXIMUM_ENTRIES', 'default': None, 'description': _(u'Maximum amount of images to keep in the document image cache.  Use None for no limit.')},
+        {'name': u'PRERENDER', 'global_name': u'DOCUMENTS_PRERENDER', 'default': True, 'description': _(u'Queue a low priority job for the job workers to render the thumbnail and preview images of new documents so that they are already cached when first displayed.')},
     ]
 )
@@ -24,4 +24,10 @@ VERSION_UPDATE_MINOR = u'minor'
 VERSION_UPDATE_MICRO = u'micro'
 
 DEFAULT_ZIP_FILENAME = u'document_bundle.zip'
-DEFAULT_CSV_FILENAME = u'export.csv'
\ No newline at end of file
+DEFAULT_CSV_FILENAME = u'export.csv'
+
+# Amount of documents whose page counts are read with a single query
+PREFETCH_BATCH_SIZE = 100
+
+# Seconds between the evictions of the least recently used images
+IMAGE_CACHE_PRUNE_INTERVAL = 5 * 60
@@ -3,19 +3,182 @@ from __future__ import absolute_import
 from ast import literal_eval
 import datetime
 
-from django.db import models
+from django.db import connection, models
+from django.db.models import Count
+from django.db.models.query import QuerySet
+
+from common.utils import insert_rows
 
 from .conf.settings import RECENT_COUNT
+from .literals import PREFETCH_BATCH_SIZE
+
+
+class DocumentQuerySet(QuerySet):
+    def with_latest_versions(self):
+        """
+        Read the latest version of each document in the same query as the
+        document and the page counts of the latest versions with a single
+        query for every PREFETCH_BATCH_SIZE documents instead of two
+        queries per document
+        """
+        clone = self.select_related('latest_version')
+        clone._prefetch_page_counts = True
+        return clone
+
+    def with_checksum(self, checksum):
+        """
+        Return the documents with a version of the given checksum, an
+        indexed lookup cheap enough to check whether a file is already
+        stored before storing it again
+        """
+        return self.filter(documentversion__checksum=checksum).distinct()
+
+    def duplicates_of(self, document):
+        """
+        Return the other documents with a version of the same checksum as
+        the latest version of the document
+        """
+        return self.with_checksum(document.checksum).exclude(pk=document.pk)
+
+    def duplicated(self):
+        """
+        Return the documents with a version of the same checksum as the
+        latest version of another document, like the duplicates_of each
+        document.  The checksums are grouped in a derived table joined to
+        the versions, MySQL before 5.6 runs an IN subquery again for every
+        row
+        """
+        qn = connection.ops.quote_name
+        version_model = models.get_model('documents', 'DocumentVersion')
+        version_table = qn(version_model._meta.db_table)
+        checksum = qn(version_model._meta.get_field('checksum').column)
+        document = qn(version_model._meta.get_field('document').column)
+
+        cursor = connection.cursor()
+        cursor.execute(
+            'SELECT DISTINCT version.%(document)s FROM %(version_table)s version '
+            'INNER JOIN ('
+            'SELECT latest.%(checksum)s AS %(checksum)s FROM %(document_table)s document '
+            'INNER JOIN %(version_table)s latest ON latest.%(pk)s = document.%(latest_version)s '
+            'INNER JOIN %(version_table)s other ON other.%(checksum)s = latest.%(checksum)s AND other.%(document)s <> document.%(document_pk)s '
+            'GROUP BY latest.%(checksum)s'
+            ') duplicated ON duplicated.%(checksum)s = version.%(checksum)s' % {
+                'document_table': qn(self.model._meta.db_table),
+                'document_pk': qn(self.model._meta.pk.column),
+                'latest_version': qn(self.model._meta.get_field('latest_version').column),
+                'version_table': version_table,
+                'pk': qn(version_model._meta.pk.column),
+                'checksum': checksum,
+                'document': document,
+            }
+        )
+        return self.filter(pk__in=[row[0] for row in cursor.fetchall()])
+
+    def _clone(self, *args, **kwargs):
+        clone = super(DocumentQuerySet, self)._clone(*args, **kwargs)
+        clone._prefetch_page_counts = getattr(self, '_prefetch_page_counts', False)
+        return clone
+
+    def iterator(self):
+        if not getattr(self, '_prefetch_page_counts', False):
+            for document in super(DocumentQuerySet, self).iterator():
+                yield document
+            return
+
+        documents = []
+        for document in super(DocumentQuerySet, self).iterator():
+            documents.append(document)
+            if len(documents) == PREFETCH_BATCH_SIZE:
+                for prefetched in self.prefetch_page_counts(documents):
+                    yield prefetched
+                documents = []
+
+        for document in self.prefetch_page_counts(documents):
+            yield document
+
+    def prefetch_page_counts(self, documents):
+        versions = dict([(document.latest_version_id, document.latest_version) for document in documents if document.latest_version_id])
+        if versions:
+            for version in versions.values():
+                version._page_count = 0
+
+            page_counts = models.get_model('documents', 'DocumentPage').objects.filter(document_version__in=versions.keys()).values('document_version').annotate(page_count=Count('pk')).order_by()
+            for entry in page_counts:
+                versions[entry['document_version']]._page_count = entry['page_count']
+
+        return documents
+
+
+class DocumentManager(models.Manager):
+    def get_query_set(self):
+        return DocumentQuerySet(self.model, using=self._db)
+
+    def with_latest_versions(self):
+        return self.get_query_set().with_latest_versions()
+
+    def with_checksum(self, checksum):
+        return self.get_query_set().with_checksum(checksum)
+
+    def duplicates_of(self, document):
+        return self.get_query_set().duplicates_of(document)
+
+    def duplicated(self):
+        return self.get_query_set().duplicated()
+
+
+class DocumentPageManager(models.Manager):
+    def update_page_count(self, document_version, page_count):
+        """
+        Make the pages of a document version go from 1 to page_count, the
+        existing pages are read once and only the missing ones inserted or
+        the surplus ones deleted
+        """
+        existing = dict(self.filter(document_version=document_version).values_list('page_number', 'pk'))
+
+        surplus = [page_id for page_number, page_id in existing.items() if page_number > page_count]
+        if surplus:
+            # Deleted through the queryset, the signals that keep the search
+            # index up to date are still sent and the transformations of the
+            # pages are deleted in batches too
+            self.filter(pk__in=surplus).delete()
+
+        # New pages have no content to index, no signals are missed
+        insert_rows(self.model, ['document_version', 'page_number'], [(document_version.pk, page_number) for page_number in range(1, page_count + 1) if page_number not in existing])
 
 
 class DocumentPageTransformationManager(models.Manager):
+    def add_default_transformations(self, document_version, transformations):
+        """
+        Add the transformations to all the pages of a document version
+        that doesn't have any transformation yet
+        """
+        if not transformations or self.filter(document_page__document_version=document_version).exists():
+            return
+
+        page_ids = list(models.get_model('documents', 'DocumentPage').objects.filter(document_version=document_version).values_list('pk', flat=True))
+        insert_rows(self.model, ['document_page', 'order', 'transformation', 'arguments'], [(page_id, 0, transformation.get('transformation'), transformation.get('arguments')) for transformation in transformations for page_id in page_ids])
+
     def get_for_document_page(self, document_page):
         return self.model.objects.filter(document_page=document_page)
 
     def get_for_document_page_as_list(self, document_page):
+        return self.parse_transformations(self.get_for_document_page(document_page).values('transformation', 'arguments'))
+
+    def get_for_document_pages_as_lists(self, page_ids):
+        """
+        Return the transformations and warnings of each of the given
+        pages by page id, read with a single query
+        """
+        rows = {}
+        for row in self.model.objects.filter(document_page__in=page_ids).values('document_page', 'transformation', 'arguments'):
+            rows.setdefault(row['document_page'], []).append(row)
+
+        return dict([(page_id, self.parse_transformations(rows.get(page_id, []))) for page_id in page_ids])
+
+    def parse_transformations(self, rows):
         warnings = []
         transformations = []
-        for transformation in self.get_for_document_page(document_page).values('transformation', 'arguments'):
+        for transformation in rows:
             try:
                 transformations.append(
                     {
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import os
+import shutil
 import tempfile
 import hashlib
 from ast import literal_eval
@@ -13,30 +14,37 @@ try:
 except ImportError:
     from StringIO import StringIO
 
-from django.db import models
+from django.db import models, router
+from django.db.models import signals
 from django.utils.translation import ugettext_lazy as _
 from django.utils.translation import ugettext
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 
+from common.conf.settings import TEMPORARY_DIRECTORY
+
 from converter.api import get_page_count
 from converter.api import get_available_transformations_choices
-from converter.api import convert
+from converter.api import convert, convert_document
 from converter.exceptions import UnknownFileFormat, UnkownConvertError
+from job_processor.api import process_job
 from mimetype.api import (get_mimetype, get_icon_file_path,
     get_error_icon_file_path)
 from converter.literals import (DEFAULT_ZOOM_LEVEL, DEFAULT_ROTATION,
     DEFAULT_PAGE_NUMBER)
 
-from .conf.settings import (CHECKSUM_FUNCTION, UUID_FUNCTION,
-    STORAGE_BACKEND, DISPLAY_SIZE, CACHE_PATH,
-    ZOOM_MAX_LEVEL, ZOOM_MIN_LEVEL)
-from .managers import (DocumentPageTransformationManager, RecentDocumentManager,
+from .conf.settings import (UUID_FUNCTION,
+    STORAGE_BACKEND, DISPLAY_SIZE, ZOOM_MAX_LEVEL, ZOOM_MIN_LEVEL,
+    PRERENDER)
+from .managers import (DocumentManager, DocumentPageManager,
+    DocumentPageTransformationManager, RecentDocumentManager,
     DocumentTypeManager)
-from .utils import document_save_to_temp_dir
+from .utils import document_save_to_temp_dir, get_checksum, get_file_properties
 from .literals import (RELEASE_LEVEL_FINAL, RELEASE_LEVEL_CHOICES,
     VERSION_UPDATE_MAJOR, VERSION_UPDATE_MINOR, VERSION_UPDATE_MICRO)
 from .exceptions import NewDocumentVersionNotAllowed
+from .prerender import prerender_document_version
+from .runtime import image_cache
 
 # document image cache name hash function
 HASH_FUNCTION = lambda x: hashlib.sha256(x).hexdigest()
@@ -82,13 +90,14 @@ class Document(models.Model):
     document_type = models.ForeignKey(DocumentType, verbose_name=_(u'document type'), null=True, blank=True)
     description = models.TextField(blank=True, null=True, verbose_name=_(u'description'))
     date_added = models.DateTimeField(verbose_name=_(u'added'), db_index=True, editable=False)
+    # Maintained by the document versions when they are created or deleted
+    latest_version = models.ForeignKey('DocumentVersion', null=True, blank=True, editable=False, related_name='+', on_delete=models.SET_NULL, verbose_name=_(u'latest version'))
+
+    objects = DocumentManager()
 
     @staticmethod
     def clear_image_cache():
-        for the_file in os.listdir(CACHE_PATH):
-            file_path = os.path.join(CACHE_PATH, the_file)
-            if os.path.isfile(file_path):
-                os.unlink(file_path)
+        image_cache.clear()
 
     class Meta:
         verbose_name = _(u'document')
@@ -106,29 +115,122 @@ class Document(models.Model):
         if not self.pk:
             self.uuid = UUID_FUNCTION()
             self.date_added = datetime.datetime.now()
-        super(Document, self).save(*args, **kwargs)
+            super(Document, self).save(*args, **kwargs)
+        else:
+            # Write every field but latest_version, a version may have been
+            # added since this instance was read and DocumentVersion.save
+            # and delete maintain the pointer
+            using = kwargs.get('using') or router.db_for_write(Document, instance=self)
+            signals.pre_save.send(sender=Document, instance=self, raw=False, using=using)
+            if not Document.objects.using(using).filter(pk=self.pk).update(**dict([
+                (field.name, field.pre_save(self, False)) for field in self._meta.local_fields
+                if not field.primary_key and field.name != 'latest_version'
+            ])):
+                # No row yet for an explicitly set primary key
+                super(Document, self).save(*args, **kwargs)
+                return
+            self._state.db = using
+            signals.post_save.send(sender=Document, instance=self, created=False, raw=False, using=using)
+
+    def update_latest_version(self):
+        """
+        Point the document to its most recent version
+        """
+        try:
+            latest_version = self.documentversion_set.order_by('-timestamp')[0]
+        except IndexError:
+            latest_version = None
 
-    def get_cached_image_name(self, page, version):
-        document_version = DocumentVersion.objects.get(pk=version)
-        document_page = document_version.documentpage_set.get(page_number=page)
-        transformations, warnings = document_page.get_transformation_list()
-        hash_value = HASH_FUNCTION(u''.join([document_version.checksum, unicode(page), unicode(transformations)]))
-        return os.path.join(CACHE_PATH, hash_value), transformations
+        Document.objects.filter(pk=self.pk).update(latest_version=latest_version)
+        self.latest_version = latest_version
 
-    def get_image_cache_name(self, page, version):
-        cache_file_path, transformations = self.get_cached_image_name(page, version)
-        if os.path.exists(cache_file_path):
-            return cache_file_path
-        else:
-            document_version = DocumentVersion.objects.get(pk=version)
+    def get_image_cache_key(self, page, version, document_version=None):
+        document_version = document_version or DocumentVersion.objects.get(pk=version)
+        page = int(page)
+        try:
+            return self.get_image_cache_keys(document_version, [page])[page]
+        except KeyError:
+            raise DocumentPage.DoesNotExist
+
+    def get_image_cache_keys(self, document_version, page_numbers=None):
+        """
+        Return the image cache keys and the transformations of the pages
+        of a document version by page number, the pages and their
+        transformations are read with a query each
+        """
+        document_pages = document_version.pages.all()
+        if page_numbers is not None:
+            document_pages = document_pages.filter(page_number__in=page_numbers)
+        page_numbers = dict(document_pages.values_list('pk', 'page_number'))
+        transformation_lists = DocumentPageTransformation.objects.get_for_document_pages_as_lists(page_numbers.keys())
+
+        cache_keys = {}
+        for page_id, page_number in page_numbers.items():
+            transformations, warnings = transformation_lists[page_id]
+            cache_keys[page_number] = (HASH_FUNCTION(u''.join([document_version.checksum, unicode(page_number), unicode(transformations)])), transformations)
+        return cache_keys
+
+    def get_page_renderer(self, document_version, page, transformations):
+        def render_page(output_filepath):
             document_file = document_save_to_temp_dir(document_version, document_version.checksum)
-            return convert(document_file, output_filepath=cache_file_path, page=page, transformations=transformations, mimetype=self.file_mimetype)
+            convert(document_file, output_filepath=output_filepath, page=page, transformations=transformations, mimetype=document_version.mimetype, checksum=document_version.checksum)
+
+        return render_page
+
+    def get_image_cache_name(self, page, version):
+        document_version = DocumentVersion.objects.get(pk=version)
+        cache_key, transformations = self.get_image_cache_key(page, version, document_version)
+        return image_cache.get_or_create(cache_key, self.get_page_renderer(document_version, page, transformations))
+
+    def cache_page_images(self, version=None, page_numbers=None):
+        """
+        Render in a single pass the images of the pages of a document
+        version that are not in the image cache yet, returns the cached
+        image of each page by page number
+        """
+        if not version:
+            version = self.latest_version.pk
+
+        document_version = DocumentVersion.objects.get(pk=version)
+        cache_keys = self.get_image_cache_keys(document_version, page_numbers)
+        missing_pages = dict([(page_number, value) for page_number, value in cache_keys.items() if not image_cache.contains(value[0])])
+
+        image_cache_names = {}
+        if missing_pages:
+            render_directory = tempfile.mkdtemp(dir=TEMPORARY_DIRECTORY)
+            try:
+                document_file = document_save_to_temp_dir(document_version, document_version.checksum)
+                rendered_pages = convert_document(document_file, render_directory, first_page=min(missing_pages), last_page=max(missing_pages), mimetype=document_version.mimetype, checksum=document_version.checksum)
+                for rendered_filepath in rendered_pages:
+                    page_number = int(os.path.basename(rendered_filepath))
+                    if page_number in missing_pages:
+                        cache_key, transformations = missing_pages[page_number]
+                        if transformations:
+                            image_cache_names[page_number] = image_cache.get_or_create(cache_key, lambda output_filepath: convert(rendered_filepath, output_filepath=output_filepath, transformations=transformations))
+                        else:
+                            image_cache_names[page_number] = image_cache.get_or_create(cache_key, lambda output_filepath: shutil.move(rendered_filepath, output_filepath))
+            finally:
+                shutil.rmtree(render_directory, ignore_errors=True)
+
+        # The pages already cached and the ones missing from the single
+        # pass output
+        for page_number, (cache_key, transformations) in cache_keys.items():
+            if page_number not in image_cache_names:
+                image_cache_names[page_number] = image_cache.get_or_create(cache_key, self.get_page_renderer(document_version, page_number, transformations))
+
+        return image_cache_names
 
     def get_valid_image(self, size=DISPLAY_SIZE, page=DEFAULT_PAGE_NUMBER, zoom=DEFAULT_ZOOM_LEVEL, rotation=DEFAULT_ROTATION, version=None):
         if not version:
             version = self.latest_version.pk
         image_cache_name = self.get_image_cache_name(page=page, version=version)
-        return convert(image_cache_name, cleanup_files=False, size=size, zoom=zoom, rotation=rotation)
+        # Key the resized variant on the page image key
+        cache_key = HASH_FUNCTION(u''.join([os.path.basename(image_cache_name), unicode(size), unicode(zoom), unicode(rotation)]))
+
+        def render_variant(output_filepath):
+            convert(image_cache_name, output_filepath=output_filepath, cleanup_files=False, size=size, zoom=zoom, rotation=rotation)
+
+        return image_cache.get_or_create(cache_key, render_variant)
 
     def get_image(self, size=DISPLAY_SIZE, page=DEFAULT_PAGE_NUMBER, zoom=DEFAULT_ZOOM_LEVEL, rotation=DEFAULT_ROTATION, as_base64=False, version=None):
         if zoom < ZOOM_MIN_LEVEL:
@@ -157,10 +259,7 @@ class Document(models.Model):
             return file_path
 
     def invalidate_cached_image(self, page):
-        try:
-            os.unlink(self.get_cached_image_name(page, self.latest_version.pk)[0])
-        except OSError:
-            pass
+        image_cache.delete(self.get_image_cache_key(page, self.latest_version.pk)[0])
 
     def add_as_recent_document_for_user(self, user):
         RecentDocument.objects.add_document_for_user(user, self)
@@ -174,7 +273,12 @@ class Document(models.Model):
     def size(self):
         return self.latest_version.size
 
-    def new_version(self, file, user=None, comment=None, version_update=None, release_level=None, serial=None):
+    def new_version(self, file, user=None, comment=None, version_update=None, release_level=None, serial=None, checksum=None, mimetype=None, encoding=None, page_count=None):
+        """
+        Create a new version of the document from a file, callers that
+        already analyzed the file can pass its checksum, mimetype,
+        encoding and page count so that it is not read again
+        """
         logger.debug('creating new document version')
         if not self.is_new_versions_allowed(user=user):
             raise NewDocumentVersionNotAllowed
@@ -191,15 +295,21 @@ class Document(models.Model):
                 release_level=release_level,
                 serial=serial,
                 comment=comment,
+                checksum=checksum,
+                mimetype=mimetype,
+                encoding=encoding,
             )
-            new_version.save()
+            new_version.save(page_count=page_count)
         else:
             new_version_dict = {}
             new_version = DocumentVersion(
                 document=self,
                 file=file,
+                checksum=checksum,
+                mimetype=mimetype,
+                encoding=encoding,
             )
-            new_version.save()
+            new_version.save(page_count=page_count)
 
         logger.debug('new_version saved')
         return new_version
@@ -257,11 +367,7 @@ class Document(models.Model):
 
     @property
     def page_count(self):
-        return self.pages.count()
-
-    @property
-    def latest_version(self):
-        return self.documentversion_set.order_by('-timestamp')[0]
+        return self.latest_version.page_count
 
     @property
     def first_version(self):
@@ -323,7 +429,7 @@ class DocumentVersion(models.Model):
     mimetype = models.CharField(max_length=64, null=True, blank=True, editable=False)
     encoding = models.CharField(max_length=64, null=True, blank=True, editable=False)
     filename = models.CharField(max_length=255, default=u'', editable=False, db_index=True)
-    checksum = models.TextField(blank=True, null=True, verbose_name=_(u'checksum'), editable=False)
+    checksum = models.CharField(max_length=128, blank=True, null=True, verbose_name=_(u'checksum'), editable=False, db_index=True)
 
     class Meta:
         unique_together = ('document', 'major', 'minor', 'micro', 'release_level', 'serial')
@@ -371,10 +477,20 @@ class DocumentVersion(models.Model):
     def pages(self):
         return self.documentpage_set
 
+    @property
+    def page_count(self):
+        # Set by DocumentQuerySet.with_latest_versions
+        try:
+            return self._page_count
+        except AttributeError:
+            return self.pages.count()
+
     def save(self, *args, **kwargs):
         """
         Overloaded save method that updates the document version's checksum,
-        mimetype, page count and transformation when created
+        mimetype, page count and transformation when created.  Callers
+        that already know the checksum and mimetype can set them before
+        saving and pass the page count to avoid reading the file again
         """
         new_document = not self.pk
         if not self.pk:
@@ -382,20 +498,44 @@ class DocumentVersion(models.Model):
 
         #Only do this for new documents
         transformations = kwargs.pop('transformations', None)
+        page_count = kwargs.pop('page_count', None)
         super(DocumentVersion, self).save(*args, **kwargs)
 
+        if new_document:
+            # A new version is always the latest one
+            Document.objects.filter(pk=self.document_id).update(latest_version=self)
+            self.document.latest_version = self
+
         for key in sorted(DocumentVersion._post_save_hooks):
             DocumentVersion._post_save_hooks[key](self)
 
         if new_document:
             #Only do this for new documents
-            self.update_checksum(save=False)
-            self.update_mimetype(save=False)
-            self.save()
-            self.update_page_count(save=False)
+            filepath = None
+            if not self.checksum or not self.mimetype:
+                if not page_count:
+                    # Keep the local copy made while reading the file for
+                    # the page count detection
+                    handle, filepath = tempfile.mkstemp(dir=TEMPORARY_DIRECTORY)
+                    os.close(handle)
+                self.update_file_properties(save=False, filepath=filepath)
+                self.save()
+
+            try:
+                self.update_page_count(save=False, page_count=page_count, filepath=filepath)
+            finally:
+                if filepath:
+                    try:
+                        os.remove(filepath)
+                    except OSError:
+                        pass
+
             if transformations:
                 self.apply_default_transformations(transformations)
 
+            if PRERENDER:
+                process_job(prerender_document_version, self.pk)
+
     def update_checksum(self, save=True):
         """
         Open a document version's file and update the checksum field using the
@@ -403,61 +543,77 @@ class DocumentVersion(models.Model):
         """
         if self.exists():
             source = self.open()
-            self.checksum = unicode(CHECKSUM_FUNCTION(source.read()))
-            source.close()
+            try:
+                self.checksum = get_checksum(source)
+            finally:
+                source.close()
+            if save:
+                self.save()
+
+    def update_file_properties(self, save=True, filepath=None):
+        """
+        Read a document version's file once to update the checksum,
+        mimetype and encoding fields, copying it to filepath when given
+        """
+        if self.exists():
+            source = self.open()
+            try:
+                self.checksum, self.mimetype, self.encoding = get_file_properties(source, self.filename, filepath)
+            finally:
+                source.close()
             if save:
                 self.save()
 
-    def update_page_count(self, save=True):
-        handle, filepath = tempfile.mkstemp()
-        # Just need the filepath, close the file description
-        os.close(handle)
+    def update_page_count(self, save=True, page_count=None, filepath=None):
+        if page_count:
+            detected_pages = page_count
+        else:
+            detected_pages = self.detect_page_count(filepath)
+
+        DocumentPage.objects.update_page_count(self, detected_pages)
+
+        if save:
+            self.save()
+
+        return detected_pages
+
+    def detect_page_count(self, filepath=None):
+        """
+        Detect the page count from a local copy of the file, made now
+        unless the filepath of one is given
+        """
+        temporary = not filepath
+        if temporary:
+            handle, filepath = tempfile.mkstemp()
+            # Just need the filepath, close the file description
+            os.close(handle)
+            self.save_to_file(filepath)
 
-        self.save_to_file(filepath)
         try:
-            detected_pages = get_page_count(filepath)
+            detected_pages = get_page_count(filepath, checksum=self.checksum, mimetype=self.mimetype)
         except UnknownFileFormat:
             # If converter backend doesn't understand the format,
             # use 1 as the total page count
             detected_pages = 1
             self.description = ugettext(u'This document\'s file format is not known, the page count has therefore defaulted to 1.')
             self.save()
-        try:
-            os.remove(filepath)
-        except OSError:
-            pass
-
-        current_pages = self.documentpage_set.order_by('page_number',)
-        if current_pages.count() > detected_pages:
-            for page in current_pages[detected_pages:]:
-                page.delete()
-
-        for page_number in range(detected_pages):
-            DocumentPage.objects.get_or_create(
-                document_version=self, page_number=page_number + 1)
 
-        if save:
-            self.save()
+        if temporary:
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
 
         return detected_pages
 
     def apply_default_transformations(self, transformations):
         #Only apply default transformations on new documents
-        if reduce(lambda x, y: x + y, [page.documentpagetransformation_set.count() for page in self.pages.all()]) == 0:
-            for transformation in transformations:
-                for document_page in self.pages.all():
-                    page_transformation = DocumentPageTransformation(
-                        document_page=document_page,
-                        order=0,
-                        transformation=transformation.get('transformation'),
-                        arguments=transformation.get('arguments')
-                    )
-
-                    page_transformation.save()
+        DocumentPageTransformation.objects.add_default_transformations(self, transformations)
 
     def revert(self):
         """
-        Delete the subsequent versions after this one
+        Delete the subsequent versions after this one, their deletion
+        makes this version the latest one again
         """
         for version in self.document.versions.filter(timestamp__gt=self.timestamp):
             version.delete()
@@ -479,7 +635,9 @@ class DocumentVersion(models.Model):
 
     def delete(self, *args, **kwargs):
         self.file.storage.delete(self.file.path)
-        return super(DocumentVersion, self).delete(*args, **kwargs)
+        result = super(DocumentVersion, self).delete(*args, **kwargs)
+        self.document.update_latest_version()
+        return result
 
     def exists(self):
         """
@@ -566,6 +724,8 @@ class DocumentPage(models.Model):
     page_label = models.CharField(max_length=32, blank=True, null=True, verbose_name=_(u'page label'))
     page_number = models.PositiveIntegerField(default=1, editable=False, verbose_name=_(u'page number'), db_index=True)
 
+    objects = DocumentPageManager()
+
     def __unicode__(self):
         return _(u'Page %(page_num)d out of %(total_pages)d of %(document)s') % {
             'document': unicode(self.document),
@@ -0,0 +1,46 @@
+from __future__ import absolute_import
+
+import logging
+
+from django.db import models
+
+from converter.exceptions import UnknownFileFormat
+
+from .conf import settings as document_settings
+
+logger = logging.getLogger(__name__)
+
+
+def prerender_document_version(document_version_pk):
+    """
+    Render the images of every page of a document version at the
+    thumbnail and preview sizes so that they are already in the image
+    cache when first requested by a view.  Queued as a low priority job
+    so that it runs in the job workers and not in the web processes
+    """
+    document_version_model = models.get_model('documents', 'DocumentVersion')
+    try:
+        document_version = document_version_model.objects.get(pk=document_version_pk)
+    except document_version_model.DoesNotExist:
+        # Deleted before the job ran
+        return
+
+    sizes = [
+        document_settings.THUMBNAIL_SIZE,
+        document_settings.MULTIPAGE_PREVIEW_SIZE,
+        document_settings.PREVIEW_SIZE
+    ]
+
+    document = document_version.document
+    try:
+        # Rasterize all the pages at once before resizing them
+        document.cache_page_images(version=document_version.pk)
+        for page_number in document_version.pages.values_list('page_number', flat=True):
+            for size in sizes:
+                document.get_valid_image(size=size, page=page_number, version=document_version.pk)
+    except UnknownFileFormat:
+        # Views will display the mimetype icon instead
+        logger.debug('unknown file format, document version: %s' % document_version_pk)
+        return
+
+    logger.debug('pre-rendered document version: %s' % document_version_pk)
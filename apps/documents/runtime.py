@@ -0,0 +1,13 @@
+from __future__ import absolute_import
+
+from common.file_cache import FileCache
+
+from .conf import settings as document_settings
+
+image_cache = FileCache(
+    name=u'document_images',
+    # Evaluated lazily, CACHE_PATH is replaced at startup if not valid
+    path=lambda: document_settings.CACHE_PATH,
+    maximum_size=document_settings.CACHE_MAXIMUM_SIZE,
+    maximum_entries=document_settings.CACHE_MAXIMUM_ENTRIES
+)
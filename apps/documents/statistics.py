@@ -7,6 +7,7 @@ from common.utils import pretty_size, pretty_size_10
 
 from .conf.settings import STORAGE_BACKEND
 from .models import Document, DocumentType, DocumentPage, DocumentVersion
+from .runtime import image_cache
 
 
 def get_used_size(path, file_list):
@@ -71,3 +72,28 @@ def get_statistics():
         'title': _(u'Document statistics'),
         'paragraphs': paragraphs
     }
+
+
+def get_image_cache_statistics():
+    statistics = image_cache.get_statistics()
+    lookups = statistics['hits'] + statistics['misses']
+
+    paragraphs = [
+        _(u'Cached images: %d') % statistics['entries'],
+        _(u'Space used by cached images: %(base_2)s (base 2), %(bytes)d bytes') % {
+            'base_2': pretty_size(statistics['size']),
+            'bytes': statistics['size']
+        },
+        _(u'Maximum cache size: %s') % (pretty_size(statistics['maximum_size']) if statistics['maximum_size'] else _(u'unlimited')),
+        _(u'Maximum cached images: %s') % (statistics['maximum_entries'] or _(u'unlimited')),
+        _(u'Cache hits: %d') % statistics['hits'],
+        _(u'Cache misses: %d') % statistics['misses'],
+        _(u'Hit ratio: %0.2f%%') % (100.0 * statistics['hits'] / lookups if lookups else 0),
+        _(u'Images rendered: %d') % statistics['writes'],
+        _(u'Images evicted: %d') % statistics['evictions'],
+    ]
+
+    return {
+        'title': _(u'Document image cache'),
+        'paragraphs': paragraphs
+    }
@@ -8,7 +8,8 @@ from django.core.files.base import File
 
 from django_gpg.api import SIGNATURE_STATE_VALID
 
-from .models import Document, DocumentType
+from .models import (Document, DocumentType, DocumentPage,
+    DocumentPageTransformation, DocumentVersion)
 from .literals import VERSION_UPDATE_MAJOR, RELEASE_LEVEL_FINAL
 
 
@@ -83,3 +84,147 @@ class DocumentTestCase(unittest.TestCase):
 
     def tearDown(self):
         self.document.delete()
+
+
+class DocumentPageBulkTestCase(unittest.TestCase):
+    def setUp(self):
+        self.document_type = DocumentType(name='test bulk pages')
+        self.document_type.save()
+
+        self.document = Document(document_type=self.document_type)
+        self.document.save()
+
+        file_object = open(os.path.join(settings.PROJECT_ROOT, 'contrib', 'mayan_11_1.pdf'))
+        self.document_version = self.document.new_version(file=File(file_object, name='mayan_11_1.pdf'))
+        file_object.close()
+
+    def get_page_numbers(self):
+        return sorted(DocumentPage.objects.filter(document_version=self.document_version).values_list('page_number', flat=True))
+
+    def runTest(self):
+        self.failUnlessEqual(self.get_page_numbers(), range(1, 48))
+
+        DocumentPage.objects.update_page_count(self.document_version, 50)
+        self.failUnlessEqual(self.get_page_numbers(), range(1, 51))
+
+        transformations = [{'transformation': u'rotate', 'arguments': u"{'degrees': 90}"}]
+        DocumentPageTransformation.objects.add_default_transformations(self.document_version, transformations)
+        self.failUnlessEqual(DocumentPageTransformation.objects.filter(document_page__document_version=self.document_version).count(), 50)
+
+        # Not added again to pages that already have transformations
+        DocumentPageTransformation.objects.add_default_transformations(self.document_version, transformations)
+        self.failUnlessEqual(DocumentPageTransformation.objects.filter(document_page__document_version=self.document_version).count(), 50)
+
+        # The transformations of the deleted pages are deleted with them
+        DocumentPage.objects.update_page_count(self.document_version, 10)
+        self.failUnlessEqual(self.get_page_numbers(), range(1, 11))
+        self.failUnlessEqual(DocumentPageTransformation.objects.filter(document_page__document_version=self.document_version).count(), 10)
+
+        # The transformations of all the pages read with a single query
+        # match the ones read a page at a time
+        document_pages = list(DocumentPage.objects.filter(document_version=self.document_version))
+        transformation_lists = DocumentPageTransformation.objects.get_for_document_pages_as_lists([document_page.pk for document_page in document_pages])
+        for document_page in document_pages:
+            self.failUnlessEqual(transformation_lists[document_page.pk], document_page.get_transformation_list())
+
+    def tearDown(self):
+        self.document.delete()
+        self.document_type.delete()
+
+
+class DocumentDuplicatesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.document_type = DocumentType(name='test duplicates')
+        self.document_type.save()
+
+        # The first document and the first version of the second document
+        # are the same file, the third document is unique
+        self.documents = []
+        for filenames in [['mayan_11_1.pdf'], ['mayan_11_1.pdf', 'mayan_11_1.pdf.gpg'], ['mayan_11_1.pdf.sig']]:
+            document = Document(document_type=self.document_type)
+            document.save()
+            for index, filename in enumerate(filenames):
+                new_version_data = {}
+                if index:
+                    new_version_data = {
+                        'comment': 'test duplicates',
+                        'version_update': VERSION_UPDATE_MAJOR,
+                        'release_level': RELEASE_LEVEL_FINAL,
+                        'serial': 0,
+                    }
+                file_object = open(os.path.join(settings.PROJECT_ROOT, 'contrib', filename), 'rb')
+                document.new_version(file=File(file_object, name=filename), **new_version_data)
+                file_object.close()
+            self.documents.append(document)
+
+    def runTest(self):
+        first, second, third = self.documents
+
+        # An older version matches the latest version of another document
+        self.failUnlessEqual(sorted(Document.objects.duplicated().values_list('pk', flat=True)), sorted([first.pk, second.pk]))
+        self.failUnlessEqual(list(Document.objects.filter(pk=first.pk).duplicated()), [first])
+
+        self.failUnlessEqual(list(Document.objects.duplicates_of(first)), [second])
+        self.failUnlessEqual(list(Document.objects.duplicates_of(second)), [])
+        self.failUnlessEqual(list(Document.objects.duplicates_of(third)), [])
+
+    def tearDown(self):
+        for document in self.documents:
+            document.delete()
+        self.document_type.delete()
+
+
+class DocumentLatestVersionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.document_type = DocumentType(name='test latest version')
+        self.document_type.save()
+
+        self.document = Document(document_type=self.document_type)
+        self.document.save()
+
+    def add_version(self, filename, **new_version_data):
+        file_object = open(os.path.join(settings.PROJECT_ROOT, 'contrib', filename), 'rb')
+        self.document.new_version(file=File(file_object, name=filename), **new_version_data)
+        file_object.close()
+        return self.document.versions.order_by('-timestamp')[0]
+
+    def get_latest_version(self):
+        # Read the pointer stored in the database
+        return Document.objects.get(pk=self.document.pk).latest_version
+
+    def runTest(self):
+        self.failUnlessEqual(self.get_latest_version(), None)
+
+        new_version_data = {
+            'comment': 'test latest version',
+            'version_update': VERSION_UPDATE_MAJOR,
+            'release_level': RELEASE_LEVEL_FINAL,
+            'serial': 0,
+        }
+        first = self.add_version('mayan_11_1.pdf')
+        self.failUnlessEqual(self.get_latest_version(), first)
+        stale = Document.objects.get(pk=self.document.pk)
+        second = self.add_version('mayan_11_1.pdf.gpg', **new_version_data)
+        third = self.add_version('mayan_11_1.pdf', **new_version_data)
+        self.failUnlessEqual(self.get_latest_version(), third)
+        self.failUnlessEqual(self.document.latest_version, third)
+
+        # Saving an instance read before the new versions keeps the pointer
+        stale.description = u'stale'
+        stale.save()
+        self.failUnlessEqual(self.get_latest_version(), third)
+        self.failUnlessEqual(Document.objects.get(pk=self.document.pk).description, u'stale')
+
+        third.delete()
+        self.failUnlessEqual(self.get_latest_version(), second)
+
+        first.revert()
+        self.failUnlessEqual(self.get_latest_version(), first)
+        self.failUnlessEqual(list(DocumentVersion.objects.filter(document=self.document)), [first])
+
+        DocumentVersion.objects.get(pk=first.pk).delete()
+        self.failUnlessEqual(self.get_latest_version(), None)
+
+    def tearDown(self):
+        self.document.delete()
+        self.document_type.delete()
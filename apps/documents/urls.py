@@ -45,6 +45,7 @@ urlpatterns = patterns('documents.views',
     url(r'^duplicates/list/$', 'document_find_all_duplicates', (), 'document_find_all_duplicates'),
     url(r'^maintenance/update_page_count/$', 'document_update_page_count', (), 'document_update_page_count'),
     url(r'^maintenance/clear_image_cache/$', 'document_clear_image_cache', (), 'document_clear_image_cache'),
+    url(r'^maintenance/image_cache/statistics/$', 'document_image_cache_statistics', (), 'document_image_cache_statistics'),
 
     url(r'^page/(?P<document_page_id>\d+)/$', 'document_page_view', (), 'document_page_view'),
     url(r'^page/(?P<document_page_id>\d+)/text/$', 'document_page_text', (), 'document_page_text'),
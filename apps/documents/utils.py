@@ -1,7 +1,93 @@
+from __future__ import absolute_import
+
 import os
 
 from common.conf.settings import TEMPORARY_DIRECTORY
+from mimetype.api import SNIFF_SIZE, get_mimetype_from_buffer
+
+from .conf.settings import CHECKSUM_FUNCTION
+
+COPY_BUFFER_SIZE = 1024 * 1024
 
-def document_save_to_temp_dir(document, filename, buffer_size=1024 * 1024):
+
+def document_save_to_temp_dir(document, filename, buffer_size=COPY_BUFFER_SIZE):
     temporary_path = os.path.join(TEMPORARY_DIRECTORY, filename)
     return document.save_to_file(temporary_path, buffer_size)
+
+
+class ChecksumCalculator(object):
+    """
+    Calculate the checksum of a file fed in blocks.  CHECKSUM_FUNCTION is
+    either a hashlib style constructor, returning an object with the
+    update and hexdigest methods when called without arguments, or a
+    function called with the whole content of the file returning the
+    checksum, which requires keeping the blocks in memory
+    """
+    def __init__(self, checksum_function=CHECKSUM_FUNCTION):
+        self.checksum_function = checksum_function
+        try:
+            self.hasher = checksum_function()
+        except TypeError:
+            self.hasher = None
+
+        if not (hasattr(self.hasher, 'update') and hasattr(self.hasher, 'hexdigest')):
+            self.hasher = None
+            self.blocks = []
+
+    def update(self, block):
+        if self.hasher:
+            self.hasher.update(block)
+        else:
+            self.blocks.append(block)
+
+    def get_checksum(self):
+        if self.hasher:
+            return unicode(self.hasher.hexdigest())
+        else:
+            return unicode(self.checksum_function(''.join(self.blocks)))
+
+
+def get_checksum(descriptor, buffer_size=COPY_BUFFER_SIZE):
+    checksum = ChecksumCalculator()
+    while True:
+        block = descriptor.read(buffer_size)
+        if not block:
+            break
+        checksum.update(block)
+
+    return checksum.get_checksum()
+
+
+def get_file_properties(descriptor, filename, filepath=None, buffer_size=COPY_BUFFER_SIZE):
+    """
+    Read a file once, in blocks: they are fed to the checksum function,
+    the first ones are used to detect the mimetype and, when filepath is
+    given, they are all copied there.  Returns the checksum, the mimetype
+    and the encoding
+    """
+    checksum = ChecksumCalculator()
+    head = []
+    head_size = 0
+    destination = filepath and open(filepath, 'wb')
+    try:
+        while True:
+            block = descriptor.read(buffer_size)
+            if not block:
+                break
+
+            checksum.update(block)
+            if head_size < SNIFF_SIZE:
+                head.append(block[:SNIFF_SIZE - head_size])
+                head_size += len(head[-1])
+            if destination:
+                destination.write(block)
+    finally:
+        if destination:
+            destination.close()
+
+    try:
+        mimetype, encoding = get_mimetype_from_buffer(''.join(head), filename)
+    except:
+        mimetype, encoding = u'', u''
+
+    return checksum.get_checksum(), mimetype, encoding
@@ -8,6 +8,7 @@ from .forms import DocumentTypeSelectForm, DocumentForm_edit, \
     DocumentPageTransformationForm, DocumentContentForm, DocumentPageForm_edit, \
     DocumentPageForm_text, PrintForm, DocumentTypeForm, DocumentTypeFilenameForm, \
     DocumentTypeFilenameForm_create, DocumentDownloadForm
+from .managers import DocumentQuerySet
 from .models import Document, DocumentType, DocumentPage, \
     DocumentPageTransformation, RecentDocument, DocumentTypeFilename, \
     DocumentVersion
@@ -18,9 +19,10 @@ from .permissions import PERMISSION_DOCUMENT_CREATE, \
     PERMISSION_DOCUMENT_EDIT, PERMISSION_DOCUMENT_VERSION_REVERT, \
     PERMISSION_DOCUMENT_TYPE_EDIT, PERMISSION_DOCUMENT_TYPE_DELETE, \
     PERMISSION_DOCUMENT_TYPE_CREATE, PERMISSION_DOCUMENT_TYPE_VIEW
+from .statistics import get_image_cache_statistics
 from .wizards import DocumentCreateWizard
 from acls.models import AccessEntry
-from common.compressed_files import CompressedFile
+from common.compressed_files import ZipStream, COMPRESSED_MIMETYPES
 from common.conf.settings import DEFAULT_PAPER_SIZE
 from common.literals import PAGE_SIZE_DIMENSIONS, PAGE_ORIENTATION_PORTRAIT, \
     PAGE_ORIENTATION_LANDSCAPE
@@ -37,6 +39,7 @@ from django.core.exceptions import PermissionDenied
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse
 from django.db.models import Q
+from django.db.models.query import QuerySet
 from django.http import HttpResponseRedirect, HttpResponse
 from django.shortcuts import render_to_response, get_object_or_404
 from django.template import RequestContext
@@ -47,7 +50,6 @@ from document_indexing.api import update_indexes, delete_indexes
 from documents.forms import DocumentExportMetadataForm
 from filetransfers.api import serve_file
 from history.api import create_history
-from itertools import chain
 from metadata.forms import MetadataFormSet, MetadataSelectionForm
 from metadata.models import MetadataType, DocumentMetadata
 from navigation.utils import resolve_to_name
@@ -65,12 +67,6 @@ logger = logging.getLogger(__name__)
 
 
 def document_list(request, object_list=None, title=None, extra_context=None,):
-    
-    pre_object_list = None
-    pre_object_list1 = None
-    pre_object_list2 = None
-    pre_object_list3 = None
-    
     filter_columns = {}
     
     filters_found = False
@@ -86,67 +82,29 @@ def document_list(request, object_list=None, title=None, extra_context=None,):
 
     sort_column = request.GET.get('sort_column', '')
     sort_type = request.GET.get('sort_type', '')
-    if sort_column is not '':
+
+    if object_list is None:
+        object_list = Document.objects.all()
+    elif not isinstance(object_list, QuerySet) and (filter_columns or sort_column):
+        # Lists of documents are sorted and filtered in the database too
+        object_list = Document.objects.filter(pk__in=[document.pk for document in object_list])
+
+    if filter_columns:
+        pre_object_list = DocumentMetadata.objects.filter_documents(object_list, filter_columns)
+    else:
+        pre_object_list = object_list
+
+    if sort_column:
         if sort_type == 'desc':
             sort_type = '-'
         else:
             sort_type = ''
 
         if sort_column.startswith('metadata_'):
-            sort_column = sort_column[9:]
-            
-            sort_metadata_type = MetadataType.objects.get(name = sort_column)
-            
-            if object_list is None:
-                object_list = Document.objects
-            
-            # filter list that has current metadata selected sort
-            pre_object_list1 = object_list.filter(documentmetadata__metadata_type__id=sort_metadata_type.id)
-            pre_object_list1 = pre_object_list1.order_by(sort_type + 'documentmetadata__value')
-            
-            # filter list that has not current metadata selected sort
-            pre_object_list2 = object_list.exclude(documentmetadata__metadata_type__id=sort_metadata_type.id)
-            
-            # filter list that has current metadata selected sort, but the value of a metadata is empty or null
-            pre_object_list3 = object_list.filter(Q(documentmetadata__metadata_type__id=sort_metadata_type.id), Q(documentmetadata__value=None) | Q(documentmetadata__value=''))
-            
-            #since nothing else worked using django ql we remove values that has empty metadata value manually
-            pre_object_list1 = pre_object_list1.exclude(id__in=pre_object_list3)
-
-            if len(filter_columns.values()) > 0:
-                for filter_column in filter_columns.keys():
-                    filter_value = filter_columns[filter_column]
-                    if filter_value != '':
-                        sort_metadata_type = MetadataType.objects.get(name = filter_column)
-                        pre_object_list1 = pre_object_list1.filter(Q(documentmetadata__metadata_type__id=sort_metadata_type.id), Q(documentmetadata__value__icontains=filter_value))
-                        pre_object_list2 = pre_object_list2.filter(Q(documentmetadata__metadata_type__id=sort_metadata_type.id), Q(documentmetadata__value__icontains=filter_value))
-                        pre_object_list3 = pre_object_list3.filter(Q(documentmetadata__metadata_type__id=sort_metadata_type.id), Q(documentmetadata__value__icontains=filter_value))
-    
-        else:
-            if not object_list is None:
-                pre_object_list = object_list.order_by(sort_type + sort_column)
-            else:
-                pre_object_list =  Document.objects.order_by(sort_type + sort_column)
-            if len(filter_columns.values()) > 0:
-                for filter_column in filter_columns.keys():
-                    filter_value = filter_columns[filter_column]
-                    if filter_value != '':
-                        sort_metadata_type = MetadataType.objects.get(name = filter_column)
-                        pre_object_list = pre_object_list.filter(Q(documentmetadata__metadata_type__id=sort_metadata_type.id), Q(documentmetadata__value__icontains=filter_value))
-    else:
-        pre_object_list = object_list if not (object_list is None) else Document.objects.all()
-        if len(filter_columns.values()) > 0:
-            for filter_column in filter_columns.keys():
-                filter_value = filter_columns[filter_column]
-                if filter_value != '':
-                    sort_metadata_type = MetadataType.objects.get(name = filter_column)
-                    pre_object_list = pre_object_list.filter(Q(documentmetadata__metadata_type__id=sort_metadata_type.id), Q(documentmetadata__value__icontains=filter_value))
-
-    if sort_column is not '' :
-        if sort_type == '-':
-            pre_object_list = list(chain(pre_object_list2, pre_object_list3, pre_object_list1))
+            # A single query, documents without a value go last
+            pre_object_list = DocumentMetadata.objects.sort_documents(pre_object_list, sort_column[9:], descending=sort_type == '-')
         else:
-            pre_object_list = list(chain(pre_object_list1, pre_object_list3, pre_object_list2))
+            pre_object_list = pre_object_list.order_by(sort_type + sort_column)
 
     check_documents_permissions = True
     if extra_context is not None and 'check_documents_permissions' in extra_context.keys():
@@ -164,13 +122,18 @@ def document_list(request, object_list=None, title=None, extra_context=None,):
     else:
         final_object_list = pre_object_list
 
+    if isinstance(final_object_list, DocumentQuerySet):
+        # Avoid reading the latest version and the page count of each
+        # listed document separately
+        final_object_list = final_object_list.with_latest_versions()
+
     context = {
         'object_list': final_object_list,
         'title': title if title else _(u'documents'),
         'multi_select_as_buttons': True,
         'hide_links': True,
         'display_metadata_columns' : True,
-        'sort_identifier': 'documentversion__filename',
+        'sort_identifier': 'latest_version__filename',
         'filter_column_count': len(filter_columns.values()),
         'filter_columns': filter_columns,
         'metadata_translation': _(u'metadata')
@@ -185,20 +148,10 @@ def document_list(request, object_list=None, title=None, extra_context=None,):
     if extra_context:
         context.update(extra_context)
 
-    metadata_columns = []
-    for obj in final_object_list:
-        metadata_set = obj.documentmetadata_set.all()
-        for metadata in metadata_set:
-            metadata_internal_name = unicode(metadata.metadata_type.name)
-            metadata_external_name = unicode(metadata)
-            found = False
-            for metadata in metadata_columns:
-                if metadata['internal_name'] == metadata_internal_name:
-                    found = True
-                    break
-            if not found:
-                metadata_columns.append({ 'internal_name' :  metadata_internal_name, 'external_name' :  metadata_external_name })
-                
+    metadata_columns = [
+        {'internal_name': metadata_type.name, 'external_name': unicode(metadata_type)}
+        for metadata_type in MetadataType.objects.get_for_documents(final_object_list)
+    ]
     metadata_columns.sort()
     context['metadata_columns'] = metadata_columns
 
@@ -379,11 +332,6 @@ def document_edit(request, document_id):
         old_document = copy.copy(document)
         form = DocumentForm_edit(request.POST, instance=document)
         if form.is_valid():
-            warnings = delete_indexes(document)
-            if request.user.is_staff or request.user.is_superuser:
-                for warning in warnings:
-                    messages.warning(request, warning)
-
             document.filename = form.cleaned_data['new_filename']
             document.description = form.cleaned_data['description']
 
@@ -481,20 +429,19 @@ def document_download(request, document_id=None, document_id_list=None, document
         if form.is_valid():
             if form.cleaned_data['compressed'] or len(document_versions) > 1:
                 try:
-                    compressed_file = CompressedFile()
+                    # Test permissions and trigger exception
                     for document_version in document_versions:
-                        descriptor = document_version.open()
-                        compressed_file.add_file(descriptor, arcname=document_version.filename)
-                        descriptor.close()
+                        document_version.open().close()
 
-                    compressed_file.close()
+                    # The archive is generated while it is being sent,
+                    # the member files are read one chunk at a time
+                    zip_stream = ZipStream()
+                    for document_version in document_versions:
+                        zip_stream.add_file(document_version.open, arcname=document_version.filename, compress=document_version.mimetype not in COMPRESSED_MIMETYPES, date_time=document_version.timestamp)
 
-                    return serve_file(
-                        request,
-                        compressed_file.as_file(form.cleaned_data['zip_filename']),
-                        save_as=u'"%s"' % form.cleaned_data['zip_filename'],
-                        content_type='application/zip'
-                    )
+                    response = HttpResponse(zip_stream, content_type='application/zip')
+                    response['Content-Disposition'] = u'attachment; filename="%s"' % form.cleaned_data['zip_filename']
+                    return response
                     # TODO: DO a redirection afterwards
                 except Exception, e:
                     if settings.DEBUG:
@@ -759,10 +706,15 @@ def document_find_duplicates(request, document_id):
         'title': _(u'duplicates of: %s') % document,
         'object': document,
     }
-    return _find_duplicate_list(request, [document], include_source=True, confirmation=False, extra_context=extra_context)
+    duplicates = Document.objects.duplicates_of(document)
+    if duplicates.exists():
+        # Include the document itself
+        duplicates = Document.objects.filter(Q(pk=document.pk) | Q(pk__in=duplicates.values('pk')))
 
+    return _find_duplicate_list(request, duplicates, confirmation=False, extra_context=extra_context)
 
-def _find_duplicate_list(request, source_document_list=Document.objects.all(), include_source=False, confirmation=True, extra_context=None):
+
+def _find_duplicate_list(request, duplicates, confirmation=True, extra_context=None):
     previous = request.POST.get('previous', request.GET.get('previous', request.META.get('HTTP_REFERER', None)))
 
     if confirmation and request.method != 'POST':
@@ -773,14 +725,6 @@ def _find_duplicate_list(request, source_document_list=Document.objects.all(), i
             'form_icon': u'page_refresh.png',
         }, context_instance=RequestContext(request))
     else:
-        duplicated = []
-        for document in source_document_list:
-            if document.pk not in duplicated:
-                results = DocumentVersion.objects.filter(checksum=document.latest_version.checksum).exclude(id__in=duplicated).exclude(pk=document.pk).values_list('document__pk', flat=True)
-                duplicated.extend(results)
-
-                if include_source and results:
-                    duplicated.append(document.pk)
         context = {
             'hide_links': True,
             'multi_select_as_buttons': True,
@@ -791,14 +735,14 @@ def _find_duplicate_list(request, source_document_list=Document.objects.all(), i
 
         return document_list(
             request,
-            object_list=Document.objects.filter(pk__in=duplicated),
+            object_list=duplicates,
             title=_(u'duplicated documents'),
             extra_context=context
         )
 
 
 def document_find_all_duplicates(request):
-    return _find_duplicate_list(request, include_source=True)
+    return _find_duplicate_list(request, Document.objects.duplicated())
 
 
 def document_update_page_count(request):
@@ -1516,6 +1460,15 @@ def document_clear_image_cache(request):
     }, context_instance=RequestContext(request))
 
 
+def document_image_cache_statistics(request):
+    Permission.objects.check_permissions(request.user, [PERMISSION_DOCUMENT_TOOLS])
+
+    return render_to_response('statistics.html', {
+        'blocks': [get_image_cache_statistics()],
+        'title': _(u'Document image cache statistics'),
+    }, context_instance=RequestContext(request))
+
+
 def document_version_list(request, document_pk):
     document = get_object_or_404(Document, pk=document_pk)
 
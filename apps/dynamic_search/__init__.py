@@ -1,10 +1,19 @@
+from __future__ import absolute_import
+
 from django.utils.translation import ugettext_lazy as _
 
 from navigation.api import register_sidebar_template, register_links
+from main.api import register_maintenance_links
+from job_processor.api import register_job
+from job_processor.literals import JOB_PRIORITY_LOW
+
+from .permissions import PERMISSION_SEARCH_INDEX_REBUILD
+from .tools import do_rebuild_search_index
 
 search = {'text': _(u'search'), 'view': 'search', 'famfam': 'zoom'}
 search_advanced = {'text': _(u'advanced search'), 'view': 'search_advanced', 'famfam': 'zoom_in'}
 search_again = {'text': _(u'search again'), 'view': 'search_again', 'famfam': 'arrow_undo'}
+search_index_rebuild = {'text': _(u'rebuild search index'), 'view': 'search_index_rebuild', 'famfam': 'zoom', 'permissions': [PERMISSION_SEARCH_INDEX_REBUILD], 'description': _(u'Deletes and creates from scratch the index used to answer the searches.')}
 
 register_sidebar_template(['search', 'search_advanced'], 'search_help.html')
 
@@ -12,3 +21,6 @@ register_links(['search', 'search_advanced', 'results'], [search, search_advance
 register_links(['results'], [search_again], menu_name='sidebar')
 
 register_sidebar_template(['search', 'search_advanced', 'results'], 'recent_searches.html')
+
+register_maintenance_links([search_index_rebuild], namespace='dynamic_search', title=_(u'Search'))
+register_job('do_rebuild_search_index', do_rebuild_search_index, title=_(u'Rebuild the search index.'), priority=JOB_PRIORITY_LOW, retries=0, unique=True)
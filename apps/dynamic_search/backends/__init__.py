@@ -0,0 +1,43 @@
+from django.utils.importlib import import_module
+
+
+class SearchBackendBase(object):
+    """
+    Base class that all search backend classes must inherit
+    """
+    def search(self, search_model, search_dict, global_and_search=False):
+        """
+        Return a QuerySet of the objects of the search model that match
+        the searches of search_dict, best matches first when the backend
+        ranks the results
+        """
+        raise NotImplementedError("Your %s class has not defined a search() method, which is required." % self.__class__.__name__)
+
+    def update_index(self, search_model, field_name, object_id, source_id, text):
+        """
+        Update the indexed text of a single source row of a search field,
+        backends that don't keep an index ignore the changes
+        """
+
+    def index_object(self, search_model, object_id, field_names=None):
+        pass
+
+    def remove_object(self, search_model, object_id):
+        pass
+
+    def remove_source(self, search_model, field_name, object_id, source_id):
+        pass
+
+    def rebuild_index(self, search_model):
+        pass
+
+
+_backend = []
+
+
+def load_backend():
+    from dynamic_search.conf.settings import BACKEND
+
+    if not _backend:
+        _backend.append(import_module(BACKEND).SearchBackend())
+    return _backend[0]
@@ -0,0 +1,75 @@
+from __future__ import absolute_import
+
+import logging
+import operator
+
+from django.db.models import Q
+from django.db.models.sql.constants import LOOKUP_SEP
+
+from . import SearchBackendBase
+
+logger = logging.getLogger(__name__)
+
+# Types of the return values that can be compared in the database with
+# the primary key of the search model
+INTEGER_FIELD_TYPES = ['AutoField', 'BigIntegerField', 'ForeignKey', 'IntegerField', 'PositiveIntegerField', 'PositiveSmallIntegerField', 'SmallIntegerField']
+
+
+class SearchBackend(SearchBackendBase):
+    """
+    Search the terms directly in the fields of the models.  The searches
+    are compiled into a single query, each term is a subquery returning
+    the primary keys of the objects with a field containing it
+    """
+    def search(self, search_model, search_dict, global_and_search=False):
+        query = self.compile_search(search_dict, global_and_search)
+        logger.debug('query: %s' % query)
+
+        if query is None:
+            return search_model.model.objects.none()
+
+        return search_model.model.objects.filter(query)
+
+    def compile_search(self, search_dict, global_and_search=False):
+        """
+        Combine the terms of a field with AND, the fields of a model with
+        AND for advanced searches or OR for simple searches and the models
+        with OR
+        """
+        model_queries = []
+        for model, data in search_dict.items():
+            field_queries = []
+            for query_entry in data['searches']:
+                term_queries = [self.compile_term(model, data['return_value'], query_entry['field_name'], term) for term in self.plan_terms(query_entry['terms'])]
+                if term_queries:
+                    field_queries.append(reduce(operator.and_, term_queries))
+
+            if field_queries:
+                model_queries.append(reduce(global_and_search and operator.and_ or operator.or_, field_queries))
+
+        if model_queries:
+            return reduce(operator.or_, model_queries)
+
+    def plan_terms(self, terms):
+        """
+        Remove the repeated terms and put the most selective ones first,
+        a longer substring matches less rows
+        """
+        return sorted(set(terms), key=lambda term: (-len(term), term))
+
+    def compile_term(self, model, return_value, field_names, term):
+        query = reduce(operator.or_, [Q(**{'%s__icontains' % field_name: term}) for field_name in field_names])
+        values = model.objects.filter(query).values(return_value)
+
+        if not self.is_comparable(model, return_value):
+            # Return values like the object_pk text field of the comments
+            # can't be compared with the primary keys in the database
+            values = [int(value) for value in values.values_list(return_value, flat=True) if unicode(value).isdigit()]
+
+        return Q(pk__in=values)
+
+    def is_comparable(self, model, return_value):
+        if return_value == 'pk' or LOOKUP_SEP in return_value:
+            return True
+
+        return model._meta.get_field(return_value).get_internal_type() in INTEGER_FIELD_TYPES
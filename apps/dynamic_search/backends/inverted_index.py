@@ -0,0 +1,245 @@
+from __future__ import absolute_import
+
+import heapq
+import logging
+import math
+import re
+
+from django.db import connection, transaction
+from django.utils.encoding import force_unicode
+
+from common.utils import insert_rows
+
+from ..conf.settings import LIMIT
+from ..literals import TERM_MAXIMUM_LENGTH, INDEX_BATCH_SIZE
+from ..models import IndexTerm, IndexPosting
+from . import SearchBackendBase
+
+logger = logging.getLogger(__name__)
+
+TOKEN_REGEX = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """
+    Split a text in lowercase words
+    """
+    if not text:
+        return []
+
+    return [token[:TERM_MAXIMUM_LENGTH] for token in TOKEN_REGEX.findall(force_unicode(text).lower())]
+
+
+class SearchBackend(SearchBackendBase):
+    """
+    Answer the searches from an inverted index: a posting per term and
+    indexed text with the positions of the term, updated as the objects
+    change.  Terms match the words of the index that start with them,
+    quoted terms must appear as a phrase and the results are ranked by
+    tf-idf
+    """
+    def search(self, search_model, search_dict, global_and_search=False):
+        object_count = search_model.model.objects.count()
+        scores = {}
+
+        for model, data in search_dict.items():
+            model_scores = None
+            for query_entry in data['searches']:
+                field_scores = self.search_field(search_model, query_entry['search_field'], query_entry['terms'], object_count)
+                logger.debug('field: %s, hits: %d' % (query_entry['search_field'], len(field_scores)))
+
+                if model_scores is None:
+                    model_scores = field_scores
+                elif global_and_search:
+                    model_scores = self.intersection(model_scores, field_scores)
+                else:
+                    model_scores = self.union(model_scores, field_scores)
+
+            scores = self.union(scores, model_scores or {})
+
+        # Only the best LIMIT results are kept, ordered in the database by
+        # their rank so that the result list can be paged lazily
+        object_ids = [object_id for object_id, score in heapq.nlargest(LIMIT, scores.items(), key=lambda item: (item[1], -item[0]))]
+        return search_model.get_ranked_queryset(object_ids)
+
+    def search_field(self, search_model, field_name, terms, object_count):
+        """
+        Return a dictionary of the objects that contain all the terms in
+        the given field and their scores
+        """
+        field_scores = None
+        for tokens, posting_count in self.plan_terms(search_model, field_name, terms):
+            # The objects found so far restrict the postings read for the
+            # following terms
+            term_scores = self.search_phrase(search_model, field_name, tokens, object_count, field_scores, posting_count)
+            if field_scores is None:
+                field_scores = term_scores
+            else:
+                field_scores = self.intersection(field_scores, term_scores)
+
+            if not field_scores:
+                return {}
+
+        return field_scores or {}
+
+    def plan_terms(self, search_model, field_name, terms):
+        """
+        Return the words of the terms and their amount of postings, the
+        terms with the fewest postings first
+        """
+        phrases = dict([(u' '.join(tokens), tokens) for tokens in [tokenize(term) for term in terms] if tokens])
+        postings = IndexPosting.objects.filter(search_model=search_model.get_full_name(), field=field_name)
+
+        counts = {}
+        for key, tokens in phrases.items():
+            # A phrase can't be more frequent than its least frequent word
+            counts[key] = min([postings.filter(term__term__startswith=token).count() for token in tokens])
+
+        return [(phrases[key], counts[key]) for key in sorted(phrases, key=lambda key: counts[key])]
+
+    def search_phrase(self, search_model, field_name, tokens, object_count, candidates=None, posting_count=None):
+        postings = IndexPosting.objects.filter(search_model=search_model.get_full_name(), field=field_name)
+        if candidates is not None and len(candidates) <= INDEX_BATCH_SIZE:
+            postings = postings.filter(object_id__in=candidates.keys())
+        else:
+            # All the objects containing the terms are read, their
+            # amount is exact
+            posting_count = None
+
+        if len(tokens) == 1:
+            frequencies = {}
+            for object_id, frequency in postings.filter(term__term__startswith=tokens[0]).values_list('object_id', 'frequency'):
+                frequencies[object_id] = frequencies.get(object_id, 0) + frequency
+
+            return self.rank(frequencies, object_count, posting_count)
+
+        # Follow the positions of the phrase through the texts that
+        # contain its words, matches holds the position of the last word
+        # found so far for each text
+        matches = None
+        for token in tokens:
+            token_postings = postings.filter(term__term__startswith=token)
+            if matches is not None:
+                object_ids = set([object_id for object_id, source_id in matches])
+                if len(object_ids) <= INDEX_BATCH_SIZE:
+                    token_postings = token_postings.filter(object_id__in=object_ids)
+
+            token_positions = {}
+            for object_id, source_id, positions in token_postings.values_list('object_id', 'source_id', 'positions'):
+                token_positions.setdefault((object_id, source_id), set()).update([int(position) for position in positions.split(u',')])
+
+            if matches is None:
+                matches = token_positions
+            else:
+                next_matches = {}
+                for key, positions in matches.items():
+                    following = set([position + 1 for position in positions]) & token_positions.get(key, set())
+                    if following:
+                        next_matches[key] = following
+                matches = next_matches
+
+            if not matches:
+                return {}
+
+        frequencies = {}
+        for (object_id, source_id), positions in matches.items():
+            frequencies[object_id] = frequencies.get(object_id, 0) + len(positions)
+
+        return self.rank(frequencies, object_count, posting_count)
+
+    def rank(self, frequencies, object_count, object_frequency=None):
+        """
+        Score the objects higher the more times they contain a term and
+        the fewer other objects contain it, object_frequency estimates the
+        amount of objects containing the term when only some of them were
+        read
+        """
+        idf = math.log(1 + float(max(object_count, 1)) / max(object_frequency or len(frequencies), 1))
+        return dict([(object_id, (1 + math.log(frequency)) * idf) for object_id, frequency in frequencies.items()])
+
+    def intersection(self, scores, other_scores):
+        return dict([(object_id, score + other_scores[object_id]) for object_id, score in scores.items() if object_id in other_scores])
+
+    def union(self, scores, other_scores):
+        result = scores.copy()
+        for object_id, score in other_scores.items():
+            result[object_id] = result.get(object_id, 0) + score
+        return result
+
+    def update_index(self, search_model, field_name, object_id, source_id, text):
+        self.delete_postings(search_model=search_model.get_full_name(), field=field_name, object_id=object_id, source_id=source_id)
+        self.insert_postings(search_model, [(field_name, object_id, source_id, text)])
+
+    def index_object(self, search_model, object_id, field_names=None):
+        for search_field in search_model.get_all_search_fields():
+            field_name = search_field.get_full_name()
+            if field_names is None or field_name in field_names:
+                self.delete_postings(search_model=search_model.get_full_name(), field=field_name, object_id=object_id)
+                self.insert_postings(search_model, [(field_name,) + row for row in search_field.get_index_values([object_id])])
+
+    def remove_object(self, search_model, object_id):
+        self.delete_postings(search_model=search_model.get_full_name(), object_id=object_id)
+
+    def remove_source(self, search_model, field_name, object_id, source_id):
+        self.delete_postings(search_model=search_model.get_full_name(), field=field_name, object_id=object_id, source_id=source_id)
+
+    def rebuild_index(self, search_model):
+        self.delete_postings(search_model=search_model.get_full_name())
+
+        object_ids = list(search_model.model.objects.values_list('pk', flat=True))
+        for index in range(0, len(object_ids), INDEX_BATCH_SIZE):
+            batch = object_ids[index:index + INDEX_BATCH_SIZE]
+            rows = []
+            for search_field in search_model.get_all_search_fields():
+                rows.extend([(search_field.get_full_name(),) + row for row in search_field.get_index_values(batch)])
+            self.insert_postings(search_model, rows)
+
+        logger.debug('indexed %d objects of: %s' % (len(object_ids), search_model.get_full_name()))
+
+    def delete_postings(self, **filters):
+        # A single statement instead of the queryset delete() which loads
+        # every posting before deleting it
+        qn = connection.ops.quote_name
+        columns = filters.keys()
+        cursor = connection.cursor()
+        cursor.execute(
+            'DELETE FROM %s WHERE %s' % (qn(IndexPosting._meta.db_table), u' AND '.join(['%s = %%s' % qn(column) for column in columns])),
+            [filters[column] for column in columns]
+        )
+        transaction.commit_unless_managed()
+
+    def insert_postings(self, search_model, rows):
+        """
+        Index the text of the given (field name, object id, source id,
+        text) rows
+        """
+        occurrences = {}
+        for field_name, object_id, source_id, text in rows:
+            for position, token in enumerate(tokenize(text)):
+                occurrences.setdefault((field_name, object_id, source_id, token), []).append(position)
+
+        if not occurrences:
+            return
+
+        term_ids = self.get_term_ids(set([key[3] for key in occurrences]))
+
+        insert_rows(IndexPosting, ['term', 'search_model', 'field', 'object_id', 'source_id', 'frequency', 'positions'], [
+            (term_ids[token], search_model.get_full_name(), field_name, object_id, source_id, len(positions), u','.join([unicode(position) for position in positions]))
+            for (field_name, object_id, source_id, token), positions in occurrences.items()
+        ])
+
+    def get_term_ids(self, tokens):
+        """
+        Return a dictionary of the primary keys of the terms, creating the
+        ones not yet in the index
+        """
+        tokens = list(tokens)
+        term_ids = {}
+        for index in range(0, len(tokens), INDEX_BATCH_SIZE):
+            term_ids.update(IndexTerm.objects.filter(term__in=tokens[index:index + INDEX_BATCH_SIZE]).values_list('term', 'pk'))
+
+        for token in tokens:
+            if token not in term_ids:
+                term_ids[token] = IndexTerm.objects.get_or_create(term=token)[0].pk
+
+        return term_ids
@@ -5,12 +5,20 @@ import types
 import logging
 import datetime
 
-from django.db.models import Q
+from django.contrib.contenttypes import generic
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.db.models.loading import get_model
+from django.db.models.sql.constants import LOOKUP_SEP
 from django.core.exceptions import PermissionDenied
 
 from acls.models import AccessEntry
+from acls.runtime import access_resolver
 from permissions.models import Permission
+from permissions.runtime import permission_evaluator
+
+from .backends import load_backend
+from .runtime import result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +101,7 @@ class SearchModel(object):
             search_dict[search_field.get_model()]['searches'].append(
                 {
                     'field_name': [search_field.field],
+                    'search_field': search_field.get_full_name(),
                     'terms': self.normalize_query(query_string)
                 }
             )        
@@ -119,6 +128,7 @@ class SearchModel(object):
                 search_dict[search_field.get_model()]['searches'].append(
                     {
                         'field_name': [search_field.field],
+                        'search_field': search_field.get_full_name(),
                         'terms': self.normalize_query(value)
                     }
                 )  
@@ -130,94 +140,103 @@ class SearchModel(object):
 
     def execute_search(self, search_dict, user, global_and_search=False):
         start_time = datetime.datetime.now()
-        model_list = {}
-        list_results = set()
-
-        for model, data in search_dict.items():
-            logger.debug('model: %s' % model)
-
-            # Initialize per model result set
-            model_result_set = set()
-
-            for query_entry in data['searches']:
-                # Fashion a list of queries for a field for each term
-                field_query_list = self.assemble_query(query_entry['terms'], query_entry['field_name'])
-
-                logger.debug('field_query_list: %s' % field_query_list)
-
-                # Initialize per field result set
-                field_result_set = set()
-
-                # Get results per search field
-                for query in field_query_list:
-                    logger.debug('query: %s' % query)
-                    term_query_result_set = set(model.objects.filter(query).values_list(data['return_value'], flat=True))
-
-                    # Convert the QuerySet to a Python set and perform the
-                    # AND operation on the program and not as a query.
-                    # This operation ANDs all the field term results
-                    # belonging to a single model, making sure to only include
-                    # results in the final field result variable if all the terms
-                    # are found in a single field.
-                    if not field_result_set:
-                        field_result_set = term_query_result_set
-                    else:
-                        field_result_set &= term_query_result_set
-
-                    logger.debug('term_query_result_set: %s' % term_query_result_set)
-                    logger.debug('field_result_set: %s' % field_result_set)
-
-                if global_and_search:
-                    if not model_result_set:
-                        model_result_set = field_result_set
-                    else:
-                        model_result_set &= field_result_set
-                else:
-                    model_result_set |= field_result_set
-
-                logger.debug('model_result_set: %s' % model_result_set)
-
-            # Accumulate the field results return values (PK)
-            list_results |= model_result_set
-
-        # Return a QuerySet object of search results
-        search_results = self.model.objects.filter(pk__in=list_results)
-        
-        # Filter the search results by the users permissions or ACLS
+
+        filter_by_access = False
+        scope = None
         if self.permission:
             try:
                 Permission.objects.check_permissions(user, [self.permission])
             except PermissionDenied:
+                # The results depend on the ACLs of the user
+                filter_by_access = True
+                scope = getattr(user, 'pk', None)
+
+        # The generations of the permissions and of the access entries
+        # change with the grants and the memberships of the users
+        access_generations = (permission_evaluator.get_generation(), access_resolver.get_generation() if filter_by_access else None)
+        cache_key = result_cache.get_key(self.get_full_name(), global_and_search, self.get_search_terms(search_dict), filter_by_access, scope, access_generations)
+        object_ids = result_cache.get(cache_key)
+
+        if object_ids is not None:
+            final_object_list = self.get_ranked_queryset(object_ids)
+        else:
+            # Return a QuerySet object of search results, it is only
+            # evaluated a page at a time by the paginated result list
+            search_results = load_backend().search(self, search_dict, global_and_search=global_and_search)
+
+            # Filter the search results by the users permissions or ACLS
+            if filter_by_access:
                 # If user doesn't have global permission, get a list of document
                 # for which he/she does hace access use it to filter the
                 # provided object_list
                 final_object_list = AccessEntry.objects.filter_objects_by_access(self.permission, user, search_results)
             else:
                 final_object_list = search_results
-        else:
-            final_object_list = search_results
+
+            if result_cache.timeout:
+                object_ids = self.get_object_ids(final_object_list, result_cache.maximum_results + 1)
+                elapsed = datetime.datetime.now() - start_time
+                result_cache.set(cache_key, object_ids, elapsed.seconds + elapsed.microseconds / 1000000.0)
 
         elapsed_time = unicode(datetime.datetime.now() - start_time).split(':')[2]
 
         return final_object_list, elapsed_time
 
-    def assemble_query(self, terms, search_fields):
+    def get_search_terms(self, search_dict):
+        """
+        Return the normalized terms of every search field of a search
+        """
+        return sorted([(query_entry['search_field'], tuple(query_entry['terms'])) for data in search_dict.values() for query_entry in data['searches']])
+
+    def get_object_ids(self, object_list, limit):
+        try:
+            # Include the extra select columns, the results can be ordered
+            # by them
+            return [row[0] for row in object_list.values_list('pk', *object_list.query.extra.keys())[:limit]]
+        except AttributeError:
+            # object_list is not a queryset
+            return [obj.pk for obj in object_list[:limit]]
+
+    def get_ranked_queryset(self, object_ids):
+        """
+        Return a QuerySet of the given objects in the same order
+        """
+        queryset = self.model.objects.filter(pk__in=object_ids)
+        if not object_ids:
+            return queryset
+
+        qn = connection.ops.quote_name
+        column = u'%s.%s' % (qn(self.model._meta.db_table), qn(self.model._meta.pk.column))
+        rank = u'CASE %s END' % u' '.join([u'WHEN %s = %d THEN %d' % (column, object_id, index) for index, object_id in enumerate(object_ids)])
+        return queryset.extra(select={'search_rank': rank}, order_by=['search_rank'])
+
+    def update_index(self, field_name, object_id, source_id, text):
+        """
+        Update the indexed text of a single row of a search field, the
+        source_id is the primary key of that row
+        """
+        load_backend().update_index(self, field_name, object_id, source_id, text)
+        # Any cached result could include the object
+        result_cache.invalidate()
+
+    def index_object(self, object_id, field_names=None):
         """
-        Returns a query, that is a combination of Q objects. That combination
-        aims to search keywords within a model by testing the given search fields.
+        Index again all the search fields or the given ones of an object
         """
-        queries = []
-        for term in terms:
-            or_query = None
-            for field in search_fields:
-                q = Q(**{'%s__%s' % (field, 'icontains'): term})
-                if or_query is None:
-                    or_query = q
-                else:
-                    or_query = or_query | q
+        load_backend().index_object(self, object_id, field_names)
+        result_cache.invalidate()
 
-            queries.append(or_query)
-        return queries
+    def remove_object(self, object_id):
+        load_backend().remove_object(self, object_id)
+        result_cache.invalidate()
+
+    def remove_source(self, field_name, object_id, source_id):
+        load_backend().remove_source(self, field_name, object_id, source_id)
+        result_cache.invalidate()
+
+    def rebuild_index(self):
+        load_backend().rebuild_index(self)
+        result_cache.invalidate()
 
 
 # SearchField classes
@@ -237,6 +256,22 @@ class SearchField(object):
     def get_model(self):
         return self.search_model.model
 
+    def get_index_values(self, object_ids=None):
+        """
+        Return the (object id, source id, text) tuples of the field, the
+        source is the related row the text was read from
+        """
+        queryset = self.search_model.model.objects.all()
+        if object_ids is not None:
+            queryset = queryset.filter(pk__in=object_ids)
+
+        if LOOKUP_SEP in self.field:
+            source = u'%s%spk' % (self.field.rsplit(LOOKUP_SEP, 1)[0], LOOKUP_SEP)
+        else:
+            source = u'pk'
+
+        return [(object_id, source_id, text) for object_id, source_id, text in queryset.values_list(u'pk', source, self.field) if text]
+
 
 class RelatedSearchField(object):
     """
@@ -256,3 +291,28 @@ class RelatedSearchField(object):
 
     def get_model(self):
         return self.model
+
+    def get_index_values(self, object_ids=None):
+        queryset = self.model.objects.all()
+        for field in self.model._meta.virtual_fields:
+            if isinstance(field, generic.GenericForeignKey) and field.fk_field == self.return_value:
+                # Only the rows related to the search model, comments
+                # can be attached to objects of any model
+                queryset = queryset.filter(**{field.ct_field: ContentType.objects.get_for_model(self.search_model.model)})
+
+        if object_ids is not None:
+            # The return value can be a text field, like the object_pk of
+            # the comments
+            queryset = queryset.filter(**{'%s__in' % self.return_value: [unicode(object_id) for object_id in object_ids]})
+
+        result = []
+        for object_id, source_id, text in queryset.values_list(self.return_value, u'pk', self.field):
+            try:
+                object_id = int(object_id)
+            except (TypeError, ValueError):
+                continue
+
+            if text:
+                result.append((object_id, source_id, text))
+
+        return result
@@ -11,5 +11,9 @@ register_settings(
         {'name': u'SHOW_OBJECT_TYPE', 'global_name': u'SEARCH_SHOW_OBJECT_TYPE', 'default': True, 'hidden': True},
         {'name': u'LIMIT', 'global_name': u'SEARCH_LIMIT', 'default': 100, 'description': _(u'Maximum amount search hits to fetch and display.')},
         {'name': u'RECENT_COUNT', 'global_name': u'SEARCH_RECENT_COUNT', 'default': 5, 'description': _(u'Maximum number of search queries to remember per user.')},
+        {'name': u'CACHE_TIMEOUT', 'global_name': u'SEARCH_CACHE_TIMEOUT', 'default': 0, 'description': _(u'Amount of seconds the results of a search are kept to answer the same search, results are discarded sooner if the documents change.  0 disables the search result cache, only enable it when all the processes share the same cache backend.')},
+        {'name': u'CACHE_MAXIMUM_SIZE', 'global_name': u'SEARCH_CACHE_MAXIMUM_SIZE', 'default': 8 * 1024 * 1024, 'description': _(u'Maximum memory in bytes used by the cached search results of each process, the least recently used results are discarded when exceeded.')},
+        {'name': u'CACHE_MAXIMUM_RESULTS', 'global_name': u'SEARCH_CACHE_MAXIMUM_RESULTS', 'default': 1000, 'description': _(u'Searches with more results than this amount are not cached.')},
+        {'name': u'BACKEND', 'global_name': u'SEARCH_BACKEND', 'default': u'dynamic_search.backends.database', 'description': _(u'Search backend to use.  Options are: dynamic_search.backends.database, which scans the fields of the documents for each search and dynamic_search.backends.inverted_index, which answers the searches from an index of terms updated as the documents change.  After switching to the inverted index build the index of the existing documents with the rebuild_search_index command.')},
     ]
 )
@@ -0,0 +1,5 @@
+# Longer words are truncated when indexed
+TERM_MAXIMUM_LENGTH = 64
+
+# Amount of indexed texts whose postings are inserted at once
+INDEX_BATCH_SIZE = 500
@@ -0,0 +1,12 @@
+from __future__ import absolute_import
+
+from django.core.management.base import NoArgsCommand
+
+from ...tools import do_rebuild_search_index
+
+
+class Command(NoArgsCommand):
+    help = 'Index again the searchable fields of all the documents.'
+
+    def handle_noargs(self, **options):
+        do_rebuild_search_index()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'IndexTerm'
+        db.create_table('dynamic_search_indexterm', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('term', self.gf('django.db.models.fields.CharField')(unique=True, max_length=64)),
+        ))
+        db.send_create_signal('dynamic_search', ['IndexTerm'])
+
+        # Adding model 'IndexPosting'
+        db.create_table('dynamic_search_indexposting', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('term', self.gf('django.db.models.fields.related.ForeignKey')(to=orm['dynamic_search.IndexTerm'])),
+            ('search_model', self.gf('django.db.models.fields.CharField')(max_length=64)),
+            ('field', self.gf('django.db.models.fields.CharField')(max_length=128)),
+            ('object_id', self.gf('django.db.models.fields.PositiveIntegerField')(db_index=True)),
+            ('source_id', self.gf('django.db.models.fields.PositiveIntegerField')()),
+            ('frequency', self.gf('django.db.models.fields.PositiveIntegerField')()),
+            ('positions', self.gf('django.db.models.fields.TextField')(blank=True)),
+        ))
+        db.send_create_signal('dynamic_search', ['IndexPosting'])
+
+        # Adding index on 'IndexPosting', fields ['search_model', 'field', 'term']
+        # The searches read the postings of a field by term
+        db.create_index('dynamic_search_indexposting', ['search_model', 'field', 'term_id'])
+
+
+    def backwards(self, orm):
+        # Removing index on 'IndexPosting', fields ['search_model', 'field', 'term']
+        db.delete_index('dynamic_search_indexposting', ['search_model', 'field', 'term_id'])
+
+        # Deleting model 'IndexPosting'
+        db.delete_table('dynamic_search_indexposting')
+
+        # Deleting model 'IndexTerm'
+        db.delete_table('dynamic_search_indexterm')
+
+
+    models = {
+        'auth.group': {
+            'Meta': {'object_name': 'Group'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '80'}),
+            'permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'})
+        },
+        'auth.permission': {
+            'Meta': {'ordering': "('content_type__app_label', 'content_type__model', 'codename')", 'unique_together': "(('content_type', 'codename'),)", 'object_name': 'Permission'},
+            'codename': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'content_type': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['contenttypes.ContentType']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '50'})
+        },
+        'auth.user': {
+            'Meta': {'object_name': 'User'},
+            'date_joined': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75', 'blank': 'True'}),
+            'first_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'groups': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Group']", 'symmetrical': 'False', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'is_active': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'is_staff': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'is_superuser': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'last_login': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'last_name': ('django.db.models.fields.CharField', [], {'max_length': '30', 'blank': 'True'}),
+            'password': ('django.db.models.fields.CharField', [], {'max_length': '128'}),
+            'user_permissions': ('django.db.models.fields.related.ManyToManyField', [], {'to': "orm['auth.Permission']", 'symmetrical': 'False', 'blank': 'True'}),
+            'username': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '30'})
+        },
+        'contenttypes.contenttype': {
+            'Meta': {'ordering': "('name',)", 'unique_together': "(('app_label', 'model'),)", 'object_name': 'ContentType', 'db_table': "'django_content_type'"},
+            'app_label': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'model': ('django.db.models.fields.CharField', [], {'max_length': '100'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '100'})
+        },
+        'dynamic_search.indexposting': {
+            'Meta': {'object_name': 'IndexPosting'},
+            'field': ('django.db.models.fields.CharField', [], {'max_length': '128'}),
+            'frequency': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'object_id': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'positions': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'search_model': ('django.db.models.fields.CharField', [], {'max_length': '64'}),
+            'source_id': ('django.db.models.fields.PositiveIntegerField', [], {}),
+            'term': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['dynamic_search.IndexTerm']"})
+        },
+        'dynamic_search.indexterm': {
+            'Meta': {'object_name': 'IndexTerm'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'term': ('django.db.models.fields.CharField', [], {'unique': 'True', 'max_length': '64'})
+        },
+        'dynamic_search.recentsearch': {
+            'Meta': {'ordering': "('-datetime_created',)", 'object_name': 'RecentSearch'},
+            'datetime_created': ('django.db.models.fields.DateTimeField', [], {}),
+            'hits': ('django.db.models.fields.IntegerField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'query': ('django.db.models.fields.TextField', [], {}),
+            'user': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['auth.User']"})
+        }
+    }
+
+    complete_apps = ['dynamic_search']
@@ -13,6 +13,7 @@ from django.utils.encoding import smart_unicode, smart_str
 
 from .managers import RecentSearchManager
 from .classes import SearchModel
+from .literals import TERM_MAXIMUM_LENGTH
 
 
 class RecentSearch(models.Model):
@@ -60,3 +61,39 @@ class RecentSearch(models.Model):
         ordering = ('-datetime_created',)
         verbose_name = _(u'recent search')
         verbose_name_plural = _(u'recent searches')
+
+
+class IndexTerm(models.Model):
+    """
+    A word found in the indexed fields of the search models
+    """
+    term = models.CharField(max_length=TERM_MAXIMUM_LENGTH, unique=True, verbose_name=_(u'term'))
+
+    def __unicode__(self):
+        return self.term
+
+    class Meta:
+        verbose_name = _(u'index term')
+        verbose_name_plural = _(u'index terms')
+
+
+class IndexPosting(models.Model):
+    """
+    The occurrences of a term in a field of an indexed object, source_id
+    is the primary key of the row the text was read from, for example
+    the document page in the case of the document content
+    """
+    term = models.ForeignKey(IndexTerm, verbose_name=_(u'term'))
+    search_model = models.CharField(max_length=64, verbose_name=_(u'search model'))
+    field = models.CharField(max_length=128, verbose_name=_(u'field'))
+    object_id = models.PositiveIntegerField(db_index=True, verbose_name=_(u'object id'))
+    source_id = models.PositiveIntegerField(verbose_name=_(u'source id'))
+    frequency = models.PositiveIntegerField(verbose_name=_(u'frequency'))
+    positions = models.TextField(blank=True, verbose_name=_(u'positions'))
+
+    def __unicode__(self):
+        return u'%s: %s.%s' % (self.term, self.object_id, self.source_id)
+
+    class Meta:
+        verbose_name = _(u'index posting')
+        verbose_name_plural = _(u'index postings')
@@ -0,0 +1,9 @@
+from __future__ import absolute_import
+
+from django.utils.translation import ugettext_lazy as _
+
+from permissions.models import PermissionNamespace, Permission
+
+dynamic_search_namespace = PermissionNamespace('dynamic_search', _(u'Search'))
+
+PERMISSION_SEARCH_INDEX_REBUILD = Permission.objects.register(dynamic_search_namespace, 'search_index_rebuild', _(u'Rebuild the search index'))
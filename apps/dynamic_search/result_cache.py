@@ -0,0 +1,150 @@
+from __future__ import absolute_import
+
+import hashlib
+import logging
+import sys
+import threading
+import time
+
+from django.core.cache import cache
+from django.utils.datastructures import SortedDict
+
+from common.generation import Generation
+
+logger = logging.getLogger(__name__)
+
+COUNTER_NAMES = (u'hits', u'misses', u'evictions', u'saved_milliseconds')
+
+
+class SearchResultCache(object):
+    """
+    Memory bounded, per process cache of the primary keys of search
+    results with least recently used eviction.  Entries expire after
+    timeout seconds or as soon as any searchable object changes: a change
+    increases the generation, shared with the other processes, making all
+    the entries of previous generations stale.  The counters are kept in
+    the Django cache.
+    """
+    def __init__(self, name, timeout, maximum_size, maximum_results):
+        self.name = name
+        self.timeout = timeout
+        self.maximum_size = maximum_size
+        self.maximum_results = maximum_results
+        self.generation = Generation(self._get_counter_key(u'generation'))
+        # key: (generation, expiration, object_ids, elapsed seconds, size)
+        self._entries = SortedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _get_counter_key(self, counter_name):
+        return u'search_result_cache_%s_%s' % (self.name, counter_name)
+
+    def _increment(self, counter_name, delta=1):
+        key = self._get_counter_key(counter_name)
+        try:
+            cache.add(key, 0)
+            cache.incr(key, delta)
+        except ValueError:
+            # The counter expired between the add and the incr calls
+            cache.set(key, delta)
+
+    def get_counters(self):
+        return dict([(counter_name, cache.get(self._get_counter_key(counter_name), 0)) for counter_name in COUNTER_NAMES])
+
+    def reset_counters(self):
+        cache.delete_many([self._get_counter_key(counter_name) for counter_name in COUNTER_NAMES])
+
+    def get_generation(self):
+        return self.generation.get()
+
+    def invalidate(self):
+        """
+        Make all the entries, of every process, stale
+        """
+        self.generation.increase()
+
+    def get_key(self, *args):
+        return hashlib.sha1(repr(args)).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached primary keys or None if the entry is missing or
+        stale
+        """
+        if not self.timeout:
+            return None
+
+        generation = self.get_generation()
+        self._lock.acquire()
+        try:
+            entry = self._entries.pop(key, None)
+            if entry and (entry[0] != generation or entry[1] < time.time()):
+                self._size -= entry[4]
+                entry = None
+
+            if entry:
+                # Move it to the end, the most recently used
+                self._entries[key] = entry
+        finally:
+            self._lock.release()
+
+        if entry:
+            self._increment(u'hits')
+            self._increment(u'saved_milliseconds', int(entry[3] * 1000))
+            return entry[2]
+        else:
+            self._increment(u'misses')
+            return None
+
+    def set(self, key, object_ids, elapsed):
+        """
+        Store the primary keys of a search result that took elapsed
+        seconds to compute, results bigger than maximum_results are not
+        stored
+        """
+        if not self.timeout or len(object_ids) > self.maximum_results:
+            return
+
+        object_ids = tuple(object_ids)
+        size = sys.getsizeof(key) + sys.getsizeof(object_ids) + sum([sys.getsizeof(object_id) for object_id in object_ids])
+        entry = (self.get_generation(), time.time() + self.timeout, object_ids, elapsed, size)
+
+        evicted = 0
+        self._lock.acquire()
+        try:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._size -= previous[4]
+
+            self._entries[key] = entry
+            self._size += size
+
+            while self._size > self.maximum_size and self._entries:
+                # The first entry is the least recently used
+                oldest_key = self._entries.keyOrder[0]
+                self._size -= self._entries.pop(oldest_key)[4]
+                evicted += 1
+        finally:
+            self._lock.release()
+
+        if evicted:
+            logger.debug('%s: evicted %d entries' % (self.name, evicted))
+            self._increment(u'evictions', evicted)
+
+    def clear(self):
+        self._lock.acquire()
+        try:
+            self._entries.clear()
+            self._size = 0
+        finally:
+            self._lock.release()
+
+    def get_statistics(self):
+        statistics = self.get_counters()
+        statistics.update({
+            'entries': len(self._entries),
+            'size': self._size,
+            'maximum_size': self.maximum_size,
+            'timeout': self.timeout,
+        })
+        return statistics
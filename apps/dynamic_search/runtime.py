@@ -0,0 +1,11 @@
+from __future__ import absolute_import
+
+from .conf.settings import CACHE_TIMEOUT, CACHE_MAXIMUM_SIZE, CACHE_MAXIMUM_RESULTS
+from .result_cache import SearchResultCache
+
+result_cache = SearchResultCache(
+    name=u'search_results',
+    timeout=CACHE_TIMEOUT,
+    maximum_size=CACHE_MAXIMUM_SIZE,
+    maximum_results=CACHE_MAXIMUM_RESULTS
+)
@@ -0,0 +1,29 @@
+from __future__ import absolute_import
+
+from django.utils.translation import ugettext as _
+
+from common.utils import pretty_size
+
+from .runtime import result_cache
+
+
+def get_statistics():
+    statistics = result_cache.get_statistics()
+    lookups = statistics['hits'] + statistics['misses']
+
+    paragraphs = [
+        _(u'Cached search results in this process: %d') % statistics['entries'],
+        _(u'Memory used by the cached search results of this process: %s') % pretty_size(statistics['size']),
+        _(u'Maximum cache size per process: %s') % pretty_size(statistics['maximum_size']),
+        _(u'Cached results timeout: %d seconds') % statistics['timeout'],
+        _(u'Cache hits: %d') % statistics['hits'],
+        _(u'Cache misses: %d') % statistics['misses'],
+        _(u'Hit ratio: %0.2f%%') % (100.0 * statistics['hits'] / lookups if lookups else 0),
+        _(u'Search time saved: %0.2f seconds') % (statistics['saved_milliseconds'] / 1000.0),
+        _(u'Cached results evicted: %d') % statistics['evictions'],
+    ]
+
+    return {
+        'title': _(u'Search result cache'),
+        'paragraphs': paragraphs
+    }
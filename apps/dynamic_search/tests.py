@@ -0,0 +1,96 @@
+from __future__ import absolute_import
+
+import os
+
+from django.conf import settings
+from django.core.files.base import File
+from django.test import TestCase
+
+from documents.models import Document, DocumentType
+
+from .backends import _backend
+from .backends.inverted_index import SearchBackend
+from .classes import SearchModel
+from .models import IndexPosting
+
+CONTENT_FIELD = 'documentversion__documentpage__content'
+
+
+class InvertedIndexTestCase(TestCase):
+    def setUp(self):
+        # The signal handlers of the documents update the index of the
+        # loaded backend
+        self.previous_backend = list(_backend)
+        self.backend = SearchBackend()
+        _backend[:] = [self.backend]
+
+        self.search_model = SearchModel.get('documents.Document')
+        self.document_type = DocumentType.objects.create(name='test search')
+
+        self.documents = []
+        for description, content in [
+            (u'quarterly financial report', u'invoice invoice invoice total'),
+            (u'annual financial summary', u'invoice total'),
+            (u'meeting notes', u'agenda'),
+        ]:
+            document = Document(document_type=self.document_type, description=description)
+            document.save()
+            file_object = open(os.path.join(settings.PROJECT_ROOT, 'contrib', 'mayan_11_1.pdf'))
+            document.new_version(file=File(file_object, name='mayan_11_1.pdf'))
+            file_object.close()
+
+            page = document.pages.order_by('page_number')[0]
+            page.content = content
+            page.save()
+            self.documents.append(document)
+
+    def tearDown(self):
+        _backend[:] = self.previous_backend
+
+    def search(self, field_name, *terms):
+        return list(self.backend.search(self.search_model, {
+            Document: {'searches': [{'field_name': [field_name], 'search_field': field_name, 'terms': list(terms)}]}
+        }))
+
+    def test_hits(self):
+        first, second, third = self.documents
+        self.failUnlessEqual(set(self.search('description', u'financial')), set([first, second]))
+        # Terms match the words starting with them
+        self.failUnlessEqual(set(self.search('description', u'financ')), set([first, second]))
+        self.failUnlessEqual(self.search('description', u'financial', u'notes'), [])
+        self.failUnlessEqual(self.search('description', u'budget'), [])
+
+    def test_phrase(self):
+        first, second, third = self.documents
+        self.failUnlessEqual(self.search('description', u'financial report'), [first])
+        # The words are there but not in that order
+        self.failUnlessEqual(self.search('description', u'report financial'), [])
+        self.failUnlessEqual(self.search('description', u'quarterly report'), [])
+
+    def test_ranking(self):
+        first, second, third = self.documents
+        # The first document contains the term more times
+        self.failUnlessEqual(self.search(CONTENT_FIELD, u'invoice'), [first, second])
+
+    def test_page_delete(self):
+        first, second, third = self.documents
+        page = first.pages.order_by('page_number')[0]
+        page_id = page.pk
+        page.delete()
+
+        self.failUnlessEqual(IndexPosting.objects.filter(field=CONTENT_FIELD, source_id=page_id).exists(), False)
+        self.failUnlessEqual(self.search(CONTENT_FIELD, u'invoice'), [second])
+        # The other fields of the document are still indexed
+        self.failUnlessEqual(self.search('description', u'quarterly'), [first])
+
+    def test_rebuild_index(self):
+        first, second, third = self.documents
+        posting_count = IndexPosting.objects.filter(search_model=self.search_model.get_full_name()).count()
+
+        IndexPosting.objects.all().delete()
+        self.failUnlessEqual(self.search(CONTENT_FIELD, u'invoice'), [])
+
+        self.search_model.rebuild_index()
+        self.failUnlessEqual(IndexPosting.objects.filter(search_model=self.search_model.get_full_name()).count(), posting_count)
+        self.failUnlessEqual(self.search(CONTENT_FIELD, u'invoice'), [first, second])
+        self.failUnlessEqual(self.search('description', u'financial report'), [first])
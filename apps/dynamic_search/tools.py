@@ -0,0 +1,8 @@
+from __future__ import absolute_import
+
+from .classes import SearchModel
+
+
+def do_rebuild_search_index():
+    for search_model in SearchModel.get_all():
+        search_model.rebuild_index()
@@ -5,4 +5,5 @@ urlpatterns = patterns('dynamic_search.views',
     url(r'^advanced/$', 'search', {'advanced': True}, 'search_advanced'),
     url(r'^again/$', 'search_again', (), 'search_again'),
     url(r'^results/$', 'results', (), 'results'),
+    url(r'^index/rebuild/$', 'search_index_rebuild', (), 'search_index_rebuild'),
 )
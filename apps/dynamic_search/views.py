@@ -12,10 +12,15 @@ from django.http import HttpResponseRedirect
 from django.core.urlresolvers import reverse
 from django.utils.http import urlencode
 
+from permissions.models import Permission
+from job_processor.api import process_job
+
 from .conf.settings import SHOW_OBJECT_TYPE
 from .forms import SearchForm, AdvancedSearchForm
 from .models import RecentSearch
 from .classes import SearchModel
+from .permissions import PERMISSION_SEARCH_INDEX_REBUILD
+from .tools import do_rebuild_search_index
 
 logger = logging.getLogger(__name__)
 document_search = SearchModel.get('documents.Document')
@@ -49,7 +54,13 @@ def results(request, extra_context=None):
             'time_delta': elapsed_time,
         })            
 
-        RecentSearch.objects.add_query_for_user(request.user, request.GET, len(object_list))
+        try:
+            hits = object_list.count()
+        except TypeError:
+            # object_list is not a queryset
+            hits = len(object_list)
+
+        RecentSearch.objects.add_query_for_user(request.user, request.GET, hits)
 
     if extra_context:
         context.update(extra_context)
@@ -104,3 +115,33 @@ def search(request, advanced=False):
 def search_again(request):
     query = urlparse.urlparse(request.META.get('HTTP_REFERER', u'/')).query
     return HttpResponseRedirect('%s?%s' % (reverse('search_advanced'), query))
+
+
+def search_index_rebuild(request):
+    """
+    Confirmation view to execute the tool: do_rebuild_search_index
+    """
+    Permission.objects.check_permissions(request.user, [PERMISSION_SEARCH_INDEX_REBUILD])
+
+    previous = request.POST.get('previous', request.GET.get('previous', request.META.get('HTTP_REFERER', None)))
+    next = request.POST.get('next', request.GET.get('next', request.META.get('HTTP_REFERER', None)))
+
+    if request.method != 'POST':
+        return render_to_response('generic_confirm.html', {
+            'previous': previous,
+            'next': next,
+            'title': _(u'Are you sure you wish to rebuild the search index?'),
+            'message': _(u'On large databases this operation may take some time to execute.'),
+            'form_icon': u'folder_page.png',
+        }, context_instance=RequestContext(request))
+    else:
+        try:
+            # Executed by the job workers, can take a long time
+            process_job(do_rebuild_search_index)
+            messages.success(request, _(u'Search index rebuild queued successfully.'))
+        except Exception, e:
+            if settings.DEBUG:
+                raise
+            messages.error(request, _(u'Search index rebuild error: %s') % e)
+
+        return HttpResponseRedirect(next)
@@ -0,0 +1,11 @@
+from __future__ import absolute_import
+
+from django.utils.translation import ugettext_lazy as _
+
+from .api import register_periodic_job
+from .literals import JOB_PRIORITY_LOW
+from .tasks import task_purge_job_results
+
+PURGE_JOB_RESULTS_INTERVAL = 60 * 60
+
+register_periodic_job('task_purge_job_results', _(u'Delete the results of old finished jobs.'), task_purge_job_results, seconds=PURGE_JOB_RESULTS_INTERVAL, priority=JOB_PRIORITY_LOW)
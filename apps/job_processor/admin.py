@@ -0,0 +1,21 @@
+from __future__ import absolute_import
+
+from django.contrib import admin
+
+from .models import Job, JobResult
+
+
+class JobAdmin(admin.ModelAdmin):
+    model = Job
+    list_display = ('name', 'priority', 'state', 'attempts', 'datetime_created', 'datetime_available', 'node_name')
+    list_filter = ('name', 'state')
+
+
+class JobResultAdmin(admin.ModelAdmin):
+    model = JobResult
+    list_display = ('name', 'result', 'attempts', 'datetime_created', 'datetime_finished', 'node_name')
+    list_filter = ('name', 'result')
+
+
+admin.site.register(Job, JobAdmin)
+admin.site.register(JobResult, JobResultAdmin)
@@ -1,2 +1,213 @@
+from __future__ import absolute_import
+
+import datetime
+import logging
+import platform
+import time
+import traceback
+
+from django.db import transaction
+from django.utils.simplejson import dumps
+
+from scheduler.api import register_interval_job
+
+from .conf.settings import (RETRIES, RETRY_DELAY, VISIBILITY_TIMEOUT,
+    ALWAYS_EAGER)
+from .exceptions import UnknownJob
+from .literals import (JOB_STATE_PENDING, JOB_PRIORITY_NORMAL,
+    JOB_RESULT_SUCCESS, JOB_RESULT_ERROR, STALLED_QUEUE_DELAY,
+    STALLED_QUEUE_CHECK_INTERVAL)
+from .models import Job, JobResult
+
+logger = logging.getLogger(__name__)
+
+registered_jobs = {}
+# Time of the last check for a stalled queue in this process
+last_stalled_check = [0]
+
+
+def register_job(name, func, title=None, priority=JOB_PRIORITY_NORMAL, retries=None, unique=False):
+    """
+    Register a function as a job that can be queued by name and executed
+    by the worker processes.  Unique jobs are not queued again while an
+    identical job is still pending
+    """
+    registered_jobs[name] = {
+        'name': name,
+        'func': func,
+        'title': title or name,
+        'priority': priority,
+        'retries': RETRIES if retries is None else retries,
+        'unique': unique,
+    }
+
+
+def register_periodic_job(name, title, func, seconds, priority=JOB_PRIORITY_NORMAL, retries=0, args=None, kwargs=None):
+    """
+    Register a job and make the scheduler queue it every given amount of
+    seconds, the job itself is executed by the worker processes
+    """
+    register_job(name, func, title=title, priority=priority, retries=retries, unique=True)
+    schedule_job(name, title, name, seconds=seconds, args=args, kwargs=kwargs)
+
+
+def schedule_job(name, title, job_name, seconds, args=None, kwargs=None):
+    """
+    Make the scheduler queue an already registered job every given
+    amount of seconds, name identifies the schedule in the scheduler
+    """
+    register_interval_job(name, title, queue_job, seconds=seconds, args=[job_name], kwargs={'args': args, 'kwargs': kwargs})
+
+
+def get_job_type(name):
+    try:
+        return registered_jobs[name]
+    except KeyError:
+        raise UnknownJob('Unknown job: %s' % name)
+
+
+def get_job_name(func):
+    for job_type in registered_jobs.values():
+        if job_type['func'] == func:
+            return job_type['name']
+
+
+def queue_job(name, args=None, kwargs=None, priority=None, delay=0):
+    """
+    Store a job in the queue for a worker to execute, returns the
+    queued job or None when the job was executed eagerly or an
+    identical unique job is already pending
+    """
+    job_type = get_job_type(name)
+    arguments = dumps({'args': args or [], 'kwargs': kwargs or {}})
+
+    if ALWAYS_EAGER:
+        job_type['func'](*(args or []), **(kwargs or {}))
+        return None
+
+    if job_type['unique'] and Job.objects.filter(name=name, arguments=arguments, state=JOB_STATE_PENDING).exists():
+        logger.debug('job already queued: %s' % name)
+        return None
+
+    job = Job.objects.create(
+        name=name,
+        arguments=arguments,
+        priority=job_type['priority'] if priority is None else priority,
+        maximum_attempts=job_type['retries'] + 1,
+        datetime_available=datetime.datetime.now() + datetime.timedelta(seconds=delay)
+    )
+    transaction.commit_unless_managed()
+    check_stalled_queue()
+    return job
+
+
+def check_stalled_queue():
+    """
+    Warn when queued jobs are not being claimed, usually because no
+    job_worker command is running and JOB_PROCESSOR_ALWAYS_EAGER is off,
+    checked at most every STALLED_QUEUE_CHECK_INTERVAL seconds
+    """
+    if time.time() - last_stalled_check[0] < STALLED_QUEUE_CHECK_INTERVAL:
+        return
+
+    last_stalled_check[0] = time.time()
+    stalled = Job.objects.stalled(STALLED_QUEUE_DELAY).count()
+    if stalled:
+        logger.warning('%d jobs have been waiting for more than %d seconds, is the job_worker command running?' % (stalled, STALLED_QUEUE_DELAY))
+
+
 def process_job(func, *args, **kwargs):
-    return func(*args, **kwargs)
+    """
+    Queue a call of a registered job function, functions that were not
+    registered are executed immediately
+    """
+    name = get_job_name(func)
+    if name:
+        return queue_job(name, args=list(args), kwargs=kwargs)
+    else:
+        return func(*args, **kwargs)
+
+
+def get_queued_arguments(func):
+    """
+    Return the arguments of the queued calls of a registered job function
+    that are waiting or being executed
+    """
+    return [job.get_arguments() for job in Job.objects.filter(name=get_job_name(func))]
+
+
+def execute_job(job):
+    """
+    Execute a claimed job and either record its result or put it back in
+    the queue to be retried with an exponential backoff.  The job runs in
+    its own transaction, the writes of a failed attempt are rolled back
+    """
+    args, kwargs = job.get_arguments()
+    transaction.enter_transaction_management()
+    transaction.managed(True)
+    try:
+        try:
+            value = get_job_type(job.name)['func'](*args, **kwargs)
+        except Exception, msg:
+            # Discard the partial writes, on PostgreSQL a database error
+            # also aborts the transaction and the job couldn't be saved
+            transaction.rollback()
+            logger.error('job: %s, attempt: %d; %s' % (job.name, job.attempts, msg))
+            error = traceback.format_exc()
+            if job.attempts < job.maximum_attempts:
+                job.state = JOB_STATE_PENDING
+                job.error = error
+                job.datetime_available = datetime.datetime.now() + datetime.timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+                job.save()
+            else:
+                finish_job(job, JOB_RESULT_ERROR, error)
+        else:
+            finish_job(job, JOB_RESULT_SUCCESS, value)
+
+        transaction.commit()
+    except:
+        transaction.rollback()
+        raise
+    finally:
+        transaction.leave_transaction_management()
+
+
+def finish_job(job, result, value):
+    JobResult.objects.create(
+        name=job.name,
+        arguments=job.arguments,
+        result=result,
+        value=None if value is None else unicode(value),
+        attempts=job.attempts,
+        datetime_created=job.datetime_created,
+        datetime_finished=datetime.datetime.now(),
+        node_name=platform.node()[:32]
+    )
+    job.delete()
+
+
+def fail_abandoned_jobs():
+    """
+    Record as failed the jobs whose worker died or hung during their
+    last attempt, they would otherwise stay in the queue forever
+    """
+    for job in Job.objects.abandoned():
+        logger.error('job: %s, attempt: %d; abandoned' % (job.name, job.attempts))
+        finish_job(job, JOB_RESULT_ERROR, u'Abandoned after %d attempts, the worker died or exceeded the visibility timeout.' % job.attempts)
+
+    transaction.commit_unless_managed()
+
+
+def execute_next_job(names=None):
+    """
+    Claim and execute the next available job, returns False when the
+    queue is empty
+    """
+    job = Job.objects.claim(visibility_timeout=VISIBILITY_TIMEOUT, names=names)
+    transaction.commit_unless_managed()
+    if not job:
+        fail_abandoned_jobs()
+        return False
+
+    execute_job(job)
+    return True
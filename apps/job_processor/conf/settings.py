@@ -0,0 +1,19 @@
+"""Configuration options for the job_processor app"""
+
+from django.utils.translation import ugettext_lazy as _
+
+from smart_settings.api import register_settings
+
+register_settings(
+    namespace=u'job_processor',
+    module=u'job_processor.conf.settings',
+    settings=[
+        {'name': u'WORKERS', 'global_name': u'JOB_PROCESSOR_WORKERS', 'default': 2, 'description': _(u'Amount of worker processes started by the job_worker command.')},
+        {'name': u'POLL_INTERVAL', 'global_name': u'JOB_PROCESSOR_POLL_INTERVAL', 'default': 2, 'description': _(u'Amount of seconds an idle worker waits before checking the queue again.')},
+        {'name': u'VISIBILITY_TIMEOUT', 'global_name': u'JOB_PROCESSOR_VISIBILITY_TIMEOUT', 'default': 3600, 'description': _(u'Amount of seconds after which a job being processed is considered abandoned and is handed to another worker.')},
+        {'name': u'RETRIES', 'global_name': u'JOB_PROCESSOR_RETRIES', 'default': 3, 'description': _(u'Default amount of times a failed job is retried.')},
+        {'name': u'RETRY_DELAY', 'global_name': u'JOB_PROCESSOR_RETRY_DELAY', 'default': 30, 'description': _(u'Amount of seconds before the first retry of a failed job, the delay doubles with every retry.')},
+        {'name': u'RESULT_EXPIRATION', 'global_name': u'JOB_PROCESSOR_RESULT_EXPIRATION', 'default': 7 * 24 * 60 * 60, 'description': _(u'Amount of seconds the results of finished jobs are kept.')},
+        {'name': u'ALWAYS_EAGER', 'global_name': u'JOB_PROCESSOR_ALWAYS_EAGER', 'default': False, 'description': _(u'Execute jobs in the process that queues them instead of in the worker processes.  Useful for development setups without a running job_worker command.')},
+    ]
+)
@@ -0,0 +1,12 @@
+class JobProcessorError(Exception):
+    """
+    Base exception for the job processor app
+    """
+    pass
+
+
+class UnknownJob(JobProcessorError):
+    """
+    Raised when queueing or executing a job name that was not registered
+    """
+    pass
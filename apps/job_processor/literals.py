@@ -0,0 +1,33 @@
+from django.utils.translation import ugettext_lazy as _
+
+JOB_STATE_PENDING = 'p'
+JOB_STATE_PROCESSING = 'r'
+
+JOB_STATE_CHOICES = (
+    (JOB_STATE_PENDING, _(u'pending')),
+    (JOB_STATE_PROCESSING, _(u'processing')),
+)
+
+JOB_RESULT_SUCCESS = 's'
+JOB_RESULT_ERROR = 'e'
+
+JOB_RESULT_CHOICES = (
+    (JOB_RESULT_SUCCESS, _(u'success')),
+    (JOB_RESULT_ERROR, _(u'error')),
+)
+
+JOB_PRIORITY_LOW = 0
+JOB_PRIORITY_NORMAL = 50
+JOB_PRIORITY_HIGH = 100
+
+JOB_PRIORITY_CHOICES = (
+    (JOB_PRIORITY_LOW, _(u'low')),
+    (JOB_PRIORITY_NORMAL, _(u'normal')),
+    (JOB_PRIORITY_HIGH, _(u'high')),
+)
+
+# Jobs not claimed this amount of seconds after becoming available mean
+# that no job_worker command is running
+STALLED_QUEUE_DELAY = 10 * 60
+# Amount of seconds between two checks for a stalled queue in a process
+STALLED_QUEUE_CHECK_INTERVAL = 60
@@ -0,0 +1,69 @@
+from __future__ import absolute_import
+
+import logging
+import multiprocessing
+import signal
+import sys
+import time
+from optparse import make_option
+
+from django.core.management.base import NoArgsCommand
+from django.db import connection
+
+from ...api import execute_next_job
+from ...conf.settings import WORKERS, POLL_INTERVAL
+from ...signals import worker_started
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(names, poll_interval):
+    # Don't share the parent's database connection
+    connection.close()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    worker_started.send(sender=None)
+    while True:
+        try:
+            if not execute_next_job(names=names):
+                connection.close()
+                time.sleep(poll_interval)
+        except Exception, msg:
+            # Database errors and the like, don't let the worker die
+            logger.error('job worker error: %s' % msg)
+            connection.close()
+            time.sleep(poll_interval)
+
+
+class Command(NoArgsCommand):
+    option_list = NoArgsCommand.option_list + (
+        make_option('--workers', action='store', dest='workers', type='int',
+            default=WORKERS, help='Amount of worker processes to start.'),
+        make_option('--jobs', action='store', dest='jobs',
+            default=None, help='Comma separated list of the job names to '
+                'process, defaults to all jobs.'),
+    )
+    help = 'Starts worker processes that execute the queued jobs.'
+
+    def handle_noargs(self, **options):
+        workers = options['workers']
+        names = options['jobs'] and options['jobs'].split(',') or None
+        connection.close()
+
+        processes = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            while True:
+                # Start missing workers and replace the ones that died
+                processes = [process for process in processes if process.is_alive()]
+                while len(processes) < workers:
+                    process = multiprocessing.Process(target=run_worker, args=(names, POLL_INTERVAL))
+                    process.start()
+                    processes.append(process)
+                    logger.debug('started job worker: %s' % process.pid)
+
+                time.sleep(POLL_INTERVAL)
+        except (KeyboardInterrupt, SystemExit):
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
@@ -0,0 +1,60 @@
+from __future__ import absolute_import
+
+import datetime
+import platform
+
+from django.db import models
+from django.db.models import Q, F
+
+from .literals import JOB_STATE_PENDING, JOB_STATE_PROCESSING
+
+
+class JobManager(models.Manager):
+    def available(self):
+        """
+        Jobs that can be claimed by a worker: pending jobs past their
+        retry delay and jobs whose visibility timeout expired
+        """
+        now = datetime.datetime.now()
+        return self.filter(Q(state=JOB_STATE_PENDING) | Q(state=JOB_STATE_PROCESSING), datetime_available__lte=now, attempts__lt=F('maximum_attempts'))
+
+    def abandoned(self):
+        """
+        Jobs whose visibility timeout expired after their last attempt,
+        their worker died or hung and they can't be retried
+        """
+        now = datetime.datetime.now()
+        return self.filter(state=JOB_STATE_PROCESSING, datetime_available__lte=now, attempts__gte=F('maximum_attempts'))
+
+    def stalled(self, delay):
+        """
+        Pending jobs that have been available for longer than delay
+        seconds without any worker claiming them
+        """
+        limit = datetime.datetime.now() - datetime.timedelta(seconds=delay)
+        return self.filter(state=JOB_STATE_PENDING, datetime_available__lte=limit)
+
+    def claim(self, visibility_timeout, names=None, candidates=10):
+        """
+        Atomically take the available job with the highest priority and
+        mark it as being processed by this node, returns None when there
+        is nothing to do
+        """
+        queryset = self.available()
+        if names:
+            queryset = queryset.filter(name__in=names)
+
+        for job in queryset.order_by('-priority', 'datetime_available')[:candidates]:
+            now = datetime.datetime.now()
+            # Only one worker can match the old state and attempt count
+            claimed = self.filter(pk=job.pk, state=job.state, attempts=job.attempts, attempts__lt=F('maximum_attempts')).update(
+                state=JOB_STATE_PROCESSING,
+                attempts=F('attempts') + 1,
+                datetime_started=now,
+                datetime_available=now + datetime.timedelta(seconds=visibility_timeout),
+                node_name=platform.node()[:32]
+            )
+            if claimed:
+                return self.get(pk=job.pk)
+
+        return None
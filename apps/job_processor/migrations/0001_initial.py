@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'Job'
+        db.create_table('job_processor_job', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('name', self.gf('django.db.models.fields.CharField')(max_length=128, db_index=True)),
+            ('arguments', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('priority', self.gf('django.db.models.fields.IntegerField')(default=50)),
+            ('state', self.gf('django.db.models.fields.CharField')(default='p', max_length=1)),
+            ('attempts', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('maximum_attempts', self.gf('django.db.models.fields.PositiveIntegerField')(default=1)),
+            ('datetime_created', self.gf('django.db.models.fields.DateTimeField')(auto_now_add=True, blank=True)),
+            ('datetime_available', self.gf('django.db.models.fields.DateTimeField')(db_index=True)),
+            ('datetime_started', self.gf('django.db.models.fields.DateTimeField')(null=True, blank=True)),
+            ('node_name', self.gf('django.db.models.fields.CharField')(max_length=32, null=True, blank=True)),
+            ('error', self.gf('django.db.models.fields.TextField')(null=True, blank=True)),
+        ))
+        db.send_create_signal('job_processor', ['Job'])
+
+        # Adding model 'JobResult'
+        db.create_table('job_processor_jobresult', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('name', self.gf('django.db.models.fields.CharField')(max_length=128, db_index=True)),
+            ('arguments', self.gf('django.db.models.fields.TextField')(blank=True)),
+            ('result', self.gf('django.db.models.fields.CharField')(max_length=1)),
+            ('value', self.gf('django.db.models.fields.TextField')(null=True, blank=True)),
+            ('attempts', self.gf('django.db.models.fields.PositiveIntegerField')(default=0)),
+            ('datetime_created', self.gf('django.db.models.fields.DateTimeField')()),
+            ('datetime_finished', self.gf('django.db.models.fields.DateTimeField')(db_index=True)),
+            ('node_name', self.gf('django.db.models.fields.CharField')(max_length=32, null=True, blank=True)),
+        ))
+        db.send_create_signal('job_processor', ['JobResult'])
+
+
+    def backwards(self, orm):
+        # Deleting model 'Job'
+        db.delete_table('job_processor_job')
+
+        # Deleting model 'JobResult'
+        db.delete_table('job_processor_jobresult')
+
+
+    models = {
+        'job_processor.job': {
+            'Meta': {'ordering': "('-priority', 'datetime_available')", 'object_name': 'Job'},
+            'arguments': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'attempts': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'datetime_available': ('django.db.models.fields.DateTimeField', [], {'db_index': 'True'}),
+            'datetime_created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'datetime_started': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'error': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'maximum_attempts': ('django.db.models.fields.PositiveIntegerField', [], {'default': '1'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '128', 'db_index': 'True'}),
+            'node_name': ('django.db.models.fields.CharField', [], {'max_length': '32', 'null': 'True', 'blank': 'True'}),
+            'priority': ('django.db.models.fields.IntegerField', [], {'default': '50'}),
+            'state': ('django.db.models.fields.CharField', [], {'default': "'p'", 'max_length': '1'})
+        },
+        'job_processor.jobresult': {
+            'Meta': {'ordering': "('-datetime_finished',)", 'object_name': 'JobResult'},
+            'arguments': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'attempts': ('django.db.models.fields.PositiveIntegerField', [], {'default': '0'}),
+            'datetime_created': ('django.db.models.fields.DateTimeField', [], {}),
+            'datetime_finished': ('django.db.models.fields.DateTimeField', [], {'db_index': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '128', 'db_index': 'True'}),
+            'node_name': ('django.db.models.fields.CharField', [], {'max_length': '32', 'null': 'True', 'blank': 'True'}),
+            'result': ('django.db.models.fields.CharField', [], {'max_length': '1'}),
+            'value': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'})
+        }
+    }
+
+    complete_apps = ['job_processor']
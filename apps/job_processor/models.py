@@ -1,3 +1,68 @@
+from __future__ import absolute_import
+
 from django.db import models
+from django.utils.translation import ugettext_lazy as _
+from django.utils.simplejson import loads
+
+from .literals import (JOB_STATE_CHOICES, JOB_STATE_PENDING,
+    JOB_RESULT_CHOICES, JOB_PRIORITY_CHOICES, JOB_PRIORITY_NORMAL)
+from .managers import JobManager
+
+
+class Job(models.Model):
+    """
+    Queued job waiting for or being processed by a worker
+    """
+    name = models.CharField(max_length=128, verbose_name=_(u'name'), db_index=True)
+    arguments = models.TextField(blank=True, verbose_name=_(u'arguments'))
+    priority = models.IntegerField(choices=JOB_PRIORITY_CHOICES, default=JOB_PRIORITY_NORMAL, verbose_name=_(u'priority'))
+    state = models.CharField(max_length=1, choices=JOB_STATE_CHOICES, default=JOB_STATE_PENDING, verbose_name=_(u'state'))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_(u'attempts'))
+    maximum_attempts = models.PositiveIntegerField(default=1, verbose_name=_(u'maximum attempts'))
+    datetime_created = models.DateTimeField(verbose_name=_(u'date time created'), auto_now_add=True)
+    # Pending jobs are not visible to the workers before this date, for
+    # jobs being processed this is the visibility timeout after which
+    # the job is considered abandoned
+    datetime_available = models.DateTimeField(verbose_name=_(u'date time available'), db_index=True)
+    datetime_started = models.DateTimeField(blank=True, null=True, verbose_name=_(u'date time started'))
+    node_name = models.CharField(max_length=32, blank=True, null=True, verbose_name=_(u'node name'))
+    error = models.TextField(blank=True, null=True, verbose_name=_(u'last error'))
+
+    objects = JobManager()
+
+    def __unicode__(self):
+        return self.name
+
+    def get_arguments(self):
+        if self.arguments:
+            arguments = loads(self.arguments)
+            return arguments.get('args', []), dict([(str(key), value) for key, value in arguments.get('kwargs', {}).items()])
+        else:
+            return [], {}
+
+    class Meta:
+        ordering = ('-priority', 'datetime_available')
+        verbose_name = _(u'job')
+        verbose_name_plural = _(u'jobs')
+
+
+class JobResult(models.Model):
+    """
+    Outcome of a job that finished successfully or exhausted its retries
+    """
+    name = models.CharField(max_length=128, verbose_name=_(u'name'), db_index=True)
+    arguments = models.TextField(blank=True, verbose_name=_(u'arguments'))
+    result = models.CharField(max_length=1, choices=JOB_RESULT_CHOICES, verbose_name=_(u'result'))
+    value = models.TextField(blank=True, null=True, verbose_name=_(u'value'))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_(u'attempts'))
+    datetime_created = models.DateTimeField(verbose_name=_(u'date time created'))
+    datetime_finished = models.DateTimeField(verbose_name=_(u'date time finished'), db_index=True)
+    node_name = models.CharField(max_length=32, blank=True, null=True, verbose_name=_(u'node name'))
+
+    def __unicode__(self):
+        return self.name
 
-# Create your models here.
+    class Meta:
+        ordering = ('-datetime_finished',)
+        verbose_name = _(u'job result')
+        verbose_name_plural = _(u'job results')
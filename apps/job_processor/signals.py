@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by each worker process of the job_worker command when it starts,
+# before executing any job
+worker_started = Signal()
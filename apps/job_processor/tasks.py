@@ -0,0 +1,14 @@
+from __future__ import absolute_import
+
+import datetime
+import logging
+
+from .conf.settings import RESULT_EXPIRATION
+from .models import JobResult
+
+logger = logging.getLogger(__name__)
+
+
+def task_purge_job_results():
+    logger.debug('executing...')
+    JobResult.objects.filter(datetime_finished__lt=datetime.datetime.now() - datetime.timedelta(seconds=RESULT_EXPIRATION)).delete()
@@ -0,0 +1,77 @@
+from __future__ import absolute_import
+
+import datetime
+
+from django.test import TestCase, TransactionTestCase
+
+from .api import (register_job, queue_job, execute_next_job,
+    fail_abandoned_jobs)
+from .literals import (JOB_STATE_PENDING, JOB_STATE_PROCESSING,
+    JOB_RESULT_ERROR)
+from .models import Job, JobResult
+
+
+def failing_job():
+    raise Exception('failure')
+
+
+def writing_job():
+    JobResult.objects.create(name='test_writing_job_row', datetime_created=datetime.datetime.now(), datetime_finished=datetime.datetime.now())
+    raise Exception('failure after writing')
+
+
+class JobClaimTestCase(TestCase):
+    def setUp(self):
+        register_job('test_failing_job', failing_job, retries=1)
+
+    def test_retries(self):
+        queue_job('test_failing_job')
+
+        self.failUnlessEqual(execute_next_job(), True)
+        job = Job.objects.get(name='test_failing_job')
+        self.failUnlessEqual(job.attempts, 1)
+
+        # Skip the retry delay
+        Job.objects.filter(pk=job.pk).update(datetime_available=datetime.datetime.now())
+        self.failUnlessEqual(execute_next_job(), True)
+
+        self.failUnlessEqual(Job.objects.filter(name='test_failing_job').exists(), False)
+        self.failUnlessEqual(JobResult.objects.get(name='test_failing_job').result, JOB_RESULT_ERROR)
+
+    def test_abandoned_job(self):
+        # The worker died during the last attempt
+        job = queue_job('test_failing_job')
+        Job.objects.filter(pk=job.pk).update(state=JOB_STATE_PROCESSING, attempts=2, datetime_available=datetime.datetime.now() - datetime.timedelta(seconds=1))
+
+        self.failUnlessEqual(Job.objects.claim(visibility_timeout=60), None)
+
+        fail_abandoned_jobs()
+        self.failUnlessEqual(Job.objects.filter(pk=job.pk).exists(), False)
+        self.failUnlessEqual(JobResult.objects.get(name='test_failing_job').attempts, 2)
+
+    def test_expired_job_is_claimed_again(self):
+        # The worker died during an attempt that can still be retried
+        job = queue_job('test_failing_job')
+        Job.objects.filter(pk=job.pk).update(state=JOB_STATE_PROCESSING, attempts=1, datetime_available=datetime.datetime.now() - datetime.timedelta(seconds=1))
+
+        claimed = Job.objects.claim(visibility_timeout=60)
+        self.failUnlessEqual(claimed.pk, job.pk)
+        self.failUnlessEqual(claimed.attempts, 2)
+        self.failUnlessEqual(Job.objects.claim(visibility_timeout=60), None)
+
+
+class JobTransactionTestCase(TransactionTestCase):
+    # A TransactionTestCase, the job's rollback is a no-op inside the
+    # transaction of a TestCase
+    def setUp(self):
+        register_job('test_writing_job', writing_job, retries=1)
+
+    def test_failed_job_writes_rolled_back(self):
+        queue_job('test_writing_job')
+
+        self.failUnlessEqual(execute_next_job(), True)
+        self.failUnlessEqual(JobResult.objects.filter(name='test_writing_job_row').exists(), False)
+
+        job = Job.objects.get(name='test_writing_job')
+        self.failUnlessEqual(job.state, JOB_STATE_PENDING)
+        self.failUnless('failure after writing' in job.error)
@@ -6,18 +6,39 @@ from django.core.urlresolvers import reverse
 from django.utils.safestring import mark_safe
 from django.template.defaultfilters import capfirst
 
+from common.expressions import ExpressionError
+from common.runtime import expression_cache
 from documents.widgets import document_html_widget
 from tags.widgets import get_tags_inline_widget
 
 from .models import SmartLink, SmartLinkCondition
 
 
+def validate_expression(expression):
+    try:
+        expression_cache.compile(expression)
+    except ExpressionError, exc:
+        raise forms.ValidationError(exc.reason)
+
+
 class SmartLinkForm(forms.ModelForm):
     class Meta:
         model = SmartLink
 
+    def clean_dynamic_title(self):
+        dynamic_title = self.cleaned_data['dynamic_title']
+        if dynamic_title:
+            validate_expression(dynamic_title)
+
+        return dynamic_title
+
 
 class SmartLinkConditionForm(forms.ModelForm):
+    def clean_expression(self):
+        expression = self.cleaned_data['expression']
+        validate_expression(expression)
+        return expression
+
     class Meta:
         model = SmartLinkCondition
         exclude = ('smart_link',)
@@ -3,6 +3,7 @@ from __future__ import absolute_import
 from django.db import models
 from django.db.models import Q
 
+from common.runtime import expression_cache
 from metadata.classes import MetadataClass
 from documents.models import Document
 
@@ -31,7 +32,7 @@ class SmartLinkManager(models.Manager):
                 cls, attribute = condition.foreign_document_data.lower().split(u'.')
                 try:
                     if cls == u'metadata':
-                        value_query = Q(**{'documentmetadata__value__%s' % condition.operator: eval(condition.expression, eval_dict)})
+                        value_query = Q(**{'documentmetadata__value__%s' % condition.operator: expression_cache.evaluate(condition.expression, eval_dict)})
                         if condition.negated:
                             query = (Q(documentmetadata__metadata_type__name=attribute) & ~value_query)
                         else:
@@ -43,7 +44,7 @@ class SmartLinkManager(models.Manager):
 
                     elif cls == u'document':
                         value_query = Q(**{
-                            '%s__%s' % (attribute, condition.operator): eval(condition.expression, eval_dict)
+                            '%s__%s' % (attribute, condition.operator): expression_cache.evaluate(condition.expression, eval_dict)
                         })
                         if condition.negated:
                             query = ~value_query
@@ -70,7 +71,7 @@ class SmartLinkManager(models.Manager):
 
             if smart_link.dynamic_title:
                 try:
-                    result[smart_link]['title'] = eval(smart_link.dynamic_title, eval_dict)
+                    result[smart_link]['title'] = expression_cache.evaluate(smart_link.dynamic_title, eval_dict)
                 except Exception, e:
                     result[smart_link]['title'] = 'Error; %s' % e
             else:
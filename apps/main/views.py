@@ -9,6 +9,7 @@ from django.core.urlresolvers import reverse
 
 from documents.statistics import get_statistics as documents_statistics
 from ocr.statistics import get_statistics as ocr_statistics
+from dynamic_search.statistics import get_statistics as search_statistics
 from permissions.models import Permission
 
 from .api import diagnostics, tools
@@ -50,6 +51,7 @@ def statistics(request):
         blocks = []
         blocks.append(documents_statistics())
         blocks.append(ocr_statistics())
+        blocks.append(search_statistics())
 
         return render_to_response('statistics.html', {
             'blocks': blocks,
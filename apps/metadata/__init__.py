@@ -1,16 +1,19 @@
 from __future__ import absolute_import
 
 from django.utils.translation import ugettext_lazy as _
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 from navigation.api import (register_links, register_multi_item_links,
     register_sidebar_template, register_model_list_columns)
 from documents.models import Document, DocumentType
 from documents.permissions import PERMISSION_DOCUMENT_TYPE_EDIT
+from dynamic_search.classes import SearchModel
 from project_setup.api import register_setup
 from acls.api import class_permissions
 from common.utils import encapsulate
 
-from .models import MetadataType, MetadataSet
+from .models import MetadataType, MetadataSet, DocumentMetadata
 from .permissions import (PERMISSION_METADATA_DOCUMENT_EDIT,
     PERMISSION_METADATA_DOCUMENT_ADD, PERMISSION_METADATA_DOCUMENT_REMOVE,
     PERMISSION_METADATA_DOCUMENT_VIEW, PERMISSION_METADATA_TYPE_EDIT,
@@ -71,3 +74,9 @@ register_model_list_columns(Document, [
             encapsulate(lambda x: get_metadata_string(x))
         },
     ])
+
+
+@receiver(post_save, dispatch_uid='document_metadata_search_index', sender=DocumentMetadata)
+@receiver(post_delete, dispatch_uid='document_metadata_search_remove', sender=DocumentMetadata)
+def document_metadata_search_index(sender, instance, **kwargs):
+    SearchModel.get('documents.Document').index_object(instance.document_id, ['documentmetadata__metadata_type__name', 'documentmetadata__value'])
@@ -1,13 +1,69 @@
 from __future__ import absolute_import
 
-from django.db import models
+from django.db import connection, models
+from django.utils.datastructures import SortedDict
 
 
 class MetadataTypeManager(models.Manager):
     def get_by_natural_key(self, name):
         return self.get(name=name)
 
+    def get_for_documents(self, documents):
+        """
+        Return the metadata types used by any of the documents
+        """
+        return self.filter(documentmetadata__document__in=documents).distinct()
+
 
 class MetadataSetManager(models.Manager):
     def get_by_natural_key(self, title):
         return self.get(title=title)
+
+
+class DocumentMetadataManager(models.Manager):
+    def filter_documents(self, queryset, filters):
+        """
+        Filter a queryset of documents by a dictionary of metadata type
+        names and values the documents must contain, each filter is a
+        subquery on the metadata instead of a join and a lookup of the
+        metadata type
+        """
+        for name, value in filters.items():
+            if value:
+                queryset = queryset.filter(pk__in=self.filter(metadata_type__name=name, value__icontains=value).values('document'))
+
+        return queryset
+
+    def sort_documents(self, queryset, name, descending=False):
+        """
+        Order a queryset of documents by their value for a metadata type
+        with a single query, documents without a value go last.  The value
+        is read by a subquery per document, equivalent to a left join on
+        the metadata of that type which the ORM can't express, that uses
+        the (metadata type, value, document) index
+        """
+        qn = connection.ops.quote_name
+        metadata_type_model = self.model._meta.get_field('metadata_type').rel.to
+        value_sql = u'SELECT %(aggregate)s(M.%(value)s) FROM %(metadata)s M INNER JOIN %(metadata_type)s T ON M.%(metadata_type_id)s = T.%(metadata_type_pk)s WHERE M.%(document_id)s = %(document)s.%(document_pk)s AND T.%(name)s = %%s AND M.%(value)s <> \'\'' % {
+            # The value used when a document has several of the same type
+            'aggregate': descending and u'MAX' or u'MIN',
+            'value': qn(self.model._meta.get_field('value').column),
+            'metadata': qn(self.model._meta.db_table),
+            'metadata_type': qn(metadata_type_model._meta.db_table),
+            'metadata_type_id': qn(self.model._meta.get_field('metadata_type').column),
+            'metadata_type_pk': qn(metadata_type_model._meta.pk.column),
+            'document_id': qn(self.model._meta.get_field('document').column),
+            'document': qn(queryset.model._meta.db_table),
+            'document_pk': qn(queryset.model._meta.pk.column),
+            'name': qn(metadata_type_model._meta.get_field('name').column),
+        }
+
+        return queryset.extra(
+            select=SortedDict([
+                ('metadata_sort_missing', u'(%s) IS NULL' % value_sql),
+                ('metadata_sort_value', value_sql),
+            ]),
+            select_params=(name, name),
+            # The primary key makes the order stable across pages
+            order_by=['metadata_sort_missing', u'%smetadata_sort_value' % (descending and u'-' or u''), descending and u'-pk' or u'pk']
+        )
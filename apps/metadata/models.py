@@ -6,7 +6,8 @@ from django.utils.translation import ugettext_lazy as _
 from documents.models import Document, DocumentType
 
 from .conf.settings import (AVAILABLE_MODELS, AVAILABLE_FUNCTIONS)
-from .managers import MetadataTypeManager, MetadataSetManager
+from .managers import (DocumentMetadataManager, MetadataTypeManager,
+    MetadataSetManager)
 
 available_models_string = (_(u' Available models: %s') % u','.join([name for name, model in AVAILABLE_MODELS.items()])) if AVAILABLE_MODELS else u''
 available_functions_string = (_(u' Available functions: %s') % u','.join([u'%s()' % name for name, function in AVAILABLE_FUNCTIONS.items()])) if AVAILABLE_FUNCTIONS else u''
@@ -86,6 +87,10 @@ class DocumentMetadata(models.Model):
     metadata_type = models.ForeignKey(MetadataType, verbose_name=_(u'type'))
     value = models.CharField(max_length=255, blank=True, verbose_name=_(u'value'), db_index=True)
 
+    # The (metadata_type, value, document) index used to sort and filter
+    # the documents is created by migration 0004
+    objects = DocumentMetadataManager()
+
     def __unicode__(self):
         return unicode(self.metadata_type)
 
@@ -13,7 +13,7 @@ from django.core.exceptions import PermissionDenied
 from documents.permissions import PERMISSION_DOCUMENT_TYPE_EDIT
 from documents.models import Document, RecentDocument, DocumentType
 from permissions.models import Permission
-from document_indexing.api import update_indexes, delete_indexes
+from document_indexing.api import update_indexes
 from acls.models import AccessEntry
 
 from common.utils import generate_choices_w_labels, encapsulate, get_object_name
@@ -80,12 +80,6 @@ def metadata_edit(request, document_id=None, document_id_list=None):
         formset = MetadataFormSet(request.POST)
         if formset.is_valid():
             for document in documents:
-
-                warnings = delete_indexes(document)
-                if request.user.is_staff or request.user.is_superuser:
-                    for warning in warnings:
-                        messages.warning(request, _(u'Error deleting document indexes; %s') % warning)
-
                 errors = []
                 for form in formset.forms:
                     if form.cleaned_data['update']:
@@ -244,12 +238,6 @@ def metadata_remove(request, document_id=None, document_id_list=None):
         formset = MetadataRemoveFormSet(request.POST)
         if formset.is_valid():
             for document in documents:
-
-                warnings = delete_indexes(document)
-                if request.user.is_staff or request.user.is_superuser:
-                    for warning in warnings:
-                        messages.warning(request, _(u'Error deleting document indexes; %s') % warning)
-
                 for form in formset.forms:
                     if form.cleaned_data['update']:
                         metadata_type = get_object_or_404(MetadataType, pk=form.cleaned_data['id'])
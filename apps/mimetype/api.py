@@ -16,6 +16,9 @@ MIMETYPE_ICONS_DIRECTORY_NAME = os.path.join('images', 'mimetypes')
 UNKNWON_TYPE_FILE_NAME = 'unknown.png'
 ERROR_FILE_NAME = 'error.png'
 
+# libmagic doesn't look further than the first megabyte of a file
+SNIFF_SIZE = 1024 * 1024
+
 mimetype_icons = {
     'application/pdf': 'file_extension_pdf.png',
     'application/zip': 'file_extension_zip.png',
@@ -92,21 +95,34 @@ def get_mimetype(file_description, filepath, mimetype_only=False):
     """
     Determine a file's mimetype by calling the system's libmagic
     library via python-magic or fallback to use python's mimetypes
-    library
+    library.  Only the first SNIFF_SIZE bytes of the file are read
+    """
+    try:
+        if USE_PYTHON_MAGIC:
+            buffer = file_description.read(SNIFF_SIZE)
+        else:
+            buffer = None
+    finally:
+        file_description.close()
+
+    return get_mimetype_from_buffer(buffer, filepath, mimetype_only)
+
+
+def get_mimetype_from_buffer(buffer, filepath, mimetype_only=False):
+    """
+    Same as get_mimetype for the first SNIFF_SIZE bytes of a file
+    already read by the caller
     """
     file_mimetype = None
     file_mime_encoding = None
     if USE_PYTHON_MAGIC:
         mime = magic.Magic(mime=True)
-        file_mimetype = mime.from_buffer(file_description.read())
+        file_mimetype = mime.from_buffer(buffer)
         if not mimetype_only:
-            file_description.seek(0)
             mime_encoding = magic.Magic(mime_encoding=True)
-            file_mime_encoding = mime_encoding.from_buffer(file_description.read())
+            file_mime_encoding = mime_encoding.from_buffer(buffer)
     else:
         path, filename = os.path.split(filepath)
         file_mimetype, file_mime_encoding = mimetypes.guess_type(filename)
 
-    file_description.close()
-
     return file_mimetype, file_mime_encoding
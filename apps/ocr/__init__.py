@@ -15,11 +15,11 @@ from main.api import register_maintenance_links
 from project_tools.api import register_tool
 from acls.api import class_permissions
 
-from scheduler.api import register_interval_job
+from job_processor.api import register_job, register_periodic_job
 
 from .conf.settings import (AUTOMATIC_OCR, QUEUE_PROCESSING_INTERVAL)
 from .models import DocumentQueue, QueueTransformation
-from .tasks import task_process_document_queues
+from .tasks import task_process_document_queues, task_process_queue_document
 from .permissions import (PERMISSION_OCR_DOCUMENT,
     PERMISSION_OCR_DOCUMENT_DELETE, PERMISSION_OCR_QUEUE_ENABLE_DISABLE,
     PERMISSION_OCR_CLEAN_ALL_PAGES)
@@ -99,7 +99,9 @@ def document_post_save(sender, instance, **kwargs):
 def create_default_queue_signal_handler(sender, **kwargs):
     create_default_queue()
 
-register_interval_job('task_process_document_queues', _(u'Checks the OCR queue for pending documents.'), task_process_document_queues, seconds=QUEUE_PROCESSING_INTERVAL)
+register_periodic_job('task_process_document_queues', _(u'Checks the OCR queue for pending documents.'), task_process_document_queues, seconds=QUEUE_PROCESSING_INTERVAL)
+# The OCR errors are stored in the queue document, don't retry
+register_job('task_process_queue_document', task_process_queue_document, title=_(u'OCR a queued document.'), retries=0)
 
 register_tool(ocr_tool_link)
 
@@ -18,6 +18,7 @@ from .conf.settings import (TESSERACT_PATH, TESSERACT_LANGUAGE, UNPAPER_PATH)
 from .exceptions import TesseractError, UnpaperError
 from .parsers import parse_document_page
 from .parsers.exceptions import ParserError, ParserUnknownFile
+from .runtime import page_pool
 from .literals import (DEFAULT_OCR_FILE_FORMAT, UNPAPER_FILE_FORMAT,
     DEFAULT_OCR_FILE_EXTENSION)
 
@@ -87,45 +88,69 @@ def do_document_ocr(queue_document):
     parser, if the parser fails or if there is no parser registered for
     the document mimetype do a visual OCR by calling tesseract
     """
-    for document_page in queue_document.document.pages.all():
+    document = queue_document.document
+    visual_ocr_pages = []
+    for document_page in document.pages.all():
         try:
             # Try to extract text by means of a parser
             parse_document_page(document_page)
         except (ParserError, ParserUnknownFile):
             # Fall back to doing visual OCR
-            ocr_transformations, warnings = queue_document.get_transformation_list()
-
-            document_filepath = document_page.document.get_image_cache_name(page=document_page.page_number, version=document_page.document_version.pk)
-            unpaper_output_filename = u'%s_unpaper_out_page_%s%s%s' % (document_page.document.uuid, document_page.page_number, os.extsep, UNPAPER_FILE_FORMAT)
-            unpaper_output_filepath = os.path.join(TEMPORARY_DIRECTORY, unpaper_output_filename)
-
-            unpaper_input = convert(document_filepath, file_format=UNPAPER_FILE_FORMAT, transformations=ocr_transformations)
-            execute_unpaper(input_filepath=unpaper_input, output_filepath=unpaper_output_filepath)
-
-            #from PIL import Image, ImageOps
-            #im = Image.open(document_filepath)
-            ##if im.mode=='RGBA':
-            ##    im=im.convert('RGB')
-            ##im = im.convert('L')
-            #im = ImageOps.grayscale(im)
-            #im.save(unpaper_output_filepath)
-
-            # Convert to TIFF
-            pre_ocr_filepath = convert(input_filepath=unpaper_output_filepath, file_format=DEFAULT_OCR_FILE_FORMAT)
-            # Tesseract needs an explicit file extension
-            pre_ocr_filepath_w_ext = os.extsep.join([pre_ocr_filepath, DEFAULT_OCR_FILE_EXTENSION])
-            os.rename(pre_ocr_filepath, pre_ocr_filepath_w_ext)
-            try:
-                ocr_text = run_tesseract(pre_ocr_filepath_w_ext, TESSERACT_LANGUAGE)
-
-                document_page.content = ocr_cleanup(ocr_text)
-                document_page.page_label = _(u'Text from OCR')
-                document_page.save()
-            finally:
-                cleanup(pre_ocr_filepath_w_ext)
-                cleanup(unpaper_input)
-                cleanup(document_filepath)
-                cleanup(unpaper_output_filepath)
+            visual_ocr_pages.append(document_page)
+
+    if visual_ocr_pages:
+        # Rasterize all the pages needing visual OCR in a single pass
+        image_cache_names = document.cache_page_images(version=visual_ocr_pages[0].document_version_id, page_numbers=[document_page.page_number for document_page in visual_ocr_pages])
+
+        ocr_transformations, warnings = queue_document.get_transformation_list()
+        # Fan out the pages to the worker processes of the node
+        texts = page_pool.map(do_page_image_ocr, [
+            (image_cache_names[document_page.page_number], ocr_transformations)
+            for document_page in visual_ocr_pages
+        ])
+
+        for document_page, text in zip(visual_ocr_pages, texts):
+            document_page.content = text
+            document_page.page_label = _(u'Text from OCR')
+            document_page.save()
+
+
+def do_page_image_ocr(document_filepath, ocr_transformations):
+    """
+    Clean up a page image with unpaper and pass the result to tesseract,
+    returns the cleaned up text.  Doesn't access the database so that it
+    can run in the worker processes of the page pool
+    """
+    handle, unpaper_output_filepath = tempfile.mkstemp(suffix=os.extsep + UNPAPER_FILE_FORMAT, dir=TEMPORARY_DIRECTORY)
+    os.close(handle)
+
+    unpaper_input = None
+    pre_ocr_filepath_w_ext = None
+    try:
+        unpaper_input = convert(document_filepath, file_format=UNPAPER_FILE_FORMAT, transformations=ocr_transformations)
+        execute_unpaper(input_filepath=unpaper_input, output_filepath=unpaper_output_filepath)
+
+        #from PIL import Image, ImageOps
+        #im = Image.open(document_filepath)
+        ##if im.mode=='RGBA':
+        ##    im=im.convert('RGB')
+        ##im = im.convert('L')
+        #im = ImageOps.grayscale(im)
+        #im.save(unpaper_output_filepath)
+
+        # Convert to TIFF
+        pre_ocr_filepath = convert(input_filepath=unpaper_output_filepath, file_format=DEFAULT_OCR_FILE_FORMAT)
+        # Tesseract needs an explicit file extension
+        pre_ocr_filepath_w_ext = os.extsep.join([pre_ocr_filepath, DEFAULT_OCR_FILE_EXTENSION])
+        os.rename(pre_ocr_filepath, pre_ocr_filepath_w_ext)
+
+        return ocr_cleanup(run_tesseract(pre_ocr_filepath_w_ext, TESSERACT_LANGUAGE))
+    finally:
+        if pre_ocr_filepath_w_ext:
+            cleanup(pre_ocr_filepath_w_ext)
+        if unpaper_input:
+            cleanup(unpaper_input)
+        cleanup(unpaper_output_filepath)
 
 
 def ocr_cleanup(text):
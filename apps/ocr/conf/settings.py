@@ -11,7 +11,9 @@ register_settings(
         {'name': u'TESSERACT_PATH', 'global_name': u'OCR_TESSERACT_PATH', 'default': u'/usr/bin/tesseract', 'exists': True},
         {'name': u'TESSERACT_LANGUAGE', 'global_name': u'OCR_TESSERACT_LANGUAGE', 'default': u'eng'},
         {'name': u'REPLICATION_DELAY', 'global_name': u'OCR_REPLICATION_DELAY', 'default': 300, 'description': _(u'Amount of seconds to delay OCR of documents to allow for the node\'s storage replication overhead.')},
-        {'name': u'NODE_CONCURRENT_EXECUTION', 'global_name': u'OCR_NODE_CONCURRENT_EXECUTION', 'default': 10, 'description': _(u'Maximum amount of concurrent document OCRs a node can perform.')},
+        {'name': u'NODE_CONCURRENT_EXECUTION', 'global_name': u'OCR_NODE_CONCURRENT_EXECUTION', 'default': 10, 'description': _(u'Maximum amount of document pages the job workers of a node can OCR concurrently, 0 stops the node from doing OCR.')},
+        {'name': u'PAGE_WORKERS', 'global_name': u'OCR_PAGE_WORKERS', 'default': None, 'description': _(u'Amount of processes used to OCR document pages, defaults to the amount of CPUs of the node.')},
+        {'name': u'PAGE_RETRIES', 'global_name': u'OCR_PAGE_RETRIES', 'default': 2, 'description': _(u'Amount of times the OCR of a page is retried before marking the document as failed.')},
         {'name': u'AUTOMATIC_OCR', 'global_name': u'OCR_AUTOMATIC_OCR', 'default': True, 'description': _(u'Automatically queue newly created documents for OCR.')},
         {'name': u'QUEUE_PROCESSING_INTERVAL', 'global_name': u'OCR_QUEUE_PROCESSING_INTERVAL', 'default': 120},
         {'name': u'UNPAPER_PATH', 'global_name': u'OCR_UNPAPER_PATH', 'default': u'/usr/bin/unpaper', 'description': _(u'File path to unpaper program.'), 'exists': True},
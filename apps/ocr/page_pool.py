@@ -0,0 +1,90 @@
+from __future__ import absolute_import
+
+import logging
+import multiprocessing
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PagePool(object):
+    """
+    Pool of worker processes shared by all the documents being OCRed in
+    this process.  The pages of a document are fanned out to the worker
+    processes and a page budget limits the amount of pages of this
+    process being processed at the same time, regardless of the document
+    they belong to.  The budget of the whole node is enforced when the
+    documents are claimed, see tasks.claim_for_node
+    """
+    def __init__(self, workers=None, page_budget=10, retries=2):
+        self.workers = workers or multiprocessing.cpu_count()
+        # A node with a budget of 0 doesn't claim documents, a pool
+        # without processes can't be created
+        self.page_budget = max(page_budget, 1)
+        self.retries = retries
+        self._budget = threading.BoundedSemaphore(self.page_budget)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if not self._pool:
+                self._pool = multiprocessing.Pool(processes=min(self.workers, self.page_budget))
+            return self._pool
+
+    def map(self, function, arguments_list):
+        """
+        Call function with each of the argument tuples in the worker
+        processes and return the results in the same order.  Failed
+        calls are retried, the exception of the last attempt is raised
+        when a call fails more times than the amount of retries
+        """
+        pool = self._get_pool()
+        results = [None] * len(arguments_list)
+        attempts = [0] * len(arguments_list)
+        pending = deque(range(len(arguments_list)))
+        in_flight = deque()
+
+        try:
+            while pending or in_flight:
+                if pending:
+                    if in_flight:
+                        acquired = self._budget.acquire(False)
+                    else:
+                        # Nothing of ours left to collect, wait for
+                        # other documents to release budget
+                        self._budget.acquire()
+                        acquired = True
+
+                    if acquired:
+                        index = pending.popleft()
+                        attempts[index] += 1
+                        in_flight.append((index, pool.apply_async(function, arguments_list[index])))
+                        continue
+
+                index, async_result = in_flight.popleft()
+                try:
+                    results[index] = async_result.get()
+                except Exception, msg:
+                    if attempts[index] > self.retries:
+                        raise
+                    logger.warning('retrying page job, attempt %d: %s' % (attempts[index], msg))
+                    pending.appendleft(index)
+                finally:
+                    self._budget.release()
+        finally:
+            # Don't return before the remaining pages of a failed
+            # document are done, they still count against the budget
+            for index, async_result in in_flight:
+                async_result.wait()
+                self._budget.release()
+
+        return results
+
+    def terminate(self):
+        with self._lock:
+            if self._pool:
+                self._pool.terminate()
+                self._pool.join()
+                self._pool = None
@@ -99,9 +99,8 @@ class OfficeParser(Parser):
             document_file = document_save_to_temp_dir(document_page.document, document_page.document.checksum)
             logger.debug('document_file: %s', document_file)
 
-            office_converter.convert(document_file, mimetype=document_page.document.file_mimetype)
-            if office_converter.exists:
-                input_filepath = office_converter.output_filepath
+            input_filepath = office_converter.convert(document_file, mimetype=document_page.document.file_mimetype, checksum=document_page.document_version.checksum)
+            if input_filepath:
                 logger.debug('office_converter.output_filepath: %s', input_filepath)
 
                 # Now that the office document has been converted to PDF
@@ -0,0 +1,11 @@
+from __future__ import absolute_import
+
+from .conf.settings import (NODE_CONCURRENT_EXECUTION, PAGE_WORKERS,
+    PAGE_RETRIES)
+from .page_pool import PagePool
+
+page_pool = PagePool(
+    workers=PAGE_WORKERS,
+    page_budget=NODE_CONCURRENT_EXECUTION,
+    retries=PAGE_RETRIES
+)
@@ -6,7 +6,7 @@ import logging
 
 from django.db.models import Q
 
-from job_processor.api import process_job
+from job_processor.api import process_job, get_queued_arguments
 from lock_manager import Lock, LockError
 
 from .api import do_document_ocr
@@ -18,6 +18,7 @@ from .conf.settings import (NODE_CONCURRENT_EXECUTION, REPLICATION_DELAY,
     QUEUE_PROCESSING_INTERVAL)
 
 LOCK_EXPIRE = 60 * 10  # Lock expires in 10 minutes
+NODE_LOCK_EXPIRE = 60  # Only held while claiming a document
 # TODO: Tie LOCK_EXPIRATION with hard task timeout
 
 logger = logging.getLogger(__name__)
@@ -29,10 +30,18 @@ def task_process_queue_document(queue_document_id):
         logger.debug('trying to acquire lock: %s' % lock_id)
         lock = Lock.acquire_lock(lock_id, LOCK_EXPIRE)
         logger.debug('acquired lock: %s' % lock_id)
-        queue_document = QueueDocument.objects.get(pk=queue_document_id)
-        queue_document.state = QUEUEDOCUMENT_STATE_PROCESSING
-        queue_document.node_name = platform.node()
-        queue_document.save()
+        try:
+            queue_document = QueueDocument.objects.get(pk=queue_document_id)
+        except QueueDocument.DoesNotExist:
+            # Deleted from the queue after being dispatched
+            lock.release()
+            return
+        if not claim_for_node(queue_document):
+            # Over the page budget of this node, the next run of the
+            # dispatcher will queue the document again
+            QueueDocument.objects.filter(pk=queue_document.pk).update(state=QUEUEDOCUMENT_STATE_PENDING, node_name=None)
+            lock.release()
+            return
         try:
             do_document_ocr(queue_document)
             queue_document.delete()
@@ -44,33 +53,104 @@ def task_process_queue_document(queue_document_id):
         lock.release()
     except LockError:
         logger.debug('unable to obtain lock')
-        pass
+        reset_dispatched(queue_document_id)
+
+
+def reset_dispatched(queue_document_id):
+    """
+    Put back in the queue a document that was dispatched but that no node
+    claimed
+    """
+    QueueDocument.objects.filter(pk=queue_document_id, state=QUEUEDOCUMENT_STATE_PROCESSING, node_name__isnull=True).update(state=QUEUEDOCUMENT_STATE_PENDING)
+
+
+def reset_orphans():
+    """
+    Put back in the queue the dispatched documents whose job is gone
+    without a node claiming them, like when the job processor gave up on
+    the job after its worker died or the visibility timeout expired
+    """
+    queued = [args[0] for args, kwargs in get_queued_arguments(task_process_queue_document) if args]
+    orphans = QueueDocument.objects.filter(state=QUEUEDOCUMENT_STATE_PROCESSING, node_name__isnull=True).exclude(pk__in=queued).update(state=QUEUEDOCUMENT_STATE_PENDING)
+    if orphans:
+        logger.warning('%d dispatched documents were not claimed, queued again' % orphans)
+
+
+def claim_for_node(queue_document):
+    """
+    Start processing a document in this node if its pages fit in the
+    node's page budget.  The budget is counted from the documents in
+    the database claimed by this node so that it holds for all the job
+    worker processes of the node.  A document bigger than the whole
+    budget is only processed when the node is idle
+    """
+    node_name = platform.node()
+    if NODE_CONCURRENT_EXECUTION <= 0:
+        return False
+
+    try:
+        lock = Lock.acquire_lock(u'ocr_node_budget-%s' % node_name, NODE_LOCK_EXPIRE)
+    except LockError:
+        return False
+
+    try:
+        used = sum([
+            processing.document.page_count for processing in QueueDocument.objects.filter(
+                state=QUEUEDOCUMENT_STATE_PROCESSING, node_name=node_name).select_related('document')
+        ])
+        if used and used + queue_document.document.page_count > NODE_CONCURRENT_EXECUTION:
+            return False
+
+        queue_document.state = QUEUEDOCUMENT_STATE_PROCESSING
+        queue_document.node_name = node_name
+        queue_document.save()
+        return True
+    finally:
+        lock.release()
 
 
 def task_process_document_queues():
     logger.debug('executed')
-    # TODO: reset_orphans()
+    reset_orphans()
     q_pending = Q(state=QUEUEDOCUMENT_STATE_PENDING)
     q_delayed = Q(delay=True)
     q_delay_interval = Q(datetime_submitted__lt=datetime.now() - timedelta(seconds=REPLICATION_DELAY))
+
+    # Limit the pages dispatched but not yet claimed by a node to a
+    # node's page budget so that the job queue doesn't fill up with
+    # documents the nodes can't start, each node enforces its own
+    # budget when claiming a document
+    page_budget = max(NODE_CONCURRENT_EXECUTION, 1) - sum([
+        queue_document.document.page_count for queue_document in QueueDocument.objects.filter(
+            state=QUEUEDOCUMENT_STATE_PROCESSING, node_name__isnull=True).select_related('document')
+    ])
+
+    if page_budget <= 0:
+        logger.debug('already processing maximun')
+        return
+
     for document_queue in DocumentQueue.objects.filter(state=DOCUMENTQUEUE_STATE_ACTIVE):
-        current_local_processing_count = QueueDocument.objects.filter(
-            state=QUEUEDOCUMENT_STATE_PROCESSING).filter(
-            node_name=platform.node()).count()
-        if current_local_processing_count < NODE_CONCURRENT_EXECUTION:
-            try:
-                oldest_queued_document_qs = document_queue.queuedocument_set.filter(
-                    (q_pending & ~q_delayed) | (q_pending & q_delayed & q_delay_interval))
-
-                if oldest_queued_document_qs:
-                    oldest_queued_document = oldest_queued_document_qs.order_by('datetime_submitted')[0]
-                    process_job(task_process_queue_document, oldest_queued_document.pk)
-            except Exception, e:
-                logger.error('unhandled exception: %s' % e)
-            finally:
-                # Don't process anymore from this queryset, might be stale
-                break
-        else:
-            logger.debug('already processing maximun')
+        try:
+            queued_documents = document_queue.queuedocument_set.filter(
+                (q_pending & ~q_delayed) | (q_pending & q_delayed & q_delay_interval)).select_related('document').order_by('datetime_submitted')
+
+            for queued_document in queued_documents.iterator():
+                if page_budget <= 0:
+                    break
+                # Claim the document before dispatching it so that the
+                # next run doesn't dispatch it again
+                if not QueueDocument.objects.filter(pk=queued_document.pk, state=QUEUEDOCUMENT_STATE_PENDING).update(state=QUEUEDOCUMENT_STATE_PROCESSING, node_name=None):
+                    continue
+                page_budget -= queued_document.document.page_count
+                try:
+                    process_job(task_process_queue_document, queued_document.pk)
+                except Exception:
+                    reset_dispatched(queued_document.pk)
+                    raise
+        except Exception, e:
+            logger.error('unhandled exception: %s' % e)
+
+        if page_budget <= 0:
+            break
     else:
         logger.debug('nothing to process')
@@ -1,7 +1,9 @@
 from __future__ import absolute_import
 
-from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.auth.models import User, Group
+from django.core.signals import request_started
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import ugettext_lazy as _
 
@@ -9,10 +11,12 @@ from navigation.api import register_links, register_multi_item_links
 from project_setup.api import register_setup
 
 from .conf.settings import DEFAULT_ROLES
-from .models import Role, Permission, PermissionNamespace
+from .models import (Role, RoleMember, Permission, PermissionHolder,
+    PermissionNamespace)
 from .permissions import (PERMISSION_ROLE_VIEW, PERMISSION_ROLE_EDIT,
     PERMISSION_ROLE_CREATE, PERMISSION_ROLE_DELETE,
     PERMISSION_PERMISSION_GRANT, PERMISSION_PERMISSION_REVOKE)
+from .runtime import permission_evaluator
 
 role_list = {'text': _(u'roles'), 'view': 'role_list', 'famfam': 'medal_gold_1', 'icon': 'medal_gold_1.png', 'permissions': [PERMISSION_ROLE_VIEW], 'children_view_regex': [r'^permission_', r'^role_']}
 role_create = {'text': _(u'create new role'), 'view': 'role_create', 'famfam': 'medal_gold_add', 'permissions': [PERMISSION_ROLE_CREATE]}
@@ -47,4 +51,21 @@ def user_post_save(sender, instance, **kwargs):
 
 post_save.connect(user_post_save, sender=User)
 
+
+@receiver(request_started, dispatch_uid='permission_evaluator_clear')
+def permission_evaluator_clear(sender, **kwargs):
+    # Each request evaluates the permissions with the current grants
+    permission_evaluator.clear()
+
+
+@receiver(post_save, dispatch_uid='permission_holder_evaluator_invalidate', sender=PermissionHolder)
+@receiver(post_delete, dispatch_uid='permission_holder_evaluator_remove', sender=PermissionHolder)
+@receiver(post_save, dispatch_uid='role_member_evaluator_invalidate', sender=RoleMember)
+@receiver(post_delete, dispatch_uid='role_member_evaluator_remove', sender=RoleMember)
+@receiver(post_delete, dispatch_uid='role_evaluator_remove', sender=Role)
+@receiver(post_delete, dispatch_uid='group_evaluator_remove', sender=Group)
+@receiver(m2m_changed, dispatch_uid='user_groups_evaluator_invalidate', sender=User.groups.through)
+def permission_evaluator_invalidate(sender, **kwargs):
+    permission_evaluator.invalidate()
+
 register_setup(role_list)
@@ -8,5 +8,6 @@ register_settings(
     module=u'permissions.conf.settings',
     settings=[
         {'name': u'DEFAULT_ROLES', 'global_name': u'ROLES_DEFAULT_ROLES', 'default': [], 'description': _('A list of existing roles that are automatically assigned to newly created users')},
+        {'name': u'EVALUATOR_CACHE_TIMEOUT', 'global_name': u'PERMISSIONS_EVALUATOR_CACHE_TIMEOUT', 'default': 0, 'description': _(u'Amount of seconds the effective permissions of an actor are kept in the Django cache to be reused by the following requests, use 0 to compute them again for every request.  Changes made by other processes only discard the kept permissions when all the processes share the same CACHE_BACKEND.')},
     ]
 )
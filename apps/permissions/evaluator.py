@@ -0,0 +1,104 @@
+from __future__ import absolute_import
+
+import logging
+import operator
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.loading import get_model
+
+from common.generation import GenerationCache
+from common.models import AnonymousUserSingleton
+
+from .literals import EVALUATOR_LOCAL_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+class PermissionEvaluator(GenerationCache):
+    """
+    Compute the effective permissions of an actor once, those granted to
+    it and to its groups, its roles and the roles of its groups, so that
+    checking a permission is a set lookup.  The results are kept until
+    the end of the request, or for timeout seconds in the Django cache
+    when a timeout is given.  Granting or revoking a permission and
+    changing a membership increase the generation, making the results of
+    all the processes stale.
+    """
+    def __init__(self, timeout=0):
+        super(PermissionEvaluator, self).__init__(u'permissions_evaluator_generation', EVALUATOR_LOCAL_TIMEOUT)
+        self.timeout = timeout
+
+    def initialize_local(self, local):
+        local.holders = {}
+        local.permissions = {}
+
+    def get_actor_key(self, actor):
+        return ContentType.objects.get_for_model(actor).pk, actor.pk
+
+    def get_holders(self, actor):
+        """
+        Return the (content type id, primary key) pairs of the actor and
+        of all its memberships
+        """
+        actor = AnonymousUserSingleton.objects.passthru_check(actor)
+        local = self.get_local()
+        actor_key = self.get_actor_key(actor)
+
+        try:
+            return local.holders[actor_key]
+        except KeyError:
+            pass
+
+        cache_key = u'permissions_evaluator_holders_%s_%d_%d' % ((local.generation,) + actor_key)
+        holders = cache.get(cache_key) if self.timeout else None
+        if holders is None:
+            RoleMember = get_model('permissions', 'RoleMember')
+            holders = [actor_key]
+            pending = [actor]
+            while pending:
+                member = pending.pop()
+                memberships = list(RoleMember.objects.get_roles_for_member(member))
+                if isinstance(member, User):
+                    memberships.extend(member.groups.all())
+
+                for membership in memberships:
+                    membership_key = self.get_actor_key(membership)
+                    if membership_key not in holders:
+                        holders.append(membership_key)
+                        pending.append(membership)
+
+            if self.timeout:
+                cache.set(cache_key, holders, self.timeout)
+
+        local.holders[actor_key] = holders
+        return holders
+
+    def get_permissions(self, actor):
+        """
+        Return the set of the primary keys of the stored permissions
+        granted to the actor, directly or through its memberships
+        """
+        holders = self.get_holders(actor)
+        local = self.get_local()
+
+        try:
+            return local.permissions[holders[0]]
+        except KeyError:
+            pass
+
+        cache_key = u'permissions_evaluator_%s_%d_%d' % ((local.generation,) + holders[0])
+        permissions = cache.get(cache_key) if self.timeout else None
+        if permissions is None:
+            holder_query = reduce(operator.or_, [Q(holder_type=holder_type_id, holder_id=holder_id) for holder_type_id, holder_id in holders])
+            permissions = frozenset(get_model('permissions', 'PermissionHolder').objects.filter(holder_query).values_list('permission', flat=True))
+            if self.timeout:
+                cache.set(cache_key, permissions, self.timeout)
+
+        local.permissions[holders[0]] = permissions
+        return permissions
+
+    def has_permission(self, stored_permission, actor):
+        return stored_permission.pk in self.get_permissions(actor)
@@ -0,0 +1,3 @@
+# Seconds the permissions of an actor are kept in memory when not
+# evaluating the permissions of a request, like in the job workers
+EVALUATOR_LOCAL_TIMEOUT = 10
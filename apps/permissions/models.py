@@ -13,6 +13,7 @@ from django.core.exceptions import PermissionDenied
 from common.models import AnonymousUserSingleton
 
 from .managers import (RoleMemberManager, StoredPermissionManager)
+from .runtime import permission_evaluator
 
 logger = logging.getLogger(__name__)
 
@@ -157,25 +158,9 @@ class StoredPermission(models.Model):
             if actor.is_superuser or actor.is_staff:
                 return True
 
-        # Request is one of the permission's holders?
-        if actor in self.get_holders():
-            return True
-
-        # If not check if the requesters memberships objects is one of
-        # the permission's holder?
-        roles = RoleMember.objects.get_roles_for_member(actor)
-
-        if isinstance(actor, User):
-            groups = actor.groups.all()
-        else:
-            groups = []
-
-        for membership in list(set(roles) | set(groups)):
-            if self.requester_has_this(membership):
-                return True
-
-        logger.debug('Fallthru')
-        return False
+        # Is the permission granted to the requester or to any of its
+        # memberships?
+        return permission_evaluator.has_permission(self, actor)
 
     def grant_to(self, actor):
         actor = AnonymousUserSingleton.objects.passthru_check(actor)
@@ -0,0 +1,6 @@
+from __future__ import absolute_import
+
+from .conf.settings import EVALUATOR_CACHE_TIMEOUT
+from .evaluator import PermissionEvaluator
+
+permission_evaluator = PermissionEvaluator(timeout=EVALUATOR_CACHE_TIMEOUT)
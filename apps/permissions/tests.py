@@ -0,0 +1,88 @@
+from __future__ import absolute_import
+
+from django.contrib.auth.models import User, Group
+from django.test import TestCase
+
+from .models import Permission, PermissionNamespace, Role, RoleMember
+from .runtime import permission_evaluator
+
+
+def recursive_has_permission(stored_permission, actor):
+    """
+    The permission check as it was done before the evaluator, following
+    the memberships of the actor one query at a time
+    """
+    if actor in [holder.holder_object for holder in stored_permission.permissionholder_set.all()]:
+        return True
+
+    memberships = list(RoleMember.objects.get_roles_for_member(actor))
+    if isinstance(actor, User):
+        memberships.extend(actor.groups.all())
+
+    for membership in set(memberships):
+        if recursive_has_permission(stored_permission, membership):
+            return True
+
+    return False
+
+
+class PermissionEvaluatorTestCase(TestCase):
+    def setUp(self):
+        namespace = PermissionNamespace('test_evaluator', u'test evaluator')
+        self.permissions = [
+            Permission.objects.register(namespace, 'edit', u'edit').get_stored_permission(),
+            Permission.objects.register(namespace, 'review', u'review').get_stored_permission(),
+            Permission.objects.register(namespace, 'read', u'read').get_stored_permission(),
+        ]
+        edit, review, read = self.permissions
+
+        self.editors = Group.objects.create(name='editors')
+        self.readers = Group.objects.create(name='readers')
+        self.managers = Role.objects.create(name='managers', label=u'managers')
+        self.reviewers = Role.objects.create(name='reviewers', label=u'reviewers')
+
+        self.alice = User.objects.create(username='alice')
+        self.bob = User.objects.create(username='bob')
+        self.carol = User.objects.create(username='carol')
+        self.dave = User.objects.create(username='dave')
+        self.users = [self.alice, self.bob, self.carol, self.dave]
+
+        # alice through the editors group and its managers role, bob
+        # through the reviewers role, carol through the readers group and
+        # directly, dave has no permissions
+        self.alice.groups.add(self.editors)
+        self.carol.groups.add(self.readers)
+        self.managers.add_member(self.editors)
+        self.reviewers.add_member(self.bob)
+
+        edit.grant_to(self.managers)
+        review.grant_to(self.reviewers)
+        review.grant_to(self.editors)
+        read.grant_to(self.readers)
+        edit.grant_to(self.carol)
+
+        permission_evaluator.clear()
+
+    def check_against_recursive(self):
+        for user in self.users:
+            for stored_permission in self.permissions:
+                self.failUnlessEqual(
+                    permission_evaluator.has_permission(stored_permission, user),
+                    recursive_has_permission(stored_permission, user),
+                    u'%s, %s' % (user, stored_permission.name)
+                )
+
+    def test_recursive_results(self):
+        self.check_against_recursive()
+
+    def test_membership_changes(self):
+        self.check_against_recursive()
+
+        self.alice.groups.remove(self.editors)
+        self.managers.add_member(self.readers)
+        self.reviewers.remove_member(self.bob)
+        self.permissions[2].revoke_from(self.readers)
+
+        self.check_against_recursive()
+        self.failUnlessEqual(permission_evaluator.has_permission(self.permissions[0], self.alice), False)
+        self.failUnlessEqual(permission_evaluator.has_permission(self.permissions[0], self.carol), True)
@@ -6,6 +6,7 @@ from navigation.api import (register_links,
     register_model_list_columns)
 from common.utils import encapsulate
 from project_setup.api import register_setup
+from job_processor.api import register_job
 from documents.permissions import (PERMISSION_DOCUMENT_NEW_VERSION, 
     PERMISSION_DOCUMENT_CREATE)
 
@@ -13,6 +14,7 @@ from .staging import StagingFile
 from .models import (WebForm, StagingFolder, SourceTransformation,
     WatchFolder)
 from .widgets import staging_file_thumbnail
+from .tasks import task_check_watch_folder
 from .permissions import (PERMISSION_SOURCES_SETUP_VIEW,
     PERMISSION_SOURCES_SETUP_EDIT, PERMISSION_SOURCES_SETUP_DELETE,
     PERMISSION_SOURCES_SETUP_CREATE)
@@ -72,3 +74,5 @@ register_model_list_columns(StagingFile, [
     ])
 
 register_setup(setup_sources)
+
+register_job('task_check_watch_folder', task_check_watch_folder, title=_(u'Check a watch folder for new documents.'), retries=0, unique=True)
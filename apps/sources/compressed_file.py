@@ -1,24 +1,186 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import subprocess
+import tarfile
+import tempfile
 import zipfile
 
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files import File
+
+from common.conf.settings import TEMPORARY_DIRECTORY
+
+from .conf.settings import SPOOL_MAXIMUM_SIZE, SEVENZIP_PATH
+
+COPY_CHUNK_SIZE = 1024 * 1024
+SEVENZIP_SIGNATURE = '7z\xbc\xaf\x27\x1c'
 
 
 class NotACompressedFile(Exception):
     pass
 
 
+def spool(descriptor, name, size=None):
+    """
+    Copy a stream into a temporary file that is kept in memory until it
+    grows bigger than SPOOL_MAXIMUM_SIZE and return it as a Django File
+    """
+    spooled_file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAXIMUM_SIZE, dir=TEMPORARY_DIRECTORY)
+    shutil.copyfileobj(descriptor, spooled_file, COPY_CHUNK_SIZE)
+    if size is None:
+        size = spooled_file.tell()
+    spooled_file.seek(0)
+
+    member = File(spooled_file, name=name)
+    member.size = size
+    return member
+
+
+class Archive(object):
+    """
+    Base class for the archive formats, members are extracted one at a
+    time into spooled temporary files
+    """
+    def __init__(self, file_object):
+        self.file_object = file_object
+
+    @classmethod
+    def check(cls, file_object):
+        raise NotImplementedError
+
+    def members(self):
+        raise NotImplementedError
+
+
+class ZipArchive(Archive):
+    @classmethod
+    def check(cls, file_object):
+        file_object.seek(0)
+        return zipfile.is_zipfile(file_object)
+
+    def members(self):
+        self.file_object.seek(0)
+        zfobj = zipfile.ZipFile(self.file_object)
+        for info in zfobj.infolist():
+            if not info.filename.endswith('/'):
+                descriptor = zfobj.open(info)
+                try:
+                    member = spool(descriptor, name=info.filename, size=info.file_size)
+                finally:
+                    descriptor.close()
+                yield member
+
+
+class TarArchive(Archive):
+    """
+    Uncompressed, gzip and bzip2 compressed tar files
+    """
+    @classmethod
+    def check(cls, file_object):
+        file_object.seek(0)
+        try:
+            tarfile.open(fileobj=file_object, mode='r:*').close()
+        except (tarfile.TarError, IOError, EOFError):
+            return False
+        else:
+            return True
+
+    def members(self):
+        self.file_object.seek(0)
+        tfobj = tarfile.open(fileobj=self.file_object, mode='r:*')
+        try:
+            for info in tfobj:
+                if info.isfile():
+                    descriptor = tfobj.extractfile(info)
+                    try:
+                        member = spool(descriptor, name=info.name, size=info.size)
+                    finally:
+                        descriptor.close()
+                    yield member
+        finally:
+            tfobj.close()
+
+
+class SevenZipArchive(Archive):
+    """
+    7z files, extracted by the 7z program one member at a time
+    """
+    @classmethod
+    def check(cls, file_object):
+        file_object.seek(0)
+        signature = file_object.read(len(SEVENZIP_SIGNATURE))
+        file_object.seek(0)
+        return signature == SEVENZIP_SIGNATURE and os.path.exists(SEVENZIP_PATH)
+
+    def members(self):
+        try:
+            # Uploads bigger than FILE_UPLOAD_MAX_MEMORY_SIZE are already
+            # stored on disk
+            filepath = self.file_object.temporary_file_path()
+            temporary = False
+        except AttributeError:
+            handle, filepath = tempfile.mkstemp(dir=TEMPORARY_DIRECTORY)
+            destination = os.fdopen(handle, 'wb')
+            self.file_object.seek(0)
+            shutil.copyfileobj(self.file_object, destination, COPY_CHUNK_SIZE)
+            destination.close()
+            temporary = True
+
+        try:
+            for name, size in self.list(filepath):
+                proc = subprocess.Popen([SEVENZIP_PATH, u'x', u'-so', filepath, name], close_fds=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                try:
+                    member = spool(proc.stdout, name=name, size=size)
+                finally:
+                    proc.stdout.close()
+                    proc.wait()
+                yield member
+        finally:
+            if temporary:
+                os.unlink(filepath)
+
+    def list(self, filepath):
+        """
+        Return the list of (name, size) tuples of the files of the archive
+        """
+        proc = subprocess.Popen([SEVENZIP_PATH, u'l', u'-slt', filepath], close_fds=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output, errors = proc.communicate()
+        if proc.returncode != 0:
+            raise NotACompressedFile(errors)
+
+        members = []
+        # Technical listing: one 'Key = value' block per member after
+        # the '----------' separator
+        for block in output.split('----------', 1)[-1].split('\n\n'):
+            properties = dict([line.split(' = ', 1) for line in block.splitlines() if ' = ' in line])
+            if 'Path' in properties and 'D' not in properties.get('Attributes', ''):
+                members.append((properties['Path'].decode('utf-8'), int(properties.get('Size') or 0)))
+
+        return members
+
+
+ARCHIVE_CLASSES = [ZipArchive, TarArchive, SevenZipArchive]
+
+
 class CompressedFile(object):
     def __init__(self, file_object):
         self.file_object = file_object
 
+    def get_archive(self):
+        for archive_class in ARCHIVE_CLASSES:
+            if archive_class.check(self.file_object):
+                return archive_class(self.file_object)
+
+        self.file_object.seek(0)
+        raise NotACompressedFile
+
     def children(self):
-        try:
-            # Try for a ZIP file
-            zfobj = zipfile.ZipFile(self.file_object)
-            filenames = [filename for filename in zfobj.namelist() if not filename.endswith('/')]
-            return (SimpleUploadedFile(name=filename, content=zfobj.read(filename)) for filename in filenames)
-        except zipfile.BadZipfile:
-            raise NotACompressedFile
+        """
+        Return a generator of the files of the archive, each one is
+        extracted when requested and should be closed by the caller
+        """
+        return self.get_archive().members()
 
     #def close(self):
     #    self.file_object.close()
@@ -0,0 +1,16 @@
+"""Configuration options for the sources app"""
+
+from django.utils.translation import ugettext_lazy as _
+
+from smart_settings.api import register_settings
+
+register_settings(
+    namespace=u'sources',
+    module=u'sources.conf.settings',
+    settings=[
+        {'name': u'BULK_WORKERS', 'global_name': u'SOURCES_BULK_WORKERS', 'default': None, 'description': _(u'Amount of processes used by the bulk_upload command to calculate the checksum, mimetype and page count of the files of a bulk upload, defaults to the amount of CPUs.  Compressed files uploaded from the web interface are analyzed in the web process, one file at a time.')},
+        {'name': u'SPOOL_MAXIMUM_SIZE', 'global_name': u'SOURCES_SPOOL_MAXIMUM_SIZE', 'default': 16 * 1024 * 1024, 'description': _(u'Size in bytes up to which the files extracted from compressed files are kept in memory, bigger files are written to the temporary directory.')},
+        {'name': u'SEVENZIP_PATH', 'global_name': u'SOURCES_SEVENZIP_PATH', 'default': u'/usr/bin/7z', 'description': _(u'File path to the 7z program used to expand 7z compressed files.')},
+        {'name': u'BULK_BATCH_SIZE', 'global_name': u'SOURCES_BULK_BATCH_SIZE', 'default': 50, 'description': _(u'Amount of files of a bulk upload staged, analyzed and stored in the database per transaction.')},
+    ]
+)
@@ -0,0 +1,216 @@
+from __future__ import absolute_import
+
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.files import File
+from django.db import connection, transaction
+
+from acls.utils import apply_default_acls
+from common.conf.settings import TEMPORARY_DIRECTORY
+from converter.api import get_page_count
+from converter.exceptions import UnknownFileFormat
+from converter.office_converter import CONVERTER_OFFICE_FILE_MIMETYPES
+from document_indexing.api import update_indexes
+from documents.events import HISTORY_DOCUMENT_CREATED
+from documents.models import Document
+from documents.utils import get_file_properties
+from history.api import create_history
+from metadata.api import save_metadata_list
+
+from .conf.settings import BULK_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+STAGING_CHUNK_SIZE = 1024 * 1024
+
+
+def analyze_file(arguments):
+    """
+    Calculate the checksum, mimetype, encoding and page count of a
+    staged file.  Doesn't access the database or the office converter so
+    that it can run in the worker processes of the ingestion pool, the
+    page count of office documents is left for the parent process to
+    detect
+    """
+    filepath, filename = arguments
+
+    # The file is already staged, a single read is enough for the
+    # checksum and the mimetype
+    descriptor = open(filepath, 'rb')
+    try:
+        checksum, mimetype, encoding = get_file_properties(descriptor, filename)
+    finally:
+        descriptor.close()
+
+    if mimetype in CONVERTER_OFFICE_FILE_MIMETYPES:
+        return checksum, mimetype, encoding, None
+
+    try:
+        page_count = get_page_count(filepath, checksum=checksum, mimetype=mimetype)
+    except UnknownFileFormat:
+        # Same as DocumentVersion.detect_page_count
+        page_count = 1
+
+    return checksum, mimetype, encoding, page_count
+
+
+class BulkIngestion(object):
+    """
+    Upload many files as new documents.  Files are staged in batches,
+    analyzed and then stored in the database with one transaction per
+    batch.  The analysis runs in a pool of processes only when more than
+    one worker is requested, the web process must not fork so uploads
+    made from views use a single worker.  With skip_duplicates, files
+    already stored, with the same checksum as a version of an existing
+    document, are not stored again
+    """
+    def __init__(self, source, document_type=None, metadata_dict_list=None, user=None, batch_size=BULK_BATCH_SIZE, workers=1, skip_duplicates=False):
+        self.source = source
+        self.document_type = document_type
+        self.metadata_dict_list = metadata_dict_list
+        self.user = user
+        self.batch_size = batch_size
+        self.workers = workers or multiprocessing.cpu_count()
+        self.transformations, errors = source.get_transformation_list()
+        self.skip_duplicates = skip_duplicates
+        self.files = 0
+        self.duplicates = 0
+        self.size = 0
+        self.seconds = 0
+
+    def ingest(self, file_objects, callback=None):
+        """
+        Create a document for each file object, callback is called with
+        the running count and the file object as each file is staged.
+        Returns the list of created documents
+        """
+        documents = []
+        start = time.time()
+        staging_directory = tempfile.mkdtemp(dir=TEMPORARY_DIRECTORY)
+        if self.workers > 1:
+            # The children must not share the parent's database connection
+            connection.close()
+            pool = multiprocessing.Pool(processes=self.workers)
+            analyze = pool.map
+        else:
+            pool = None
+            analyze = map
+
+        try:
+            batch = []
+            for file_object in file_objects:
+                batch.append(self.stage(staging_directory, file_object))
+                file_object.close()
+                if callback:
+                    callback(self.files + len(batch), file_object)
+
+                if len(batch) >= self.batch_size:
+                    documents.extend(self.process_batch(analyze, batch))
+                    batch = []
+
+            if batch:
+                documents.extend(self.process_batch(analyze, batch))
+        finally:
+            if pool:
+                pool.terminate()
+                pool.join()
+            shutil.rmtree(staging_directory, ignore_errors=True)
+            self.seconds += time.time() - start
+
+        logger.debug('ingested %(files)d files, %(files_per_second).2f files per second' % self.get_statistics())
+        return documents
+
+    def stage(self, staging_directory, file_object):
+        """
+        Copy a file object to the staging directory, returns the staged
+        filepath and the original filename
+        """
+        handle, filepath = tempfile.mkstemp(dir=staging_directory)
+        destination = os.fdopen(handle, 'wb')
+        try:
+            if hasattr(file_object, 'chunks'):
+                for chunk in file_object.chunks():
+                    destination.write(chunk)
+            else:
+                shutil.copyfileobj(file_object, destination, STAGING_CHUNK_SIZE)
+        finally:
+            destination.close()
+
+        self.size += os.path.getsize(filepath)
+        return filepath, os.path.basename(file_object.name)
+
+    def process_batch(self, analyze, batch):
+        results = analyze(analyze_file, batch)
+        documents = self.store_batch(batch, results)
+
+        for filepath, filename in batch:
+            os.unlink(filepath)
+
+        self.files += len(batch)
+        return documents
+
+    @transaction.commit_manually
+    def store_batch(self, batch, results):
+        try:
+            documents = []
+            for (filepath, filename), result in zip(batch, results):
+                if self.skip_duplicates and Document.objects.with_checksum(result[0]).exists():
+                    self.duplicates += 1
+                else:
+                    documents.append(self.store_file(filepath, filename, *result))
+
+            # The default access entries of the whole batch are granted
+            # with a few queries instead of some per document
+            apply_default_acls(documents, self.user)
+        except:
+            transaction.rollback()
+            raise
+        else:
+            transaction.commit()
+            return documents
+
+    def store_file(self, filepath, filename, checksum, mimetype, encoding, page_count):
+        document = Document(document_type=self.document_type)
+        document.save()
+
+        if self.user:
+            document.add_as_recent_document_for_user(self.user)
+            create_history(HISTORY_DOCUMENT_CREATED, document, {'user': self.user})
+        else:
+            create_history(HISTORY_DOCUMENT_CREATED, document)
+
+        descriptor = open(filepath, 'rb')
+        try:
+            # Already analyzed, don't read the file again
+            document_version = document.new_version(
+                file=File(descriptor, name=filename),
+                user=self.user,
+                checksum=checksum,
+                mimetype=mimetype,
+                encoding=encoding,
+                page_count=page_count
+            )
+        finally:
+            descriptor.close()
+
+        document_version.apply_default_transformations(self.transformations)
+
+        if self.metadata_dict_list:
+            save_metadata_list(self.metadata_dict_list, document, create=True)
+            update_indexes(document)
+
+        return document
+
+    def get_statistics(self):
+        return {
+            'files': self.files,
+            'duplicates': self.duplicates,
+            'size': self.size,
+            'seconds': self.seconds,
+            'files_per_second': self.files / self.seconds if self.seconds else 0,
+        }
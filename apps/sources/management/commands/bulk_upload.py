@@ -25,6 +25,9 @@ class Command(LabelCommand):
             help='A metadata dictionary list to apply to the documents.'),
         make_option('--document_type', action='store', dest='document_type_name',
             help='The document type to apply to the uploaded documents.'),
+        make_option('--skip_duplicates', action='store_true', dest='skip_duplicates',
+            default=False, help='Do not upload the files already stored as '
+                'a version of an existing document.'),
     )
 
     def handle_label(self, label, **options):
@@ -61,7 +64,7 @@ class Command(LabelCommand):
             source = OutOfProcess()
             fd = open(label)
             try:
-                result = source.upload_file(fd, filename=None, use_file_name=False, document_type=document_type, expand=True, metadata_dict_list=metadata_dict_list, user=None, document=None, new_version_data=None, command_line=True)
+                result = source.upload_file(None, fd, filename=None, use_file_name=False, document_type=document_type, expand=True, metadata_dict_list=metadata_dict_list, user=None, document=None, new_version_data=None, command_line=True, skip_duplicates=options['skip_duplicates'])
                 pass
             except NotACompressedFile:
                 print '%s is not a compressed file.' % label
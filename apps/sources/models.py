@@ -5,6 +5,8 @@ from .literals import SOURCE_CHOICES, SOURCE_CHOICES_PLURAL, \
     SOURCE_CHOICE_STAGING, SOURCE_ICON_DISK, SOURCE_ICON_DRIVE, SOURCE_ICON_CHOICES, \
     SOURCE_CHOICE_WATCH, SOURCE_UNCOMPRESS_CHOICES, SOURCE_UNCOMPRESS_CHOICE_Y
 from .managers import SourceTransformationManager
+from .ingestion import BulkIngestion
+from .conf.settings import BULK_WORKERS
 from acls.utils import apply_default_acls
 from ast import literal_eval
 from converter.api import get_available_transformations_choices
@@ -20,7 +22,8 @@ from documents.models import DocumentType, Document
 from history.api import create_history
 from metadata.api import save_metadata_list, create_metadata
 from metadata.models import MetadataType
-from scheduler.api import register_interval_job, remove_job
+from scheduler.api import remove_job
+from job_processor.api import schedule_job
 from sources.csv_file import CSVFile
 import csv
 import logging
@@ -59,20 +62,28 @@ class BaseModel(models.Model):
     def get_transformation_list(self):
         return SourceTransformation.transformations.get_for_object_as_list(self)
 
-    def upload_file(self,  destination_folder, file_object, filename=None, use_file_name=False, document_type=None, expand=False, metadata_dict_list=None, user=None, document=None, new_version_data=None, command_line=False):
+    def upload_file(self,  destination_folder, file_object, filename=None, use_file_name=False, document_type=None, expand=False, metadata_dict_list=None, user=None, document=None, new_version_data=None, command_line=False, skip_duplicates=False):
         is_compressed = None
         uploaded_doc = None
 
         if expand:
             try:
                 cf = CompressedFile(file_object)
-                count = 1
-                for fp in cf.children():
+
+                def report_progress(count, fp):
                     if command_line:
                         print 'Uploading file #%d: %s' % (count, fp)
-                    uploaded_doc = self.upload_single_file(file_object=fp, filename=None, document_type=document_type, metadata_dict_list=metadata_dict_list, user=user)
-                    fp.close()
-                    count += 1
+
+                # Only the bulk_upload command analyzes the files in a
+                # pool of processes, web processes must not fork
+                ingestion = BulkIngestion(self, document_type=document_type, metadata_dict_list=metadata_dict_list, user=user, workers=BULK_WORKERS if command_line else 1, skip_duplicates=skip_duplicates)
+                documents = ingestion.ingest(cf.children(), callback=report_progress)
+                if documents:
+                    uploaded_doc = documents[-1]
+                if command_line:
+                    print 'Uploaded %(files)d files in %(seconds).1f seconds, %(files_per_second).2f files per second.' % ingestion.get_statistics()
+                    if skip_duplicates:
+                        print 'Skipped %(duplicates)d files already stored.' % ingestion.get_statistics()
             except NotACompressedFile:
                 is_compressed = False
                 logging.debug('Exception: NotACompressedFile')
@@ -277,8 +288,8 @@ class WatchFolder(BaseModel):
 
     def schedule(self):
         if self.enabled:
-            register_interval_job(self.internal_name(),
-                title=self.fullname(), func=self.execute,
+            schedule_job(self.internal_name(),
+                title=self.fullname(), job_name='task_check_watch_folder',
                 kwargs={'source_id': self.pk}, seconds=self.interval
             )
 
@@ -0,0 +1,18 @@
+from __future__ import absolute_import
+
+import logging
+
+from .models import WatchFolder
+
+logger = logging.getLogger(__name__)
+
+
+def task_check_watch_folder(source_id):
+    logger.debug('executing, source: %s' % source_id)
+    try:
+        source = WatchFolder.objects.get(pk=source_id)
+    except WatchFolder.DoesNotExist:
+        # Deleted after the job was queued
+        return
+
+    source.execute(source_id)
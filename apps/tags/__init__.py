@@ -1,14 +1,18 @@
 from __future__ import absolute_import
 
 from django.utils.translation import ugettext_lazy as _
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 from navigation.api import (register_links, register_top_menu,
     register_model_list_columns, register_multi_item_links)
 from common.utils import encapsulate
 from documents.models import Document
+from dynamic_search.classes import SearchModel
 from acls.api import class_permissions
 
-from taggit.models import Tag
+from taggit.models import Tag, TaggedItem
 from taggit.managers import TaggableManager
 
 from .links import (tag_list, tag_create, tag_attach,
@@ -59,3 +63,19 @@ class_permissions(Tag, [
 ])
 
 Document.add_to_class('tags', TaggableManager())
+
+
+@receiver(post_save, dispatch_uid='tagged_item_search_index', sender=TaggedItem)
+@receiver(post_delete, dispatch_uid='tagged_item_search_remove', sender=TaggedItem)
+def tagged_item_search_index(sender, instance, **kwargs):
+    if instance.content_type_id == ContentType.objects.get_for_model(Document).pk:
+        SearchModel.get('documents.Document').index_object(instance.object_id, ['tags__name'])
+
+
+@receiver(post_save, dispatch_uid='tag_search_index', sender=Tag)
+def tag_search_index(sender, instance, created, **kwargs):
+    if not created:
+        # Renamed, the tagged documents are found by the old name
+        document_search = SearchModel.get('documents.Document')
+        for object_id in TaggedItem.objects.filter(tag=instance, content_type=ContentType.objects.get_for_model(Document)).values_list('object_id', flat=True):
+            document_search.index_object(object_id, ['tags__name'])